@@ -0,0 +1,202 @@
+"""
+Benchmark the DiveMeets page parsers of import_competition_data.
+
+Runs every parser over a corpus of synthetic pages plus, optionally, recorded pages and reports
+pages per second and peak allocated memory per page. The run fails (exit code 1) when:
+  - parse_dive_sheet_fast or parse_diver_page disagree with the reference parsers on any page
+  - parse_dive_sheet_fast is slower than parse_dive_sheet by more than --min-speedup allows
+  - a parser's throughput dropped by more than --tolerance against a --baseline file
+
+Usage (from the backend directory):
+    python benchmarks/parser_benchmark.py
+    python benchmarks/parser_benchmark.py --corpus-dir recorded_pages --write-baseline /tmp/parsers.json
+    python benchmarks/parser_benchmark.py --baseline /tmp/parsers.json
+
+Recorded pages are read from <corpus-dir>/team, <corpus-dir>/profile and <corpus-dir>/divesheet
+(*.html or *.html.gz), or from a local page archive written by the importer (--archive-dir, the
+newest copy of every archived page is used). Baselines are machine specific, record them on the
+machine you compare on.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+import import_competition_data as parsers  # noqa: E402
+from page_archive import LocalPageArchive  # noqa: E402
+from synthetic_pages import build_corpus  # noqa: E402
+
+
+def load_recorded_pages(corpus_dir: str, kind: str) -> List[str]:
+    directory = os.path.join(corpus_dir, kind)
+    if not os.path.isdir(directory):
+        return []
+
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith('.html.gz'):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                pages.append(f.read())
+        elif name.endswith('.html'):
+            with open(path, encoding='utf-8') as f:
+                pages.append(f.read())
+    return pages
+
+
+def load_archived_pages(archive_dir: str) -> Dict[str, List[str]]:
+    """Sort the pages of a local page archive into team, profile and dive-sheet pages by URL"""
+    pages = {'team': [], 'profile': [], 'divesheet': []}
+    for response in LocalPageArchive(archive_dir).iter_pages():
+        if response.status_code >= 400:
+            continue
+        if 'profilet.php' in response.url:
+            pages['team'].append(response.text)
+        elif 'profile.php' in response.url:
+            pages['profile'].append(response.text)
+        elif 'divesheet' in response.url:
+            pages['divesheet'].append(response.text)
+    return pages
+
+
+def measure(parser: Callable, pages: List[str], repeat: int) -> Dict[str, float]:
+    """Best-of-repeat throughput plus the average peak allocation of one parse"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            parser(page)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    peaks = []
+    for page in pages:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        parser(page)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        'pages': len(pages),
+        'pages_per_second': round(len(pages) / best, 1) if best > 0 else 0.0,
+        'peak_kib_per_page': round(sum(peaks) / len(peaks) / 1024, 1) if peaks else 0.0,
+    }
+
+
+def check_equivalence(profiles: List[str], sheets: List[str]) -> List[str]:
+    failures = []
+    for index, page in enumerate(sheets):
+        if parsers.parse_dive_sheet_fast(page) != parsers.parse_dive_sheet(page):
+            failures.append(f"parse_dive_sheet_fast differs from parse_dive_sheet on dive sheet #{index}")
+    for index, page in enumerate(profiles):
+        expected = (parsers.parse_diver_profile(page), parsers.parse_diver_results(page))
+        if parsers.parse_diver_page(page) != expected:
+            failures.append(f"parse_diver_page differs from the separate parsers on profile #{index}")
+    return failures
+
+
+def count_fast_path_fallbacks(sheets: List[str]) -> int:
+    """Dive sheets parse_dive_sheet_fast hands to parse_dive_sheet, which parse at the speed of the soup parser"""
+    fallbacks = 0
+    for page in sheets:
+        try:
+            parsers._parse_dive_sheet_fast(page)
+        except parsers._FallbackToSoup:
+            fallbacks += 1
+    return fallbacks
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--corpus-dir', help='Directory with recorded team/, profile/ and divesheet/ pages')
+    arg_parser.add_argument('--archive-dir', help='Local page archive (ARCHIVE_PATH) recorded by the importer')
+    arg_parser.add_argument('--size', type=int, default=40, help='Number of synthetic profile pages')
+    arg_parser.add_argument('--seed', type=int, default=7)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--min-speedup', type=float, default=1.0,
+                            help='Minimum throughput ratio of parse_dive_sheet_fast over parse_dive_sheet')
+    arg_parser.add_argument('--baseline', help='JSON file from --write-baseline to compare against')
+    arg_parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed throughput drop against the baseline (0.2 = 20%%)')
+    arg_parser.add_argument('--write-baseline', help='Write the measured results to this JSON file')
+    args = arg_parser.parse_args()
+
+    # The parsers log a line per page at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+
+    teams, profiles, sheets = build_corpus(args.seed, args.size)
+    if args.corpus_dir:
+        teams += load_recorded_pages(args.corpus_dir, 'team')
+        profiles += load_recorded_pages(args.corpus_dir, 'profile')
+        sheets += load_recorded_pages(args.corpus_dir, 'divesheet')
+    if args.archive_dir:
+        archived = load_archived_pages(args.archive_dir)
+        teams += archived['team']
+        profiles += archived['profile']
+        sheets += archived['divesheet']
+
+    print(f"HTML backend: {parsers.HTML_PARSER}")
+    print(f"Corpus: {len(teams)} team pages, {len(profiles)} profile pages, {len(sheets)} dive sheets")
+
+    failures = check_equivalence(profiles, sheets)
+    print(f"parse_dive_sheet_fast falls back to parse_dive_sheet on {count_fast_path_fallbacks(sheets)} dive sheets")
+
+    benchmarks = {
+        'parse_team_page': (parsers.parse_team_page, teams),
+        'parse_diver_profile': (parsers.parse_diver_profile, profiles),
+        'parse_diver_results': (parsers.parse_diver_results, profiles),
+        'parse_diver_page': (parsers.parse_diver_page, profiles),
+        'parse_dive_sheet': (parsers.parse_dive_sheet, sheets),
+        'parse_dive_sheet_fast': (parsers.parse_dive_sheet_fast, sheets),
+    }
+
+    results = {}
+    print(f"\n{'parser':<24}{'pages':>8}{'pages/s':>12}{'peak KiB/page':>16}")
+    for name, (parser, pages) in benchmarks.items():
+        results[name] = measure(parser, pages, args.repeat)
+        print(f"{name:<24}{results[name]['pages']:>8}{results[name]['pages_per_second']:>12}"
+              f"{results[name]['peak_kib_per_page']:>16}")
+
+    speedup = results['parse_dive_sheet_fast']['pages_per_second'] / max(
+        results['parse_dive_sheet']['pages_per_second'], 1e-9)
+    print(f"\nparse_dive_sheet_fast speedup: {speedup:.1f}x")
+    if speedup < args.min_speedup:
+        failures.append(f"parse_dive_sheet_fast speedup {speedup:.2f}x is below {args.min_speedup}x")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name, measured in results.items():
+            expected = baseline.get('results', {}).get(name)
+            if not expected:
+                continue
+            floor = expected['pages_per_second'] * (1 - args.tolerance)
+            if measured['pages_per_second'] < floor:
+                failures.append(f"{name} regressed: {measured['pages_per_second']} pages/s, "
+                                f"baseline {expected['pages_per_second']} pages/s")
+
+    if args.write_baseline:
+        with open(args.write_baseline, 'w') as f:
+            json.dump({'html_parser': parsers.HTML_PARSER, 'results': results}, f, indent=2)
+        print(f"Baseline written to {args.write_baseline}")
+
+    if failures:
+        print('\nFAILED')
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print('\nOK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Time the whole scrape of import_competition_data offline by replaying a local page archive.
+
+Record an archive first by running the importer with ARCHIVE_PATH set, then replay it here. No network
+request is made and nothing is written to DynamoDB, so repeated runs are deterministic and comparable.
+
+Usage (from the backend directory):
+    TEAM_NUMBER=12345 python benchmarks/replay_import.py --archive-dir /tmp/divemeets-archive
+    TEAM_NUMBER=12345 python benchmarks/replay_import.py --archive-dir /tmp/divemeets-archive --profile
+
+TEAM_NUMBER (and DIVEMEETS_BASE_URL, if it was set while recording) must match the recorded run.
+"""
+import argparse
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import time
+from threading import Lock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+import import_competition_data as importer  # noqa: E402
+from page_archive import LocalPageArchive  # noqa: E402
+
+
+def profile_worker_calls(names):
+    """
+    Profile the scraper's worker functions on whichever thread runs them.
+
+    cProfile only sees the thread it was enabled on, while the scrape runs on worker pools, so every
+    call of the named module functions gets its own profiler and the results are merged afterwards.
+    """
+    profiles = []
+    lock = Lock()
+
+    def wrap(function):
+        def profiled(*args, **kwargs):
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(function, *args, **kwargs)
+            finally:
+                with lock:
+                    profiles.append(profiler)
+        return profiled
+
+    for name in names:
+        setattr(importer, name, wrap(getattr(importer, name)))
+    return profiles
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--archive-dir', required=True, help='Local page archive (ARCHIVE_PATH) to replay')
+    arg_parser.add_argument('--as-of', help='Ignore pages archived after this ISO date/datetime')
+    arg_parser.add_argument('--workers', type=int, default=8, help='Number of divers processed in parallel')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--profile', action='store_true', help='Print the top functions by own time')
+    args = arg_parser.parse_args()
+
+    # The importer logs a line per page at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # The team page is handled on the calling thread, profile pages and dive sheets on worker pools
+    profiles = profile_worker_calls(['process_single_diver', 'fetch_dive_sheet']) if args.profile else None
+    main_profiler = cProfile.Profile() if args.profile else None
+
+    timings = []
+    for _ in range(args.repeat):
+        archive = LocalPageArchive(args.archive_dir)
+        start = time.perf_counter()
+        if main_profiler:
+            main_profiler.enable()
+        divers = importer.extract_diving_data(args.workers, archive=archive, replay=True, replay_as_of=args.as_of)
+        if main_profiler:
+            main_profiler.disable()
+        timings.append(time.perf_counter() - start)
+
+    results = sum(len(diver.get('results', [])) for diver in divers)
+    dives = sum(len(result.get('dives', [])) for diver in divers for result in diver.get('results', []))
+    errors = sum('error' in diver for diver in divers)
+
+    print(f"HTML backend: {importer.HTML_PARSER}")
+    print(f"Replayed {archive.stats()['pages_read']} pages: {len(divers)} divers ({errors} errors), "
+          f"{results} results, {dives} dives")
+    print(f"Best of {args.repeat}: {min(timings):.3f}s, mean {sum(timings) / len(timings):.3f}s")
+
+    if profiles is not None:
+        # Profiled timings include profiler overhead, compare them with each other rather than with the timings above
+        output = io.StringIO()
+        stats = pstats.Stats(main_profiler, stream=output)
+        for profiler in profiles:
+            stats.add(profiler)
+        stats.sort_stats('tottime').print_stats(25)
+        print(output.getvalue())
+
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Synthetic DiveMeets pages for the parser benchmarks.
+
+The pages follow the structure of the live team, profile and dive-sheet pages and include the
+markup variations seen in the wild (entities, line breaks inside cells, missing cells, single-day
+meets, different attribute quoting, page chrome with comments, scripts and styles).
+"""
+import random
+from typing import List, Tuple
+
+EVENTS = [
+    ('1M Springboard (6 Dives)', 'Prelims'),
+    ('1M Springboard (11 Dives)', 'Finals'),
+    ('3M Springboard (6 Dives)', 'Semi-Finals'),
+    ('Platform (6 Dives)', ''),
+]
+DIVES = [('101B', 'Forward Dive Pike'), ('201C', 'Back Dive Tuck'), ('301B', 'Reverse Dive Pike'),
+         ('401C', 'Inward Dive Tuck'), ('5132D', 'Forward 1 1/2 Somersaults 1 Twist Free'),
+         ('105C', 'Forward 2 1/2 Somersaults Tuck')]
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def page_chrome(body: str, title: str) -> str:
+    """Wrap a page body in a header and footer with the comments, scripts and styles of the live site"""
+    return (f'<!DOCTYPE html>\n<html><head><title>{title}</title>\n'
+            f'<meta name="description" content="Results &amp; profiles">\n'
+            f'<style type="text/css">td > a {{ color: #003366; }} /* <table> */</style>\n'
+            f'<script type="text/javascript">\n'
+            f'if (window.top !== window && 1 < 2) {{ document.write("<b>"); }}\n</script>\n'
+            f'</head><body>\n<!-- header: Date: Jan 1, 2000 -->\n'
+            f'<div id="nav" onclick="return a > b"><a href="index.php">Home</a> | '
+            f'<a href="search.php">Search</a></div>\n'
+            f'{body}\n<!-- footer -->\n<div id="footer">&copy; DiveMeets</div>\n'
+            f'<script>var _gaq = _gaq || []; _gaq.push(["_trackPageview"]);</script>\n</body></html>')
+
+
+def team_page(rng: random.Random, divers: int) -> str:
+    links = []
+    for i in range(divers):
+        links.append(f'<tr><td><a href="profile.php?number={10000 + i}">Diver {i} Lastname</a></td>'
+                     f'<td>Pittsburgh, PA</td></tr>')
+    links.append('<tr><td><a href="profile.php?number=99999">PITT DIVING TEAM</a></td></tr>')
+    return (f'<html><head><title>Team</title></head><body><table width="100%">{"".join(links)}</table>'
+            f'</body></html>')
+
+
+def profile_page(rng: random.Random, diver_number: int, meets: int) -> str:
+    rows = ['<tr><td colspan="3"><strong>Dive History</strong></td></tr>']
+    for meet in range(meets):
+        rows.append(f'<tr><td colspan="3"><strong>Meet {meet} &amp; Invitational {2015 + meet % 10}</strong></td></tr>')
+        for event, round_type in rng.sample(EVENTS, rng.randint(1, len(EVENTS))):
+            label = f'{event} - {round_type}' if round_type else event
+            href = f'divesheetresultsext.php?dvrnum={diver_number}&amp;meetnum={meet}&amp;eventnum={rng.randint(1, 9)}'
+            rows.append(f'<tr><td>&nbsp;&nbsp;{label}</td><td>{rng.randint(1, 30)}</td>'
+                        f'<td><a href="{href}">{rng.uniform(150, 450):.2f}</a></td></tr>')
+    return f'''<html><head><title>DiveMeets</title></head><body>
+<table><tr><td>
+Name: Diver {diver_number} Lastname<br>
+City/State: Pittsburgh, PA<br>
+Country: US<br>
+Gender: {rng.choice(["M", "F"])}<br>
+Age: {rng.randint(17, 23)}<br>
+FINA Age: {rng.randint(18, 24)}<br>
+High School Graduation: {rng.randint(2018, 2024)}<br>
+</td></tr></table>
+<table width="100%">{"".join(rows)}</table>
+</body></html>'''
+
+
+def dive_sheet_page(rng: random.Random, dives: int, variant: int = 0) -> str:
+    month = rng.choice(MONTHS)
+    day = rng.randint(1, 25)
+    year = rng.randint(2015, 2025)
+    if variant % 3 == 0:
+        date = f'Date: {month} {day}, {year} to {month} {day + 2}, {year}'
+    elif variant % 3 == 1:
+        date = f'Date: <strong>{month} {day}, {year}</strong>'
+    else:
+        date = f'Date: {month} {day}, {year}'
+
+    quote = '"' if variant % 2 == 0 else "'"
+    rows = ['<tr><td>Round</td><td>Dive</td><td>Description</td><td>Ht</td><td>DD</td>'
+            + ''.join(f'<td>J{j}</td>' for j in range(1, 10))
+            + '<td>Net</td><td>Award</td><td>Place</td></tr>']
+    for dive_round in range(1, dives + 1):
+        code, description = rng.choice(DIVES)
+        scores = []
+        for _ in range(rng.choice([5, 7, 9])):
+            score = rng.choice([4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5])
+            # Dropped scores are marked by the site with extra markup after the number
+            scores.append(f'{score}<br><small>x</small>' if rng.random() < 0.2 else f'&nbsp;{score}')
+        scores += [''] * (9 - len(scores))
+        cells = [f'{dive_round}', code, description.replace(' ', '&nbsp;', 1), rng.choice(['1M', '3M', '10M']),
+                 f'{rng.choice([1.3, 1.6, 2.0, 2.4, 3.1])}<br><span>{rng.choice(["A", "B"])}</span>']
+        cells += scores
+        cells += [f'{rng.uniform(20, 80):.2f}', f'{rng.uniform(20, 80):.2f}', f'{rng.randint(1, 30)}']
+        if variant % 5 == 4 and dive_round == dives:
+            # Truncated row, missing the award and place cells
+            cells = cells[:15]
+        rows.append('<tr>' + ''.join(f'<td align="center">{cell}</td>' for cell in cells) + '</tr>')
+    rows.append('<tr><td colspan="14">Totals</td><td>300.00</td></tr>')
+    body = (f'<table width="100%"><tr><td><b>Meet Results</b><br>{date}<br>'
+            f'<table border={quote}1{quote} width={quote}650{quote} cellpadding="2">{"".join(rows)}</table>'
+            f'</td></tr></table>')
+    if variant % 4 == 3:
+        return page_chrome(body, 'Dive Sheet')
+    return f'<html><head><title>Dive Sheet</title></head><body>{body}</body></html>'
+
+
+def build_corpus(seed: int = 7, size: int = 40) -> Tuple[List[str], List[str], List[str]]:
+    """Return (team pages, profile pages, dive-sheet pages)"""
+    rng = random.Random(seed)
+    teams = [team_page(rng, rng.randint(10, 60)) for _ in range(max(1, size // 10))]
+    profiles = [profile_page(rng, 10000 + i, rng.randint(1, 40)) for i in range(size)]
+    sheets = [dive_sheet_page(rng, rng.choice([6, 11]), variant=i) for i in range(size * 3)]
+    return teams, profiles, sheets
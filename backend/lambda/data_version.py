@@ -0,0 +1,89 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Optional
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# ImportState item counting the imports that changed stored data
+DATA_VERSION_KEY = 'data_version'
+
+# How long readers trust the version they read last
+DEFAULT_CHECK_SECONDS = 30
+
+
+def bump_data_version(table_name: str = None) -> Optional[int]:
+    """
+    Increment the data version after an import wrote rows, so API containers drop their cached responses.
+
+    Returns the new version, or None when no ImportState table is configured or the update failed.
+    """
+    import boto3
+
+    table_name = table_name or os.environ.get('IMPORT_STATE_TABLE_NAME')
+    if not table_name:
+        return None
+    try:
+        response = boto3.client('dynamodb').update_item(
+            TableName=table_name,
+            Key={'state_key': {'S': DATA_VERSION_KEY}},
+            UpdateExpression='ADD version :one SET updated_at = :now',
+            ExpressionAttributeValues={
+                ':one': {'N': '1'},
+                ':now': {'S': datetime.now(timezone.utc).isoformat()}
+            },
+            ReturnValues='UPDATED_NEW'
+        )
+        return int(response['Attributes']['version']['N'])
+    except Exception as e:
+        logger.warning(f"Could not bump the data version: {e}")
+        return None
+
+
+class DataVersion:
+    """
+    The current data version as seen by a reader, read from the ImportState table at most once every
+    check_seconds. current() returns None when the version is unknown (no table, never imported, read failed).
+    """
+
+    def __init__(self, table_name: str, check_seconds: float = DEFAULT_CHECK_SECONDS):
+        import boto3
+
+        self.table_name = table_name
+        self.check_seconds = check_seconds
+        self.client = boto3.client('dynamodb')
+        self.version: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.lock = Lock()
+
+    def current(self) -> Optional[int]:
+        with self.lock:
+            now = time.monotonic()
+            if self.checked_at is None or now - self.checked_at >= self.check_seconds:
+                self.version = self._read()
+                self.checked_at = now
+            return self.version
+
+    def _read(self) -> Optional[int]:
+        try:
+            response = self.client.get_item(
+                TableName=self.table_name,
+                Key={'state_key': {'S': DATA_VERSION_KEY}},
+                ProjectionExpression='version'
+            )
+            item = response.get('Item')
+            return int(item['version']['N']) if item else None
+        except Exception as e:
+            logger.warning(f"Could not read the data version: {e}")
+            return None
+
+
+def create_data_version() -> Optional[DataVersion]:
+    """The DataVersion of the IMPORT_STATE_TABLE_NAME table, None when it is not configured"""
+    table_name = os.environ.get('IMPORT_STATE_TABLE_NAME')
+    if not table_name:
+        return None
+    return DataVersion(table_name, float(os.environ.get('DATA_VERSION_CHECK_SECONDS', DEFAULT_CHECK_SECONDS)))
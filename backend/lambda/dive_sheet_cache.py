@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, Any, Iterable, Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Bump when parse_dive_sheet changes its output so old entries are ignored
+CACHE_VERSION = 1
+
+
+def normalize_detail_href(detail_href: str) -> str:
+    """
+    Normalize a result's detail_href so the same dive sheet always maps to the same cache key.
+
+    Both the results and the final dive-sheet links point at the same sheet, so the href is rewritten
+    to divesheetfinal.php, stripped of leading slashes and its query parameters are sorted.
+    """
+    href = detail_href.strip().replace('divesheetresultsext.php', 'divesheetfinal.php')
+    parts = urlsplit(href)
+    path = parts.path.lstrip('/')
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{path}?{query}" if query else path
+
+
+def is_final_dive_sheet(dive_sheet: Dict[str, Any]) -> bool:
+    """A dive sheet is final (and safe to cache forever) once the meet's end date has passed"""
+    end_date = dive_sheet.get('end_date')
+    if not end_date or not dive_sheet.get('dives'):
+        return False
+    return end_date < datetime.now(timezone.utc).date().isoformat()
+
+
+class DiveSheetCache:
+    """Base class for persistent dive-sheet caches keyed by normalized detail_href"""
+
+    def __init__(self):
+        self._stats_lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def _cache_key(detail_href: str) -> str:
+        return f"v{CACHE_VERSION}#{normalize_detail_href(detail_href)}"
+
+    def get_many(self, detail_hrefs: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return cached dive sheets for the given hrefs, keyed by the original href"""
+        href_by_key = {self._cache_key(href): href for href in detail_hrefs}
+        if not href_by_key:
+            return {}
+
+        try:
+            found = self._load(list(href_by_key))
+        except Exception as e:
+            logger.warning(f"Dive sheet cache lookup failed: {e}")
+            found = {}
+
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(href_by_key) - len(found)
+
+        return {href_by_key[key]: sheet for key, sheet in found.items()}
+
+    def put(self, detail_href: str, dive_sheet: Dict[str, Any]) -> bool:
+        """Store a parsed dive sheet if it is final. Returns True when the sheet was cached."""
+        if not is_final_dive_sheet(dive_sheet):
+            return False
+
+        try:
+            self._store(self._cache_key(detail_href), json.dumps(dive_sheet))
+        except Exception as e:
+            logger.warning(f"Dive sheet cache write failed for {detail_href}: {e}")
+            return False
+
+        with self._stats_lock:
+            self.writes += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+    def _load(self, keys: list) -> Dict[str, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _store(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+
+class DynamoDBDiveSheetCache(DiveSheetCache):
+    """Dive-sheet cache stored in a DynamoDB table with a `sheet_key` string partition key"""
+
+    def __init__(self, table_name: str):
+        super().__init__()
+        import boto3
+
+        self.table_name = table_name
+        # Low-level clients are thread-safe, the cache is shared by all scraper threads
+        self.client = boto3.client('dynamodb')
+
+    def _load(self, keys: list) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        # BatchGetItem accepts at most 100 keys per request
+        for start in range(0, len(keys), 100):
+            request_items = {
+                self.table_name: {
+                    'Keys': [{'sheet_key': {'S': key}} for key in keys[start:start + 100]],
+                    'ProjectionExpression': 'sheet_key, sheet'
+                }
+            }
+            while request_items:
+                response = self.client.batch_get_item(RequestItems=request_items)
+                for item in response.get('Responses', {}).get(self.table_name, []):
+                    found[item['sheet_key']['S']] = json.loads(item['sheet']['S'])
+                request_items = response.get('UnprocessedKeys') or None
+        return found
+
+    def _store(self, key: str, value: str) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'sheet_key': {'S': key},
+                'sheet': {'S': value},
+                'cached_at': {'S': datetime.now(timezone.utc).isoformat()}
+            }
+        )
+
+
+class SQLiteDiveSheetCache(DiveSheetCache):
+    """Dive-sheet cache stored in a local SQLite file, used for local runs and tests"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._db_lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self._db_lock:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS dive_sheets (sheet_key TEXT PRIMARY KEY, sheet TEXT, cached_at TEXT)'
+            )
+            self.connection.commit()
+
+    def _load(self, keys: list) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        with self._db_lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                rows = self.connection.execute(
+                    f'SELECT sheet_key, sheet FROM dive_sheets WHERE sheet_key IN ({placeholders})', chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+        return found
+
+    def _store(self, key: str, value: str) -> None:
+        with self._db_lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO dive_sheets (sheet_key, sheet, cached_at) VALUES (?, ?, ?)',
+                (key, value, datetime.now(timezone.utc).isoformat())
+            )
+            self.connection.commit()
+
+
+def create_dive_sheet_cache() -> Optional[DiveSheetCache]:
+    """
+    Build the dive-sheet cache configured through the environment.
+
+    DIVE_SHEET_CACHE_TABLE_NAME selects the DynamoDB backend, DIVE_SHEET_CACHE_PATH the SQLite backend.
+    Returns None when no cache is configured.
+    """
+    table_name = os.environ.get('DIVE_SHEET_CACHE_TABLE_NAME')
+    if table_name:
+        return DynamoDBDiveSheetCache(table_name)
+
+    path = os.environ.get('DIVE_SHEET_CACHE_PATH')
+    if path:
+        return SQLiteDiveSheetCache(path)
+
+    return None
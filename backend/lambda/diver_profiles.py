@@ -0,0 +1,173 @@
+import base64
+import gzip
+import json
+import os
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from dynamodb_change_detection import HASH_ATTRIBUTE, content_hash
+
+# Bump whenever the document shape changes, readers fall back to live assembly for other formats and
+# the import's fingerprints change with it, so every diver's document is rebuilt by the next import
+PROFILE_DOCUMENT_FORMAT = 2
+
+# Documents are only stored well below DynamoDB's 400 KB item limit
+MAX_DOCUMENT_BYTES = 350 * 1024
+
+# Largest page of results the profile API returns
+MAX_PAGE_SIZE = 100
+
+
+def decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def format_diver(diver: Dict[str, Any]) -> Dict[str, Any]:
+    """The profile fields of the diver profile API for a Divers item"""
+    return {
+        "id": str(diver['diver_id']),
+        "name": diver.get('name', ''),
+        "gender": diver.get('gender', ''),
+        "age": int(diver.get('age', 0)) if diver.get('age') else None,
+        "fina_age": int(diver.get('fina_age', 0)) if diver.get('fina_age') else None,
+        "city_state": diver.get('city_state', ''),
+        "country": diver.get('country', ''),
+        "hs_grad_year": int(diver.get('hs_grad_year', 0)) if diver.get('hs_grad_year') else None
+    }
+
+
+def format_dives(dive_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The dives of a result as the diver profile API returns them, sorted by round"""
+    dives = []
+    for dive_item in dive_items:
+        dive = {
+            "code": dive_item.get('code', ''),
+            "description": dive_item.get('description', ''),
+            "difficulty": float(dive_item.get('difficulty', 0)) if dive_item.get('difficulty') else 0,
+            "award": float(dive_item.get('award', 0)) if dive_item.get('award') else 0,
+            "round_place": int(dive_item.get('round_place', 0)) if dive_item.get('round_place') else None,
+            "scores": [float(score) for score in dive_item.get('scores', []) if score is not None],
+            "dive_round": dive_item.get('dive_round', ''),
+            "height": dive_item.get('height', ''),
+            "net_total": float(dive_item.get('net_total', 0)) if dive_item.get('net_total') else 0
+        }
+        dives.append(dive)
+
+    dives.sort(key=lambda x: x.get('dive_round', '0'))
+    return dives
+
+
+def format_result(result_item: Dict[str, Any], dives: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """A result of the diver profile API for a Results item and its formatted dives"""
+    return {
+        "result_id": result_item.get('competition_event_key', ''),
+        "meet_name": result_item.get('meet_name', ''),
+        "event_name": result_item.get('event_name', ''),
+        "round_type": result_item.get('round_type', ''),
+        "start_date": result_item.get('start_date', ''),
+        "end_date": result_item.get('end_date', ''),
+        "total_score": float(result_item.get('total_score', 0)) if result_item.get('total_score') else 0,
+        "detail_href": result_item.get('detail_href', ''),
+        "dives": dives
+    }
+
+
+def sort_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort results by start_date (the most recent first), results of the same day by result_id"""
+    results.sort(key=lambda x: x.get('result_id', ''))
+    results.sort(key=lambda x: x.get('start_date') or '', reverse=True)
+    return results
+
+
+def encode_cursor(result: Dict[str, Any]) -> str:
+    """The cursor of the page following the given result"""
+    position = [result.get('start_date') or '', result.get('result_id', '')]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """The (start_date, result_id) position of a cursor, raises ValueError for malformed cursors"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    # Only the list encode_cursor writes, a two-key object (e.g. another endpoint's cursor) would unpack too
+    if not isinstance(position, list) or len(position) != 2 or not all(isinstance(value, str) for value in position):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    start_date, result_id = position
+    return start_date, result_id
+
+
+def page_results(results: List[Dict[str, Any]], limit: int,
+                 cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return one page of results sorted by sort_results.
+
+    The cursor holds the position of the last result returned, so results added or removed by an import
+    between two requests do not shift the following pages.
+
+    Returns:
+        The page and the cursor of the next page (None after the last page)
+    """
+    start = 0
+    if cursor:
+        start_date, result_id = decode_cursor(cursor)
+        start = len(results)
+        for i, result in enumerate(results):
+            result_date = result.get('start_date') or ''
+            if result_date < start_date or (result_date == start_date and result.get('result_id', '') > result_id):
+                start = i
+                break
+
+    page = results[start:start + limit]
+    next_cursor = encode_cursor(page[-1]) if page and start + limit < len(results) else None
+    return page, next_cursor
+
+
+def encode_profile(profile: Dict[str, Any]) -> str:
+    return json.dumps(profile, default=decimal_default)
+
+
+def build_profile_item(diver_id: int, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Build the DiverProfiles item holding a diver's materialized profile response.
+
+    The response body is stored gzip-compressed, so the API can serve it without re-encoding. Returns None
+    when the compressed document would be too large for an item.
+    """
+    body = encode_profile(profile)
+    # mtime=0 keeps the compressed bytes identical for identical documents
+    document = gzip.compress(body.encode('utf-8'), mtime=0)
+    if len(document) > MAX_DOCUMENT_BYTES:
+        return None
+
+    return {
+        'diver_id': diver_id,
+        'document_format': PROFILE_DOCUMENT_FORMAT,
+        'document': document,
+        'result_count': len(profile.get('results', [])),
+        HASH_ATTRIBUTE: content_hash({'format': PROFILE_DOCUMENT_FORMAT, 'body': body}),
+    }
+
+
+def build_stale_profile_item(diver_id: int) -> Dict[str, Any]:
+    """A DiverProfiles item telling readers to assemble the profile live, e.g. when dives are missing"""
+    return {'diver_id': diver_id, 'document_format': PROFILE_DOCUMENT_FORMAT, 'stale': True}
+
+
+def read_profile_document(item: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The stored response body of a DiverProfiles item, or None when it is missing, stale or of another format"""
+    if not item or item.get('stale') or 'document' not in item:
+        return None
+    if int(item.get('document_format', 0)) != PROFILE_DOCUMENT_FORMAT:
+        return None
+    document = item['document']
+    # boto3 returns Binary attributes wrapped, its value is the raw bytes
+    return gzip.decompress(getattr(document, 'value', document)).decode('utf-8')
+
+
+def profiles_table_name() -> Optional[str]:
+    """Materialized profiles are optional, they are only written and read when the table is configured"""
+    return os.environ.get('DIVER_PROFILES_TABLE_NAME') or None
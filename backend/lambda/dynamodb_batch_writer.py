@@ -0,0 +1,195 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, BoundedSemaphore
+from typing import Dict, Any, List, Optional
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# BatchWriteItem accepts at most 25 put requests per call
+BATCH_SIZE = 25
+RETRYABLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+}
+
+
+def backoff(attempt: int, base_delay: float = 0.05, max_delay: float = 5.0) -> None:
+    """Sleep before retry attempt + 1: exponential backoff with full jitter, capped at max_delay seconds"""
+    time.sleep(random.uniform(0, min(max_delay, base_delay * (2 ** attempt))))
+
+
+class ParallelBatchWriter:
+    """
+    Buffer DynamoDB puts per table and write them with BatchWriteItem from a bounded worker pool.
+
+    Batches for different tables are written concurrently. UnprocessedItems and throttling errors are
+    retried with exponential backoff and full jitter. Items are tagged by the caller (e.g. with a diver ID)
+    so callers can tell which logical records had writes that failed for good.
+
+    Usage:
+        with ParallelBatchWriter(dynamodb, {'Divers': ['diver_id']}) as writer:
+            writer.put('Divers', item, tag=diver_id)
+        print(writer.stats())
+    """
+
+    def __init__(self, dynamodb, key_names: Dict[str, List[str]], max_workers: int = 4,
+                 max_retries: int = 8, base_delay: float = 0.05, max_delay: float = 5.0, metrics=None):
+        """
+        Args:
+            dynamodb: boto3 DynamoDB resource, its client handles Python to DynamoDB type conversion
+            key_names: Primary key attribute names per table, used to de-duplicate items within a batch
+            max_workers: Number of batches written concurrently
+            max_retries: Retries per batch before its remaining items are counted as failed
+            base_delay: Initial backoff delay in seconds
+            max_delay: Upper bound of the backoff delay in seconds
+            metrics: Optional ImportMetrics, each BatchWriteItem call is timed as a dynamodb_write stage
+        """
+        self.client = dynamodb.meta.client
+        self.key_names = key_names
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = metrics
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Bound queued batches so producers slow down instead of buffering the whole dataset
+        self.in_flight = BoundedSemaphore(max_workers * 2)
+        self.futures = []
+
+        self.lock = Lock()
+        self.buffers: Dict[str, Dict[tuple, tuple]] = {}
+        self.failed_tags = set()
+        self.table_stats: Dict[str, Dict[str, int]] = {}
+        self.retries = 0
+        self.batches = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _table_stats(self, table_name: str) -> Dict[str, int]:
+        if table_name not in self.table_stats:
+            self.table_stats[table_name] = {'written': 0, 'failed': 0}
+        return self.table_stats[table_name]
+
+    def put(self, table_name: str, item: Dict[str, Any], tag: Any = None) -> None:
+        """Queue an item for writing. A full batch is handed to the worker pool right away."""
+        key = tuple(item.get(name) for name in self.key_names.get(table_name, []))
+
+        with self.lock:
+            buffer = self.buffers.setdefault(table_name, {})
+            # A later put of the same key replaces the queued one, duplicates would fail the whole batch
+            buffer[key] = (item, tag)
+            if len(buffer) < BATCH_SIZE:
+                return
+            batch = list(buffer.values())
+            buffer.clear()
+
+        self._submit(table_name, batch)
+
+    def flush(self) -> None:
+        """Write all buffered items and wait for every queued batch to finish"""
+        with self.lock:
+            pending = [(table_name, list(buffer.values())) for table_name, buffer in self.buffers.items() if buffer]
+            for buffer in self.buffers.values():
+                buffer.clear()
+
+        for table_name, batch in pending:
+            self._submit(table_name, batch)
+
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self.flush()
+        self.executor.shutdown(wait=True)
+        self.finished_at = time.time()
+
+    def _submit(self, table_name: str, batch: List[tuple]) -> None:
+        self.in_flight.acquire()
+        future = self.executor.submit(self._write_batch, table_name, batch)
+        future.add_done_callback(lambda _: self.in_flight.release())
+        with self.lock:
+            self.futures.append(future)
+
+    def _backoff(self, attempt: int) -> None:
+        backoff(attempt, self.base_delay, self.max_delay)
+
+    def _batch_write_item(self, table_name: str, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.metrics is None:
+            return self.client.batch_write_item(RequestItems={table_name: requests})
+        with self.metrics.timer('dynamodb_write', table=table_name):
+            return self.client.batch_write_item(RequestItems={table_name: requests})
+
+    def _write_batch(self, table_name: str, batch: List[tuple]) -> None:
+        tags_by_key = {}
+        requests = []
+        for item, tag in batch:
+            tags_by_key[tuple(item.get(name) for name in self.key_names.get(table_name, []))] = tag
+            requests.append({'PutRequest': {'Item': item}})
+
+        attempt = 0
+        while requests:
+            try:
+                response = self._batch_write_item(table_name, requests)
+                unprocessed = response.get('UnprocessedItems', {}).get(table_name, [])
+                written = len(requests) - len(unprocessed)
+                with self.lock:
+                    self.batches += 1
+                    self._table_stats(table_name)['written'] += written
+                requests = unprocessed
+            except ClientError as e:
+                if e.response['Error']['Code'] not in RETRYABLE_ERROR_CODES:
+                    logger.error(f"Batch write to {table_name} failed: {e}")
+                    break
+                logger.warning(f"Batch write to {table_name} throttled: {e}")
+            except Exception as e:
+                logger.error(f"Batch write to {table_name} failed: {e}")
+                break
+
+            if not requests:
+                return
+
+            if attempt >= self.max_retries:
+                break
+            with self.lock:
+                self.retries += 1
+            self._backoff(attempt)
+            attempt += 1
+
+        # Whatever is left could not be written
+        logger.error(f"Giving up on {len(requests)} items for {table_name}")
+        with self.lock:
+            self._table_stats(table_name)['failed'] += len(requests)
+            for request in requests:
+                item = request['PutRequest']['Item']
+                tag = tags_by_key.get(tuple(item.get(name) for name in self.key_names.get(table_name, [])))
+                if tag is not None:
+                    self.failed_tags.add(tag)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            written = sum(table['written'] for table in self.table_stats.values())
+            failed = sum(table['failed'] for table in self.table_stats.values())
+            return {
+                'items_written': written,
+                'items_failed': failed,
+                'batches': self.batches,
+                'retries': self.retries,
+                'elapsed_seconds': round(elapsed, 3),
+                'items_per_second': round(written / elapsed, 1) if elapsed > 0 else 0.0,
+                'tables': {name: dict(table) for name, table in self.table_stats.items()},
+            }
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+from decimal import Decimal
+from typing import Dict, Any, Iterable, List, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+HASH_ATTRIBUTE = 'content_hash'
+
+# Attributes that change on every write without the content changing
+IGNORED_ATTRIBUTES = {'last_updated', HASH_ATTRIBUTE}
+
+
+def canonical_number(value: Any) -> Any:
+    """
+    The value with numbers replaced by their exact decimal value as a string, in dicts and lists too.
+
+    DynamoDB returns every number as a Decimal with its trailing zeros dropped, while freshly built items hold
+    ints, floats or Decimals such as Decimal('54.0'), so numbers are hashed by value rather than by type.
+    """
+    if isinstance(value, dict):
+        return {k: canonical_number(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical_number(v) for v in value]
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+        return value
+    # str() of a float is the shortest repr, the same digits convert_to_decimal stores
+    number = Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+    return format(number.normalize() if number else Decimal(0), 'f')
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """Compact hash of an item's content, ignoring bookkeeping attributes such as last_updated"""
+    content = {k: canonical_number(v) for k, v in item.items() if k not in IGNORED_ATTRIBUTES}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def with_content_hash(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Store the item's content hash on the item itself and return it"""
+    item[HASH_ATTRIBUTE] = content_hash(item)
+    return item
+
+
+def combine_hashes(hashes: Iterable[Tuple[str, str]]) -> str:
+    """Hash a set of (key, content hash) pairs, e.g. all dives of a result, independent of their order"""
+    encoded = json.dumps(sorted(hashes), separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def query_hashes(client, table_name: str, partition_key: str, partition_value: Any, sort_key: str,
+                 attributes: List[str] = None) -> Dict[Any, Dict[str, Any]]:
+    """
+    Load the content hash (and optional extra attributes) of every item in one partition.
+
+    Returns:
+        Dict mapping the sort key value to the projected item
+    """
+    names = {'#pk': partition_key, '#sk': sort_key}
+    projection = ['#sk', HASH_ATTRIBUTE]
+    for index, attribute in enumerate(attributes or []):
+        names[f'#a{index}'] = attribute
+        projection.append(f'#a{index}')
+
+    query = {
+        'TableName': table_name,
+        'KeyConditionExpression': '#pk = :pk',
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': {':pk': partition_value},
+        'ProjectionExpression': ', '.join(projection),
+    }
+
+    found = {}
+    while True:
+        response = client.query(**query)
+        for item in response.get('Items', []):
+            found[item[sort_key]] = item
+        if 'LastEvaluatedKey' not in response:
+            return found
+        query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def batch_get_hashes(client, table_name: str, key_names: List[str],
+                     keys: Iterable[Tuple]) -> Dict[Tuple, str]:
+    """
+    Load the content hashes of specific items with BatchGetItem.
+
+    Returns:
+        Dict mapping each found key tuple to its stored hash (None for items written before hashing)
+    """
+    keys = list(dict.fromkeys(keys))
+    names = {f'#k{index}': name for index, name in enumerate(key_names)}
+    projection = ', '.join(list(names) + [HASH_ATTRIBUTE])
+
+    found = {}
+    # BatchGetItem accepts at most 100 keys per request
+    for start in range(0, len(keys), 100):
+        request_items = {
+            table_name: {
+                'Keys': [dict(zip(key_names, key)) for key in keys[start:start + 100]],
+                'ProjectionExpression': projection,
+                'ExpressionAttributeNames': names,
+            }
+        }
+        while request_items:
+            response = client.batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(table_name, []):
+                found[tuple(item[name] for name in key_names)] = item.get(HASH_ATTRIBUTE)
+            request_items = response.get('UnprocessedKeys') or None
+    return found
@@ -0,0 +1,277 @@
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Lock, BoundedSemaphore, Condition
+from typing import Dict, Any, Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from page_archive import PageArchive
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Responses that mean the remote site is overloaded and the request may succeed later
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RequestBudgetExceeded(Exception):
+    """Raised when a run has used up its request budget"""
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter.
+
+    The limit grows by roughly one slot per window of successful, fast responses and is halved on
+    errors, throttling or responses slower than latency_target. Decreases are spaced by a cooldown so
+    a burst of failures from the same congestion event only halves the limit once.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int = 1, max_limit: int = 16,
+                 latency_target: float = 2.0, cooldown: float = 1.0, window: int = 500):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+
+        self.condition = Condition()
+        self.active = 0
+        self.last_decrease = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.active >= int(self.limit):
+                self.condition.wait()
+            self.active += 1
+
+    def release(self) -> None:
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        with self.condition:
+            self.latencies.append(latency)
+            if latency > self.latency_target:
+                self._decrease()
+            else:
+                # Additive increase: about +1 after `limit` fast responses
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.condition.notify_all()
+
+    def on_failure(self, latency: Optional[float] = None) -> None:
+        with self.condition:
+            if latency is not None:
+                self.latencies.append(latency)
+            self._decrease()
+
+    def _decrease(self) -> None:
+        now = time.time()
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit / 2)
+        logger.info(f"Reducing request concurrency to {int(self.limit)}")
+
+    def percentiles(self) -> Dict[str, float]:
+        with self.condition:
+            samples = sorted(self.latencies)
+        if not samples:
+            return {'p50': 0.0, 'p90': 0.0, 'p99': 0.0}
+
+        def pick(fraction: float) -> float:
+            return round(1000 * samples[min(len(samples) - 1, int(fraction * len(samples)))], 1)
+
+        return {'p50': pick(0.50), 'p90': pick(0.90), 'p99': pick(0.99)}
+
+
+class FetchEngine:
+    """
+    Shared HTTP fetcher for the scraper.
+
+    All requests of a run go through one connection pool and are limited by a single adaptive global
+    in-flight budget plus a per-host budget, instead of every diver opening its own session and thread pool.
+    Dive-sheet fetches run on one shared worker pool sized to the maximum budget, so the scraper is a
+    single task graph: team page -> profile pages (diver workers) -> dive sheets (shared sheet workers).
+
+    Transient failures (connection errors, timeouts, 429 and 5xx) are retried with jittered exponential
+    backoff, honouring Retry-After. Every attempt counts against the run's request budget.
+
+    With an archive, every fetched page is also stored in it. In replay mode pages are served from the
+    archive only and no network request is made.
+
+    get() mirrors requests.Session.get so the fetch helpers can use either.
+    """
+
+    def __init__(self, headers: Dict[str, str] = None, max_in_flight: int = 16, max_per_host: int = 12,
+                 timeout: float = 30, connect_timeout: float = 5, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_cap: float = 10.0, max_requests: int = None,
+                 latency_target: float = 2.0, archive: PageArchive = None, replay: bool = False,
+                 replay_as_of: str = None):
+        if replay and archive is None:
+            raise ValueError("Replay mode needs a page archive")
+
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_requests = max_requests
+        self.archive = archive
+        self.replay = replay
+        self.replay_as_of = replay_as_of
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_in_flight)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Start at half the budget and let the limiter find the rate the site can take
+        self.limiter = AdaptiveLimiter(max(1, max_in_flight // 2), max_limit=max_in_flight,
+                                       latency_target=latency_target)
+        self.host_limits: Dict[str, BoundedSemaphore] = {}
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='fetch')
+
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.bytes = 0
+        self.active = 0
+        self.peak_active = 0
+        self.replayed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def _host_limit(self, url: str) -> BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = BoundedSemaphore(self.max_per_host)
+            return self.host_limits[host]
+
+    def _use_budget(self) -> None:
+        with self.lock:
+            if self.max_requests is not None and self.requests >= self.max_requests:
+                raise RequestBudgetExceeded(f"Request budget of {self.max_requests} requests used up")
+            self.requests += 1
+
+    def _backoff_delay(self, attempt: int, response: requests.Response = None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_cap, float(retry_after))
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _attempt(self, url: str, headers: Optional[Dict[str, str]], timeout: float) -> requests.Response:
+        self._use_budget()
+        with self.limiter, self._host_limit(url):
+            with self.lock:
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+            start = time.time()
+            try:
+                response = self.session.get(url, headers=headers, timeout=(self.connect_timeout, timeout))
+            except (requests.ConnectionError, requests.Timeout):
+                self.limiter.on_failure(time.time() - start)
+                raise
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+            latency = time.time() - start
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                self.limiter.on_failure(latency)
+            else:
+                self.limiter.on_success(latency)
+            return response
+
+    def get(self, url: str, headers: Dict[str, str] = None, timeout: float = None) -> requests.Response:
+        """GET a URL within the in-flight limits, retrying transient failures"""
+        if self.replay:
+            response = self.archive.load(url, self.replay_as_of)
+            with self.lock:
+                self.replayed += 1
+                self.bytes += len(response.content)
+            return response
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self._attempt(url, headers, timeout or self.timeout)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+                failure = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                failure = str(e)
+                if attempt >= self.max_retries:
+                    with self.lock:
+                        self.errors += 1
+                    raise
+
+            if attempt >= self.max_retries:
+                break
+
+            # The slot is released while sleeping so other requests can proceed
+            delay = self._backoff_delay(attempt, response)
+            logger.warning(f"Retrying {url} in {delay:.2f}s after {failure}")
+            with self.lock:
+                self.retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+        with self.lock:
+            self.bytes += len(response.content)
+            if response.status_code >= 400:
+                self.errors += 1
+
+        if self.archive:
+            self.archive.save(url, response.status_code, response.text, response.encoding)
+        return response
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run a fetch task on the shared worker pool"""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = {
+                'requests': self.requests,
+                'retries': self.retries,
+                'errors': self.errors,
+                'bytes': self.bytes,
+                'peak_in_flight': self.peak_active,
+                'request_budget': self.max_requests,
+                'replayed': self.replayed,
+            }
+        stats['concurrency_limit'] = int(self.limiter.limit)
+        stats['latency_ms'] = self.limiter.percentiles()
+        if self.archive:
+            stats['archive'] = self.archive.stats()
+        return stats
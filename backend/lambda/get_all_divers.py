@@ -5,7 +5,14 @@ from typing import Dict, Any
 
 import boto3
 
+from http_responses import error_response, json_response
+from roster_snapshot import filter_roster, page_roster, read_roster_snapshot, scan_roster
+
 dynamodb = boto3.resource('dynamodb')
+dynamodb_client = boto3.client('dynamodb')
+
+# Largest page of divers returned at once
+MAX_PAGE_SIZE = 500
 
 
 def decimal_default(obj):
@@ -14,52 +21,56 @@ def decimal_default(obj):
     raise TypeError
 
 
+def load_roster():
+    """The roster snapshot written by the last import, or a scan of the Divers table when there is none"""
+    state_table_name = os.environ.get('IMPORT_STATE_TABLE_NAME')
+    if state_table_name:
+        try:
+            roster = read_roster_snapshot(dynamodb_client, state_table_name)
+            if roster is not None:
+                return roster
+        except Exception as e:
+            print(f"Error reading the roster snapshot: {str(e)}")
+
+    return scan_roster(dynamodb.Table(os.environ['DIVERS_TABLE_NAME']))
+
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Return the divers sorted by name.
+
+    Query parameters (all optional):
+        prefix: Only divers whose name (or one of its words) starts with it, ignoring case
+        limit: Return only this many divers, wrapped with the next_cursor and the total
+        cursor: The next_cursor of the previous page
+
+    Without limit and cursor the response is the plain list of divers.
+    """
     try:
-        table_name = os.environ['DIVERS_TABLE_NAME']
-        table = dynamodb.Table(table_name)
-
-        # Scan the table to get all divers
-        response = table.scan()
-        items = response['Items']
-
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
-
-        divers = []
-        for item in items:
-            diver = {
-                "id": str(item.get('diver_id', '')),
-                "name": item.get('name', ''),
-                "gender": item.get('gender', ''),
-                "age": item.get('age'),
-                "city_state": item.get('city_state', ''),
-                "country": item.get('country', ''),
-                "hs_grad_year": item.get('hs_grad_year')
-            }
-            divers.append(diver)
-
-        divers.sort(key=lambda x: x.get('name', ''))
-
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-            },
-            'body': json.dumps(divers, default=decimal_default)
-        }
+        params = event.get('queryStringParameters') or {}
+        divers = filter_roster(load_roster(), params.get('prefix') or '')
+
+        if 'limit' not in params and 'cursor' not in params:
+            return json_response(event, json.dumps(divers, default=decimal_default))
+
+        try:
+            limit = min(int(params.get('limit') or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError(f"Invalid limit: {limit}")
+        except ValueError:
+            return error_response(400, 'Invalid limit')
+
+        try:
+            page, next_cursor = page_roster(divers, limit, params.get('cursor') or None)
+        except ValueError:
+            return error_response(400, 'Invalid cursor')
+
+        return json_response(event, json.dumps({
+            'divers': page,
+            'next_cursor': next_cursor,
+            'total': len(divers)
+        }, default=decimal_default))
 
     except Exception as e:
         print(f"Error fetching divers from DynamoDB: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        return error_response(500, 'Internal server error')
@@ -2,27 +2,31 @@ import json
 import os
 import re
 from concurrent.futures import ThreadPoolExecutor
-from decimal import Decimal
 from functools import lru_cache
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 
 import boto3
 from boto3.dynamodb.conditions import Key
 
-dynamodb = boto3.resource('dynamodb')
+from diver_profiles import (MAX_PAGE_SIZE, decimal_default, format_diver, format_dives, format_result, page_results,
+                            profiles_table_name, read_profile_document, sort_results)
+from http_responses import error_response, json_response
+from packed_dives import (DIVE_COUNT_ATTRIBUTE, DIVE_LAYOUT_ATTRIBUTE, DIVER_INDEX_NAME, PACKED_DIVE_ROUND,
+                          PACKED_LAYOUT, unpack_dives)
+from response_cache import create_response_cache
 
-APPLICATION_JSON = 'application/json'
+dynamodb = boto3.resource('dynamodb')
 
 divers_table = dynamodb.Table(os.environ.get('DIVERS_TABLE_NAME'))
 competitions_table = dynamodb.Table(os.environ.get('COMPETITIONS_TABLE_NAME'))
 results_table = dynamodb.Table(os.environ.get('RESULTS_TABLE_NAME'))
 dives_table = dynamodb.Table(os.environ.get('DIVES_TABLE_NAME'))
+profiles_table = dynamodb.Table(profiles_table_name()) if profiles_table_name() else None
 
+# Lives as long as the warm container
+response_cache = create_response_cache()
 
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+QUERY_PARAMETERS = ('limit', 'cursor', 'dives', 'result')
 
 
 @lru_cache(maxsize=1000)
@@ -38,171 +42,360 @@ def generate_result_key(diver_id: int, competition_id: str, event_name: str, rou
     return f"{diver_id}_{competition_id}_{clean_event}"
 
 
+def query_pages(table, **query) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a query, following LastEvaluatedKey past the 1 MB page limit"""
+    while True:
+        response = table.query(**query)
+        yield from response['Items']
+        if 'LastEvaluatedKey' not in response:
+            return
+        query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
 def get_diver_profile(diver_id: int) -> dict[str, str | int | None | Any] | None:
     response = divers_table.get_item(Key={'diver_id': diver_id})
 
     if 'Item' not in response:
         return None
 
-    diver = response['Item']
-    return {
-        "id": str(diver['diver_id']),
-        "name": diver.get('name', ''),
-        "gender": diver.get('gender', ''),
-        "age": int(diver.get('age', 0)) if diver.get('age') else None,
-        "fina_age": int(diver.get('fina_age', 0)) if diver.get('fina_age') else None,
-        "city_state": diver.get('city_state', ''),
-        "country": diver.get('country', ''),
-        "hs_grad_year": int(diver.get('hs_grad_year', 0)) if diver.get('hs_grad_year') else None
-    }
+    return format_diver(response['Item'])
+
+
+def get_profile_document(diver_id: int) -> Optional[str]:
+    """The profile response body materialized by the last import, or None when there is no usable one"""
+    if profiles_table is None:
+        return None
+    try:
+        return read_profile_document(profiles_table.get_item(Key={'diver_id': diver_id}).get('Item'))
+    except Exception as e:
+        print(f"Error reading the profile document of diver {diver_id}: {e}")
+        return None
+
 
+def fetch_packed_dives(dives_hashes: Dict[str, str]) -> Dict[str, List[Dict]]:
+    """
+    Load packed dives with BatchGetItem, 100 results per request.
+
+    Args:
+        dives_hashes: The results' dives_hash by result key. A packed item written for other dives
+            than the stored result (e.g. by an interrupted import) is ignored.
+
+    Returns:
+        Dives by result key, for the results whose packed item was found
+    """
+    result_keys = list(dives_hashes)
+    found = {}
+    for start in range(0, len(result_keys), 100):
+        request_items = {
+            dives_table.name: {
+                'Keys': [{'result_key': result_key, 'dive_round': PACKED_DIVE_ROUND}
+                         for result_key in result_keys[start:start + 100]]
+            }
+        }
+        while request_items:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            for packed_item in response.get('Responses', {}).get(dives_table.name, []):
+                result_key = packed_item['result_key']
+                expected_hash = dives_hashes.get(result_key)
+                if expected_hash and packed_item.get('dives_hash') not in (None, expected_hash):
+                    continue
+                found[result_key] = format_dives(unpack_dives(packed_item))
+            request_items = response.get('UnprocessedKeys') or None
+    return found
+
+
+def fetch_dives_batch(result_keys: List[str], packed: Dict[str, str] = None) -> Dict[str, List[Dict]]:
+    """
+    Load the dives of the given results.
+
+    Args:
+        result_keys: Results whose dives are stored one item per dive
+        packed: dives_hash by result key of the results stored in the packed layout, read with
+            BatchGetItem. Results whose packed item is missing are queried like the others.
+    """
+    all_dives = {}
+    if packed:
+        try:
+            all_dives = fetch_packed_dives(packed)
+        except Exception as e:
+            print(f"Error fetching packed dives: {e}")
+        result_keys = list(result_keys) + [result_key for result_key in packed if result_key not in all_dives]
 
-def fetch_dives_batch(result_keys: List[str]) -> Dict[str, List[Dict]]:
     def get_dives(result_key):
         try:
-            response = dives_table.query(
-                KeyConditionExpression=Key('result_key').eq(result_key)
-            )
-
-            dives = []
-            for dive_item in response['Items']:
-                dive = {
-                    "code": dive_item.get('code', ''),
-                    "description": dive_item.get('description', ''),
-                    "difficulty": float(dive_item.get('difficulty', 0)) if dive_item.get('difficulty') else 0,
-                    "award": float(dive_item.get('award', 0)) if dive_item.get('award') else 0,
-                    "round_place": int(dive_item.get('round_place', 0)) if dive_item.get('round_place') else None,
-                    "scores": [float(score) for score in dive_item.get('scores', []) if score is not None],
-                    "dive_round": dive_item.get('dive_round', ''),
-                    "height": dive_item.get('height', ''),
-                    "net_total": float(dive_item.get('net_total', 0)) if dive_item.get('net_total') else 0
-                }
-                dives.append(dive)
-
-            dives.sort(key=lambda x: x.get('dive_round', '0'))
-            return result_key, dives
+            query = {'KeyConditionExpression': Key('result_key').eq(result_key)}
+            dive_items = [item for item in query_pages(dives_table, **query)
+                          if item.get('dive_round') != PACKED_DIVE_ROUND]
+            return result_key, format_dives(dive_items)
 
         except Exception as e:
             print(f"Error fetching dives for {result_key}: {e}")
             return result_key, []
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        results = executor.map(get_dives, result_keys)
-        return dict(results)
+    if result_keys:
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            all_dives.update(executor.map(get_dives, result_keys))
+    return all_dives
+
+
+def fetch_diver_dives(diver_id: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the whole dive history of a diver with one paginated DiverIndex query.
+
+    Returns:
+        Per result key, its dive items under 'items' and its packed item (if any) under 'packed'
+    """
+    query = {'IndexName': DIVER_INDEX_NAME, 'KeyConditionExpression': Key('diver_id').eq(diver_id)}
+    dives_by_result: Dict[str, Dict[str, Any]] = {}
+    for item in query_pages(dives_table, **query):
+        stored = dives_by_result.setdefault(item['result_key'], {'items': [], 'packed': None})
+        if item.get('dive_round') == PACKED_DIVE_ROUND:
+            stored['packed'] = item
+        else:
+            stored['items'].append(item)
+    return dives_by_result
+
+
+def dives_from_index(result_item: Dict[str, Any], stored: Dict[str, Any]) -> Optional[List[Dict]]:
+    """
+    The result's dives from the DiverIndex query, or None when the index does not hold all of them.
+
+    Results record their dive_count once their dives carry diver_id, results written before that
+    (or whose dives are only partly in the index) are loaded per result instead.
+    """
+    expected = result_item.get(DIVE_COUNT_ATTRIBUTE)
+    if expected is None:
+        return None
+    if int(expected) == 0:
+        return []
 
+    if result_item.get(DIVE_LAYOUT_ATTRIBUTE) == PACKED_LAYOUT:
+        packed_item = stored.get('packed')
+        if not packed_item or packed_item.get('dives_hash') not in (None, result_item.get('dives_hash')):
+            return None
+        dive_items = unpack_dives(packed_item)
+    else:
+        dive_items = stored.get('items', [])
 
-def get_diver_results(diver_id: int) -> List[Dict[str, Any]]:
-    response = results_table.query(
-        KeyConditionExpression=Key('diver_id').eq(diver_id)
+    return format_dives(dive_items) if len(dive_items) == int(expected) else None
+
+
+def get_result_items(diver_id: int) -> List[Dict[str, Any]]:
+    return list(query_pages(results_table, KeyConditionExpression=Key('diver_id').eq(diver_id)))
+
+
+def result_key_of(diver_id: int, result_item: Dict[str, Any]) -> str:
+    return generate_result_key(
+        diver_id,
+        result_item.get('competition_id'),
+        result_item.get('event_name', ''),
+        result_item.get('round_type', '')
     )
 
-    if not response['Items']:
-        return []
 
-    result_items = response['Items']
+def fetch_result_dives(diver_id: int, result_items: List[Dict[str, Any]]) -> Dict[str, List[Dict]]:
+    """Load the dives of a few results of a diver (a page), without reading the whole dive history"""
+    item_result_keys = []
+    packed_result_keys = {}
+    for result_item in result_items:
+        result_key = result_key_of(diver_id, result_item)
+        if result_item.get(DIVE_LAYOUT_ATTRIBUTE) == PACKED_LAYOUT:
+            packed_result_keys[result_key] = result_item.get('dives_hash')
+        else:
+            item_result_keys.append(result_key)
+    return fetch_dives_batch(item_result_keys, packed_result_keys)
+
+
+def get_diver_results(diver_id: int) -> List[Dict[str, Any]]:
+    # The dive history does not depend on the results, both are loaded at the same time
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        indexed_future = executor.submit(fetch_diver_dives, diver_id)
+
+        result_items = get_result_items(diver_id)
+
+        try:
+            indexed_dives = indexed_future.result()
+        except Exception as e:
+            print(f"Error querying the dive history of diver {diver_id}: {e}")
+            indexed_dives = {}
+
+    if not result_items:
+        return []
 
     # Generate all result keys
     result_keys = []
+    all_dives = {}
+    item_result_keys = []
+    packed_result_keys = {}
     for result_item in result_items:
-        result_key = generate_result_key(
-            diver_id,
-            result_item.get('competition_id'),
-            result_item.get('event_name', ''),
-            result_item.get('round_type', '')
-        )
+        result_key = result_key_of(diver_id, result_item)
         result_keys.append(result_key)
 
-    all_dives = fetch_dives_batch(result_keys)
+        dives = dives_from_index(result_item, indexed_dives.get(result_key, {}))
+        if dives is not None:
+            all_dives[result_key] = dives
+        elif result_item.get(DIVE_LAYOUT_ATTRIBUTE) == PACKED_LAYOUT:
+            packed_result_keys[result_key] = result_item.get('dives_hash')
+        else:
+            item_result_keys.append(result_key)
+
+    # Results not (yet) in the index are loaded one by one
+    if item_result_keys or packed_result_keys:
+        all_dives.update(fetch_dives_batch(item_result_keys, packed_result_keys))
 
     # Build results
-    results = []
-    for i, result_item in enumerate(result_items):
-        result_key = result_keys[i]
-        dives = all_dives.get(result_key, [])
-
-        result = {
-            "meet_name": result_item.get('meet_name', ''),
-            "event_name": result_item.get('event_name', ''),
-            "round_type": result_item.get('round_type', ''),
-            "start_date": result_item.get('start_date', ''),
-            "end_date": result_item.get('end_date', ''),
-            "total_score": float(result_item.get('total_score', 0)) if result_item.get('total_score') else 0,
-            "detail_href": result_item.get('detail_href', ''),
-            "dives": dives
-        }
-        results.append(result)
+    results = [format_result(result_item, all_dives.get(result_keys[i], []))
+               for i, result_item in enumerate(result_items)]
+    return sort_results(results)
+
+
+def get_diver_results_page(diver_id: int, limit: int, cursor: Optional[str],
+                           include_dives: bool) -> Dict[str, Any]:
+    """
+    Load one page of a diver's results, the most recent first.
+
+    Only the dives of the results on the page are loaded (none without include_dives), so the first
+    page does not wait for the diver's whole career.
+    """
+    result_items = {item.get('competition_event_key', ''): item for item in get_result_items(diver_id)}
+    results = sort_results([format_result(item, []) for item in result_items.values()])
+    page, next_cursor = page_results(results, limit, cursor)
+
+    if include_dives and page:
+        page_items = [result_items[result['result_id']] for result in page]
+        dives = fetch_result_dives(diver_id, page_items)
+        for result, result_item in zip(page, page_items):
+            result['dives'] = dives.get(result_key_of(diver_id, result_item), [])
 
-    # Sort results by start_date (the most recent first)
-    results.sort(key=lambda x: x.get('start_date', ''), reverse=True)
-    return results
+    return {'results': page, 'next_cursor': next_cursor, 'total_results': len(results)}
+
+
+def page_profile_document(document: str, limit: int, cursor: Optional[str], include_dives: bool) -> Dict[str, Any]:
+    """Cut one page of results out of a materialized profile document"""
+    profile = json.loads(document)
+    results = profile.get('results', [])
+    page, next_cursor = page_results(results, limit, cursor)
+    if not include_dives:
+        page = [{**result, 'dives': []} for result in page]
+    return {**profile, 'results': page, 'next_cursor': next_cursor, 'total_results': len(results)}
+
+
+def get_result_dives(diver_id: int, result_id: str) -> Optional[List[Dict]]:
+    """The dives of one result of a diver, or None when the diver has no such result"""
+    response = results_table.get_item(Key={'diver_id': diver_id, 'competition_event_key': result_id})
+    if 'Item' not in response:
+        return None
+    result_item = response['Item']
+    return fetch_result_dives(diver_id, [result_item]).get(result_key_of(diver_id, result_item), [])
+
+
+def success(body: str) -> Dict[str, Any]:
+    # Turned into the full response (ETag, compression) by the handler
+    return {'statusCode': 200, 'body': body}
+
+
+def parse_limit(value: Any) -> int:
+    limit = int(value)
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {value}")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def profile_response(diver_id: int, params: Dict[str, str]) -> Dict[str, Any]:
+    """Build the response for a diver and the query parameters described in handler"""
+    # Dives of one result, loaded when the result is opened
+    if params.get('result'):
+        dives = get_result_dives(diver_id, params['result'])
+        if dives is None:
+            return error_response(404, 'Result not found')
+        return success(json.dumps({'result_id': params['result'], 'dives': dives}, default=decimal_default))
+
+    paged = 'limit' in params or 'cursor' in params
+    if paged:
+        try:
+            limit = parse_limit(params.get('limit') or MAX_PAGE_SIZE)
+        except ValueError:
+            return error_response(400, 'Invalid limit')
+        cursor = params.get('cursor') or None
+        include_dives = (params.get('dives') or 'true').lower() != 'false'
+
+    # The import stores the finished response of every diver, only divers without one are assembled live
+    document = get_profile_document(diver_id)
+    if document is not None:
+        if not paged:
+            return success(document)
+        try:
+            page = page_profile_document(document, limit, cursor, include_dives)
+        except ValueError:
+            return error_response(400, 'Invalid cursor')
+        return success(json.dumps(page, default=decimal_default))
+
+    # Fetch profile and results in parallel using ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        profile_future = executor.submit(get_diver_profile, diver_id)
+        if paged:
+            results_future = executor.submit(get_diver_results_page, diver_id, limit, cursor, include_dives)
+        else:
+            results_future = executor.submit(get_diver_results, diver_id)
+
+        profile = profile_future.result()
+        try:
+            results = results_future.result()
+        except ValueError:
+            return error_response(400, 'Invalid cursor')
+
+    if not profile:
+        return error_response(404, 'Diver not found')
+
+    if paged:
+        profile.update(results)
+    else:
+        profile['results'] = results
+
+    return success(json.dumps(profile, default=decimal_default))
 
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Return a diver's profile with their competition results.
+
+    Query parameters (all optional):
+        limit: Return only this many results (the most recent first) plus a next_cursor
+        cursor: The next_cursor of the previous page
+        dives: 'false' leaves out the dives of the page's results
+        result: The result_id of a single result, returns only that result's dives
+
+    Without limit and cursor the whole career is returned in one response.
+    """
     try:
         diver_id_str = event.get('pathParameters', {}).get('diverId')
 
         if not diver_id_str:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Diver ID is required'})
-            }
+            return error_response(400, 'Diver ID is required')
 
         try:
             diver_id = int(diver_id_str)
         except ValueError:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Invalid diver ID format'})
-            }
+            return error_response(400, 'Invalid diver ID format')
 
-        # Fetch profile and results in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            profile_future = executor.submit(get_diver_profile, diver_id)
-            results_future = executor.submit(get_diver_results, diver_id)
+        params = {name: value for name, value in (event.get('queryStringParameters') or {}).items()
+                  if name in QUERY_PARAMETERS}
 
-            profile = profile_future.result()
-            results = results_future.result()
+        # Repeat views of a diver are answered from memory until the next import bumps the data version
+        cache_key = (diver_id, tuple(sorted(params.items())))
+        body = response_cache.get(cache_key) if response_cache else None
+        if body is not None:
+            return json_response(event, body)
 
-        if not profile:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Diver not found'})
-            }
-
-        profile['results'] = results
-
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-            },
-            'body': json.dumps(profile, default=decimal_default)
-        }
+        response = profile_response(diver_id, params)
+        if response['statusCode'] != 200:
+            return response
+        if response_cache:
+            response_cache.put(cache_key, response['body'])
+        return json_response(event, response['body'])
 
     except Exception as e:
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        return error_response(500, 'Internal server error')
@@ -1,14 +1,14 @@
 import json
 import os
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 import boto3
-from boto3.dynamodb.conditions import Key
 
-dynamodb = boto3.resource('dynamodb')
+from http_responses import error_response, json_response
+from training_status_index import STATUS_DATE_INDEX, parse_session_date, status_date_condition, unindexed_records_query
 
-APPLICATION_JSON = 'application/json'
+dynamodb = boto3.resource('dynamodb')
 
 
 def decimal_default(obj):
@@ -17,60 +17,65 @@ def decimal_default(obj):
     raise TypeError
 
 
+def query_all(table, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """All items of a query, following LastEvaluatedKey"""
+    response = table.query(**query)
+    items = response['Items']
+    while 'LastEvaluatedKey' in response:
+        response = table.query(**query, ExclusiveStartKey=response['LastEvaluatedKey'])
+        items.extend(response['Items'])
+    return items
+
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Return the json_output of a diver's training records, in session date order.
+
+    Query parameters (all optional):
+        status: Extraction status of the records, CONFIRMED by default
+        from: Only sessions on or after this YYYY-MM-DD date
+        to: Only sessions on or before this YYYY-MM-DD date
+    """
     try:
         # Extract diver ID from path parameters
         diver_id_str = event.get('pathParameters', {}).get('diverId')
 
         if not diver_id_str:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Diver ID is required'})
-            }
+            return error_response(400, 'Diver ID is required')
 
         # Validate diver ID format
         try:
             diver_id = int(diver_id_str)
         except ValueError:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Invalid diver ID format'})
-            }
+            return error_response(400, 'Invalid diver ID format')
+
+        query_params = event.get('queryStringParameters') or {}
+        extraction_status = query_params.get('status') or 'CONFIRMED'
+        try:
+            date_from = parse_session_date(query_params.get('from'))
+            date_to = parse_session_date(query_params.get('to'))
+        except ValueError as e:
+            return error_response(400, str(e))
 
         # Get table reference
         table_name = os.environ['TRAINING_DATA_TABLE_NAME']
         table = dynamodb.Table(table_name)
 
-        # Query training data for the specific diver with CONFIRMED status
+        # Query training data for the specific diver with the requested status
         training_data_list = []
 
         try:
-            # Query using GSI on diver_id
-            response = table.query(
-                IndexName='diver-id-index',
-                KeyConditionExpression=Key('diver_id').eq(str(diver_id)),
-                FilterExpression=Key('extraction_status').eq('CONFIRMED')
-            )
-
-            items = response['Items']
-
-            # Handle pagination if there are more items
-            while 'LastEvaluatedKey' in response:
-                response = table.query(
-                    IndexName='diver-id-index',
-                    KeyConditionExpression=Key('diver_id').eq(str(diver_id)),
-                    FilterExpression=Key('extraction_status').eq('CONFIRMED'),
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                items.extend(response['Items'])
+            # The sort key '<status>#<session_date>' of the GSI selects the status and date range,
+            # so only matching records are read
+            items = query_all(table, {
+                'IndexName': STATUS_DATE_INDEX,
+                'KeyConditionExpression': status_date_condition(str(diver_id), extraction_status, date_from, date_to)
+            })
+
+            # Records without status_date are not in that index until they are backfilled
+            unindexed = query_all(table, unindexed_records_query(str(diver_id), extraction_status, date_from, date_to))
+            if unindexed:
+                items = sorted(items + unindexed, key=lambda item: item.get('session_date') or '')
 
             # Extract json_output from each item
             for item in items:
@@ -90,40 +95,18 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         except Exception as e:
             print(f"Error querying training data: {str(e)}")
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Failed to retrieve training data'})
-            }
+            return error_response(500, 'Failed to retrieve training data')
 
         # Return the list of training data JSON objects
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-            },
-            'body': json.dumps({
-                'diver_id': diver_id,
-                'training_data': training_data_list,
-                'count': len(training_data_list)
-            }, default=decimal_default)
-        }
+        return json_response(event, json.dumps({
+            'diver_id': diver_id,
+            'extraction_status': extraction_status,
+            'training_data': training_data_list,
+            'count': len(training_data_list)
+        }, default=decimal_default))
 
     except Exception as e:
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        return error_response(500, 'Internal server error')
@@ -1,13 +1,29 @@
+import base64
 import json
 import os
+import re
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 import boto3
 
+from http_responses import error_response, json_response
+from training_status_index import (STATUS_DATE_ATTRIBUTE, STATUS_DATE_INDEX, parse_session_date, status_date_condition,
+                                   unindexed_records_query)
+
 dynamodb = boto3.resource('dynamodb')
 
-APPLICATION_JSON = 'application/json'
+# Largest page of records returned at once
+MAX_PAGE_SIZE = 200
+
+# Attribute names accepted by the fields parameter
+FIELD_NAME = re.compile(r'^[A-Za-z0-9_]+$')
+
+# Always part of a projection, so list entries can be fetched in detail and moved between statuses
+KEY_FIELDS = ['id', 'extraction_status']
+
+# Marks the cursors of a diver's records that continue with the records missing from STATUS_DATE_INDEX
+UNINDEXED_CURSOR = 'unindexed'
 
 
 def decimal_default(obj):
@@ -16,90 +32,240 @@ def decimal_default(obj):
     raise TypeError
 
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+def encode_cursor(last_evaluated_key: Dict[str, Any]) -> str:
+    """The cursor of the next page for a query's LastEvaluatedKey"""
+    body = json.dumps(last_evaluated_key, default=decimal_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, key_names: List[str]) -> Dict[str, Any]:
+    """The ExclusiveStartKey of a cursor, raises ValueError for malformed cursors or ones of another index"""
     try:
-        # Extract status from query parameters
-        query_params = event.get('queryStringParameters')
-
-        if not query_params or 'status' not in query_params:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'status query parameter is required'})
-            }
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(key, dict) or sorted(key) != sorted(key_names) \
+            or not all(isinstance(value, str) for value in key.values()):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key
 
-        extraction_status = query_params['status']
 
-        if not extraction_status:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'status parameter cannot be empty'})
-            }
+def decode_diver_cursor(cursor: str, key_names: List[str]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Whether a cursor of a diver's records continues with the unindexed records, and its ExclusiveStartKey"""
+    for names in (key_names, [UNINDEXED_CURSOR], [UNINDEXED_CURSOR, 'id', 'diver_id']):
+        try:
+            key = decode_cursor(cursor, names)
+        except ValueError:
+            continue
+        unindexed = key.pop(UNINDEXED_CURSOR, None) is not None
+        return unindexed, key or None
+    raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """The attributes of a comma-separated fields parameter (plus KEY_FIELDS), None for all attributes"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    for name in names:
+        if not FIELD_NAME.match(name):
+            raise ValueError(f"Invalid field: {name}")
+    return list(dict.fromkeys(KEY_FIELDS + names))
+
+
+def parse_limit(limit: Optional[str]) -> Optional[int]:
+    if limit is None:
+        return None
+    value = int(limit)
+    if value < 1:
+        raise ValueError(f"Invalid limit: {limit}")
+    return min(value, MAX_PAGE_SIZE)
+
+
+def projection(fields: Optional[List[str]]) -> Dict[str, Any]:
+    """ProjectionExpression parameters of a query or get_item reading only the given attributes"""
+    if not fields:
+        return {}
+    return {
+        'ProjectionExpression': ', '.join(f'#f{i}' for i in range(len(fields))),
+        'ExpressionAttributeNames': {f'#f{i}': name for i, name in enumerate(fields)}
+    }
+
+
+def query_records(table, query: Dict[str, Any], limit: Optional[int],
+                  start_key: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict]]:
+    """
+    Run a query, following LastEvaluatedKey until limit records are read (all of them without a limit).
+
+    Returns:
+        The records and the LastEvaluatedKey to continue from (None once the query is exhausted)
+    """
+    items = []
+    last_key = start_key
+    while True:
+        kwargs = dict(query)
+        if last_key:
+            kwargs['ExclusiveStartKey'] = last_key
+        if limit is not None:
+            kwargs['Limit'] = limit - len(items)
+        response = table.query(**kwargs)
+        items.extend(response['Items'])
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key or (limit is not None and len(items) >= limit):
+            return items, last_key
+
+
+def query_diver_records(table, query: Dict[str, Any], unindexed_query: Dict[str, Any], limit: Optional[int],
+                        start_key: Optional[Dict[str, Any]] = None,
+                        unindexed: bool = False) -> Tuple[List[Dict[str, Any]], Optional[Dict]]:
+    """
+    Run the query of a diver's records, then the query of their records without a status_date.
+
+    Returns:
+        The records and the key of the next cursor, marked with UNINDEXED_CURSOR once the first query is exhausted
+    """
+    items = []
+    if not unindexed:
+        items, last_key = query_records(table, query, limit, start_key)
+        if last_key:
+            return items, last_key
+        if limit is not None and len(items) >= limit:
+            return items, {UNINDEXED_CURSOR: '1'}
+        start_key = None
+
+    remaining = None if limit is None else limit - len(items)
+    unindexed_items, last_key = query_records(table, unindexed_query, remaining, start_key)
+    items.extend(unindexed_items)
+    return items, {UNINDEXED_CURSOR: '1', **last_key} if last_key else None
+
+
+def build_unindexed_query(extraction_status: str, diver_id: str, date_from: Optional[str], date_to: Optional[str],
+                          fields: Optional[List[str]]) -> Dict[str, Any]:
+    """The query of a diver's records of one status that are not yet in STATUS_DATE_INDEX"""
+    query = projection(fields)
+    query.update(unindexed_records_query(diver_id, extraction_status, date_from, date_to))
+    return query
+
+
+def build_query(extraction_status: str, diver_id: Optional[str], date_from: Optional[str], date_to: Optional[str],
+                fields: Optional[List[str]], unassigned: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+    """The query of one status (of one diver, or of the records without a diver), and the key attributes of its index"""
+    query = projection(fields)
+
+    if diver_id:
+        query.update(
+            IndexName=STATUS_DATE_INDEX,
+            KeyConditionExpression=status_date_condition(diver_id, extraction_status, date_from, date_to)
+        )
+        return query, ['id', 'diver_id', STATUS_DATE_ATTRIBUTE]
+
+    query.setdefault('ExpressionAttributeNames', {})['#extraction_status'] = 'extraction_status'
+    if unassigned:
+        query['ExpressionAttributeNames']['#diver_id'] = 'diver_id'
+        query['FilterExpression'] = 'attribute_not_exists(#diver_id)'
+    query.update(
+        IndexName='extraction-status-index',
+        KeyConditionExpression='#extraction_status = :extraction_status',
+        ExpressionAttributeValues={':extraction_status': extraction_status}
+    )
+    return query, ['id', 'extraction_status']
+
+
+def get_record(event: Dict[str, Any], table, training_data_id: str, fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Response with a single record, for the detail fields left out of a list"""
+    response = table.get_item(Key={'id': training_data_id}, **projection(fields))
+    if 'Item' not in response:
+        return error_response(404, 'Training data not found')
+    return json_response(event, json.dumps(response['Item'], default=decimal_default))
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    List the training data records of an extraction status, or return a single record.
+
+    GET /api/training-data query parameters:
+        status: The extraction status (required)
+        diver_id: Only the records of this diver
+        from, to: With diver_id, only sessions in this YYYY-MM-DD date range (inclusive)
+            (records without a status_date follow the others, until they are backfilled)
+        unassigned: 'true' for only the records without a diver_id (not with diver_id), e.g. to match them by name
+        fields: Comma-separated attributes to return (id and extraction_status are always included),
+            e.g. to leave out json_output and extracted_csv in list views
+        limit: Return at most this many records, with the next_cursor of the following page
+        cursor: The next_cursor of the previous page
+
+    GET /api/training-data/{id} returns the record with that id, fields applies as well.
+    """
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        path_params = event.get('pathParameters') or {}
+
+        try:
+            fields = parse_fields(query_params.get('fields'))
+        except ValueError as e:
+            return error_response(400, str(e))
 
         # Get table name from environment variable
         table_name = os.environ['TRAINING_DATA_TABLE_NAME']
         table = dynamodb.Table(table_name)
 
-        # Query using GSI on status
-        response = table.query(
-            IndexName='extraction-status-index',
-            KeyConditionExpression='#extraction_status = :extraction_status',
-            ExpressionAttributeNames={
-                '#extraction_status': 'extraction_status'
-            },
-            ExpressionAttributeValues={
-                ':extraction_status': extraction_status
-            }
-        )
+        if path_params.get('id'):
+            return get_record(event, table, path_params['id'], fields)
+
+        if 'status' not in query_params:
+            return error_response(400, 'status query parameter is required')
+
+        extraction_status = query_params['status']
+
+        if not extraction_status:
+            return error_response(400, 'status parameter cannot be empty')
+
+        try:
+            limit = parse_limit(query_params.get('limit'))
+        except ValueError:
+            return error_response(400, 'Invalid limit')
 
-        items = response['Items']
-
-        while 'LastEvaluatedKey' in response:
-            response = table.query(
-                IndexName='extraction-status-index',
-                KeyConditionExpression='#extraction_status = :extraction_status',
-                ExpressionAttributeNames={
-                    '#extraction_status': 'extraction_status'
-                },
-                ExpressionAttributeValues={
-                    ':extraction_status': extraction_status
-                },
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            items.extend(response['Items'])
+        try:
+            date_from = parse_session_date(query_params.get('from'))
+            date_to = parse_session_date(query_params.get('to'))
+        except ValueError as e:
+            return error_response(400, str(e))
+
+        unassigned = query_params.get('unassigned') == 'true'
+        if unassigned and query_params.get('diver_id'):
+            return error_response(400, 'unassigned cannot be combined with diver_id')
+
+        query, key_names = build_query(extraction_status, query_params.get('diver_id'), date_from, date_to, fields,
+                                       unassigned)
+
+        diver_id = query_params.get('diver_id')
+        start_key = None
+        unindexed = False
+        if query_params.get('cursor'):
+            try:
+                if diver_id:
+                    unindexed, start_key = decode_diver_cursor(query_params['cursor'], key_names)
+                else:
+                    start_key = decode_cursor(query_params['cursor'], key_names)
+            except ValueError:
+                return error_response(400, 'Invalid cursor')
+
+        if diver_id:
+            unindexed_query = build_unindexed_query(extraction_status, diver_id, date_from, date_to, fields)
+            items, last_key = query_diver_records(table, query, unindexed_query, limit, start_key, unindexed)
+        else:
+            items, last_key = query_records(table, query, limit, start_key)
 
         # Format response
         result = {
             'data': items,
             'count': len(items),
-            'extraction_status': extraction_status
+            'extraction_status': extraction_status,
+            'next_cursor': encode_cursor(last_key) if last_key else None
         }
 
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-            },
-            'body': json.dumps(result, default=decimal_default)
-        }
+        return json_response(event, json.dumps(result, default=decimal_default))
 
     except Exception as e:
         print(f"Error querying training data by status: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        return error_response(500, 'Internal server error')
@@ -0,0 +1,165 @@
+import base64
+import gzip
+import hashlib
+import json
+from typing import Dict, Any, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+APPLICATION_JSON = 'application/json'
+
+# The API's binaryMediaTypes (frontend-stack.ts). API Gateway only decodes base64 bodies into binary when the
+# request's Accept header names one of them, other requests get uncompressed bodies. The setting covers the whole
+# API, so every JSON request body reaches every handler base64-encoded: read bodies with json_request_body.
+BINARY_MEDIA_TYPES = (APPLICATION_JSON,)
+
+# Smaller bodies are not worth the compression and base64 overhead
+MIN_COMPRESS_BYTES = 1024
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Expose-Headers': 'ETag'
+}
+
+
+def request_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """A request header of an API Gateway proxy event, looked up case-insensitively"""
+    name = name.lower()
+    for header, value in (event.get('headers') or {}).items():
+        if header.lower() == name:
+            return value
+    return None
+
+
+def request_body(event: Dict[str, Any]) -> Optional[str]:
+    """The request body as text, API Gateway base64-encodes bodies of binary media types"""
+    body = event.get('body')
+    if body is not None and event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+    return body
+
+
+def json_request_body(event: Dict[str, Any]) -> Any:
+    """
+    The decoded JSON request body of an API Gateway proxy event, None without a body.
+
+    A body that is not a string (a direct invocation passing it parsed) is returned as it is. Raises
+    ValueError for malformed base64, UTF-8 or JSON.
+    """
+    body = event.get('body')
+    if not isinstance(body, str):
+        return body
+    return json.loads(request_body(event))
+
+
+def make_etag(body: str) -> str:
+    """A strong ETag of the response body, equal bodies get equal tags"""
+    return f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    # Weak validators and the encoding suffix added to compressed representations name the same body
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    return tag.rsplit('-', 1)[0] if tag.endswith(('-gzip', '-br')) else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the given ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(_opaque_tag(tag) == _opaque_tag(etag) for tag in if_none_match.split(','))
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The best content encoding the client accepts: 'br' when brotli is installed, else 'gzip', else None"""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q=') and params[2:].strip('0.') == '':
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def accepts_binary(event: Dict[str, Any]) -> bool:
+    """Whether API Gateway will pass a base64-encoded body of this request's response on as binary"""
+    accept = request_header(event, 'Accept') or ''
+    return accept.split(',')[0].split(';')[0].strip().lower() in BINARY_MEDIA_TYPES
+
+
+def compress(body: str, encoding: str) -> bytes:
+    data = body.encode('utf-8')
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def json_response(event: Dict[str, Any], body: str, status_code: int = 200) -> Dict[str, Any]:
+    """
+    Build the API Gateway proxy response for a JSON body.
+
+    The response carries a strong ETag, so browsers revalidate it with If-None-Match and get a bodyless 304
+    while the body is unchanged. Bodies of at least MIN_COMPRESS_BYTES are compressed with brotli or gzip
+    when the request's Accept-Encoding allows it and its Accept header lets API Gateway pass them on as binary.
+
+    Args:
+        event: The API Gateway proxy event of the request
+        body: The JSON-encoded response body
+        status_code: Status of the full response
+    """
+    etag = make_etag(body)
+    headers = {
+        'Content-Type': APPLICATION_JSON,
+        **CORS_HEADERS,
+        'ETag': etag,
+        # Stored by the browser, but revalidated on every use
+        'Cache-Control': 'private, no-cache',
+        'Vary': 'Accept, Accept-Encoding'
+    }
+
+    if status_code == 200 and etag_matches(request_header(event, 'If-None-Match'), etag):
+        return {'statusCode': 304, 'headers': headers, 'body': ''}
+
+    encoding = None
+    if len(body) >= MIN_COMPRESS_BYTES and accepts_binary(event):
+        encoding = choose_encoding(request_header(event, 'Accept-Encoding'))
+    if encoding is None:
+        return {'statusCode': status_code, 'headers': headers, 'body': body}
+
+    headers['Content-Encoding'] = encoding
+    # Each encoding is its own representation, _opaque_tag strips the suffix again for If-None-Match
+    headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': base64.b64encode(compress(body, encoding)).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+
+def error_response(status_code: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': APPLICATION_JSON,
+            **CORS_HEADERS
+        },
+        'body': json.dumps({'error': message})
+    }
@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, Any, List, Optional, Set
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Checkpoints of abandoned runs are removed by the table's TTL after this many seconds
+CHECKPOINT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class CheckpointNotFound(Exception):
+    """Raised when a continuation token does not match a stored checkpoint"""
+
+
+class ImportCheckpoint:
+    """
+    Progress of one (possibly multi-invocation) competition import.
+
+    Records the divers whose rows have been written, the run summary accumulated over all invocations
+    and whether the last invocation had to stop before the whole team was processed. Dive sheets of
+    finished meets are kept in the dive-sheet cache, so a resumed run does not download them again.
+    """
+
+    def __init__(self, token: str = None, team_numbers: List[str] = None, completed: Set[int] = None,
+                 summary: Dict[str, Any] = None, invocations: int = 0, created_at: str = None):
+        self.token = token or uuid.uuid4().hex
+        # A resumed run imports the same teams as the invocation that created the checkpoint
+        self.team_numbers = list(team_numbers or [])
+        self.completed: Set[int] = set(completed or ())
+        self.summary: Dict[str, Any] = dict(summary or {})
+        self.invocations = invocations
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+
+        # Filled in by the scraper during the current invocation
+        self.remaining = 0
+        self.lock = Lock()
+
+    @property
+    def complete(self) -> bool:
+        return self.remaining == 0
+
+    def mark_done(self, diver_id: int) -> None:
+        with self.lock:
+            self.completed.add(diver_id)
+
+    def add_summary(self, summary: Dict[str, Any], total: Dict[str, Any] = None) -> None:
+        """Add an invocation's counts (which may be nested, e.g. per team) to the run summary"""
+        total = self.summary if total is None else total
+        for name, value in summary.items():
+            if isinstance(value, dict):
+                self.add_summary(value, total.setdefault(name, {}))
+            else:
+                total[name] = total.get(name, 0) + value
+
+    def to_dict(self, invocation_summary: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        The stored form of the checkpoint.
+
+        invocation_summary marks a save in the middle of an invocation: its counts so far are included in
+        the summary (without adding them to this checkpoint) and the import is not complete yet.
+        """
+        with self.lock:
+            completed = sorted(self.completed)
+        summary = self.summary
+        if invocation_summary is not None:
+            summary = json.loads(json.dumps(self.summary))
+            self.add_summary(invocation_summary, summary)
+        return {
+            'token': self.token,
+            'team_numbers': self.team_numbers,
+            'completed': completed,
+            'summary': summary,
+            'invocations': self.invocations,
+            'created_at': self.created_at,
+            'updated_at': datetime.now(timezone.utc).isoformat(),
+            'complete': self.complete and invocation_summary is None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ImportCheckpoint':
+        return cls(
+            token=data['token'],
+            team_numbers=data.get('team_numbers'),
+            completed={int(diver_id) for diver_id in data.get('completed', [])},
+            summary=data.get('summary', {}),
+            invocations=int(data.get('invocations', 0)),
+            created_at=data.get('created_at'),
+        )
+
+
+class CheckpointStore:
+    """Base class for checkpoint storage backends"""
+
+    def load(self, token: str) -> ImportCheckpoint:
+        data = self._load(token)
+        if data is None:
+            raise CheckpointNotFound(f"No import checkpoint for continuation token {token}")
+        return ImportCheckpoint.from_dict(data)
+
+    def save(self, checkpoint: ImportCheckpoint, invocation_summary: Dict[str, Any] = None) -> None:
+        """Store the checkpoint, with invocation_summary while the invocation is still running (see to_dict)"""
+        self._save(checkpoint.token, checkpoint.to_dict(invocation_summary))
+
+    def _load(self, token: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _save(self, token: str, data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class DynamoDBCheckpointStore(CheckpointStore):
+    """Checkpoints stored in a DynamoDB table with a `state_key` string partition key"""
+
+    def __init__(self, table_name: str):
+        import boto3
+
+        self.table_name = table_name
+        self.client = boto3.client('dynamodb')
+
+    @staticmethod
+    def _state_key(token: str) -> str:
+        return f"checkpoint#{token}"
+
+    def _load(self, token: str) -> Optional[Dict[str, Any]]:
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={'state_key': {'S': self._state_key(token)}},
+            ConsistentRead=True
+        )
+        item = response.get('Item')
+        return json.loads(item['checkpoint']['S']) if item else None
+
+    def _save(self, token: str, data: Dict[str, Any]) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'state_key': {'S': self._state_key(token)},
+                # Diver IDs are small, a team of several thousand divers stays far below the item size limit
+                'checkpoint': {'S': json.dumps(data)},
+                'expires_at': {'N': str(int(time.time()) + CHECKPOINT_TTL_SECONDS)}
+            }
+        )
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoints stored as JSON files in a local directory, used for local runs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, token: str) -> str:
+        # Tokens are generated hex strings, anything else must not escape the directory
+        return os.path.join(self.path, f"checkpoint-{os.path.basename(token)}.json")
+
+    def _load(self, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(token)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save(self, token: str, data: Dict[str, Any]) -> None:
+        temp_file = f"{self._file(token)}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_file, self._file(token))
+
+
+def create_checkpoint_store() -> Optional[CheckpointStore]:
+    """
+    Build the checkpoint store configured through the environment.
+
+    IMPORT_STATE_TABLE_NAME selects the DynamoDB backend, IMPORT_STATE_PATH the local directory backend.
+    Returns None when no store is configured.
+    """
+    table_name = os.environ.get('IMPORT_STATE_TABLE_NAME')
+    if table_name:
+        return DynamoDBCheckpointStore(table_name)
+
+    path = os.environ.get('IMPORT_STATE_PATH')
+    if path:
+        return FileCheckpointStore(path)
+
+    return None
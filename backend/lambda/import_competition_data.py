@@ -1,41 +1,141 @@
+import hashlib
+import json
 import logging
 import re
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from html import unescape
+from html.entities import html5 as HTML5_ENTITIES
 from threading import Lock
-from typing import List, Dict, Any
-
-import requests
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from data_version import bump_data_version
+from dive_sheet_cache import DiveSheetCache, create_dive_sheet_cache, normalize_detail_href
+from diver_profiles import (PROFILE_DOCUMENT_FORMAT, build_profile_item, build_stale_profile_item, format_diver,
+                            format_dives, format_result, profiles_table_name, sort_results)
+from dynamodb_batch_writer import ParallelBatchWriter, backoff
+from dynamodb_change_detection import (HASH_ATTRIBUTE, with_content_hash, combine_hashes, query_hashes,
+                                       batch_get_hashes)
+from fetch_engine import FetchEngine
+from import_checkpoint import CheckpointNotFound, ImportCheckpoint, create_checkpoint_store
+from import_metrics import ImportMetrics, create_metrics_sink
+from import_runs import ImportRunStore, create_import_run_store
+from packed_dives import (DIVE_COUNT_ATTRIBUTE, DIVE_LAYOUT_ATTRIBUTE, DIVE_LAYOUTS, ITEMS_LAYOUT,
+                          PACKED_DIVE_ROUND, PACKED_LAYOUT, pack_dives)
+from page_archive import PageArchive, create_page_archive
+from roster_snapshot import rebuild_roster_snapshot
+from run_report import RunReport, create_run_report
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 progress_lock = Lock()
 progress_counter = {'processed': 0, 'total': 0}
-HTML_PARSER = 'html.parser'
+
+# Per-stage timings of the current invocation, reset by the handler
+metrics = ImportMetrics()
+
+
+def select_html_parser() -> str:
+    """Use the fastest BeautifulSoup backend available, HTML_PARSER in the environment overrides it"""
+    import os
+    configured = os.environ.get('HTML_PARSER')
+    if configured:
+        return configured
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+HTML_PARSER = select_html_parser()
+
+# Patterns compiled once instead of on every page
+PROFILE_LINK_PATTERN = re.compile(r'profile\.php\?number=\d+')
+DIVER_NUMBER_PATTERN = re.compile(r'number=(\d+)')
+PROFILE_FIELD_PATTERNS = [
+    ('name', re.compile(r'Name:\s*([^\n]+)'), str),
+    ('city_state', re.compile(r'City/State:\s*([^\n]+)'), str),
+    ('country', re.compile(r'Country:\s*([^\n]+)'), str),
+    ('gender', re.compile(r'Gender:\s*([^\n]+)'), str),
+    ('age', re.compile(r'Age:\s*(\d+)'), int),
+    ('fina_age', re.compile(r'FINA Age:\s*(\d+)'), int),
+    ('hs_grad_year', re.compile(r'High School Graduation:\s*(\d{4})'), int),
+]
+DIVE_COUNT_PATTERN = re.compile(r'\((\d+)\s*Dives?\)')
+DIVE_COUNT_SUFFIX_PATTERN = re.compile(r'\s*\(\d+\s*Dives?\)')
+NUMBER_PATTERN = re.compile(r'([\d.]+)')
+SHEET_DATE_PATTERN = re.compile(r'Date:\s*\*\*([^*]+)\*\*')
+SHEET_DATE_PLAIN_PATTERN = re.compile(r'Date:\s*([A-Za-z]+ \d{1,2}, \d{4}(?: to [A-Za-z]+ \d{1,2}, \d{4})?)')
+
+# Tokenizer patterns of the fast dive-sheet parser. A tag ends at the first '>' outside a quoted attribute value,
+# possessive quantifiers keep the scan linear on unterminated quotes
+TAG_BODY = r'(?:=\s*+(?:"[^"]*+"|\'[^\']*+\')|[^>])*+'
+TAG_PATTERN = re.compile(r'<[A-Za-z/!?]' + TAG_BODY + '>')
+TAG_NAME_PATTERN = re.compile(r'</?\s*([A-Za-z0-9]+)')
+TABLE_START_PATTERN = re.compile(r'<table\b(' + TAG_BODY + ')>', re.IGNORECASE)
+TABLE_END_PATTERN = re.compile(r'</table\s*>', re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r'([A-Za-z_:][-A-Za-z0-9_:.]*)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+ROW_PATTERN = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.IGNORECASE | re.DOTALL)
+CELL_PATTERN = re.compile(r'<td\b[^>]*>(.*?)</td>', re.IGNORECASE | re.DOTALL)
+ENTITY_PATTERN = re.compile(r'&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);?')
+# Comments, scripts and styles add no text, the page chrome around the dive-sheet table commonly has them
+HIDDEN_MARKUP_PATTERN = re.compile(r'<!--.*?-->|<(script|style)\b' + TAG_BODY + r'>.*?</\1\s*>',
+                                   re.IGNORECASE | re.DOTALL)
+# Stands in for hidden markup, TAG_PATTERN drops it from the text like any other tag
+HIDDEN_MARKUP = '<!>'
+UNSUPPORTED_MARKUP_PATTERN = re.compile(r'<!--|<!\[CDATA\[|<script\b|<style\b|<textarea\b', re.IGNORECASE)
+# Quoted attribute values with '<' or '>', which the row and cell patterns would end a tag at
+QUOTED_ANGLE_BRACKET_PATTERN = re.compile(r'=\s*(?:"[^"]*[<>]|\'[^\']*[<>])')
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+# Can point at a local stand-in server serving fixture pages
+DEFAULT_BASE_URL = 'https://secure.meetcontrol.com/divemeets/system/'
+
+# Headers to mimic a real browser request
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Bump when the parsers change shape so stored fingerprints stop matching
+FINGERPRINT_VERSION = 1
 
 
 def update_progress(increment=1):
     with progress_lock:
+        previous = progress_counter['processed']
         progress_counter['processed'] += increment
-        logger.info(f"Progress: {progress_counter['processed']}/{progress_counter['total']} divers processed")
+        processed, total = progress_counter['processed'], progress_counter['total']
+        # A line per 10% of the team, logging every diver costs more than it tells on large teams
+        step = max(1, total // 10)
+        if processed // step != previous // step or processed >= total:
+            logger.info(f"Progress: {processed}/{total} divers processed")
 
 
 def parse_team_page(html: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, HTML_PARSER)
+    # Only the profile links are needed, so nothing else on the page is built into the tree
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('a', href=PROFILE_LINK_PATTERN))
     divers = []
 
     # Find all profile links for individual divers (not team entries)
-    profile_links = soup.find_all('a', href=re.compile(r'profile\.php\?number=\d+'))
+    profile_links = soup.find_all('a', href=PROFILE_LINK_PATTERN)
 
     for link in profile_links:
         href = link.get('href')
         name = link.get_text().strip()
 
         # Extract diver ID from URL
-        match = re.search(r'number=(\d+)', href)
+        match = DIVER_NUMBER_PATTERN.search(href)
         if match:
             diver_id = int(match.group(1))
 
@@ -62,40 +162,23 @@ def parse_diver_profile(html: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing diver's personal information
     """
-    soup = BeautifulSoup(html, HTML_PARSER)
+    return extract_profile_fields(BeautifulSoup(html, HTML_PARSER))
+
+
+def extract_profile_fields(soup: BeautifulSoup) -> Dict[str, Any]:
+    """Extract the personal information fields from an already parsed profile page"""
     profile_data = {}
 
     try:
         # Extract basic information from the profile
         text_content = soup.get_text(separator='\n')
 
-        # Extract name
-        name_match = re.search(r'Name:\s*([^\n]+)', text_content)
-        profile_data['name'] = name_match.group(1).strip() if name_match else ""
-
-        # Extract city/state
-        city_match = re.search(r'City/State:\s*([^\n]+)', text_content)
-        profile_data['city_state'] = city_match.group(1).strip() if city_match else ""
-
-        # Extract country
-        country_match = re.search(r'Country:\s*([^\n]+)', text_content)
-        profile_data['country'] = country_match.group(1).strip() if country_match else ""
-
-        # Extract gender
-        gender_match = re.search(r'Gender:\s*([^\n]+)', text_content)
-        profile_data['gender'] = gender_match.group(1).strip() if gender_match else ""
-
-        # Extract age
-        age_match = re.search(r'Age:\s*(\d+)', text_content)
-        profile_data['age'] = int(age_match.group(1)) if age_match else None
-
-        # Extract FINA age
-        fina_age_match = re.search(r'FINA Age:\s*(\d+)', text_content)
-        profile_data['fina_age'] = int(fina_age_match.group(1)) if fina_age_match else None
-
-        # Extract high school graduation year
-        hs_grad_match = re.search(r'High School Graduation:\s*(\d{4})', text_content)
-        profile_data['hs_grad_year'] = int(hs_grad_match.group(1)) if hs_grad_match else None
+        for field, pattern, convert in PROFILE_FIELD_PATTERNS:
+            match = pattern.search(text_content)
+            if convert is int:
+                profile_data[field] = int(match.group(1)) if match else None
+            else:
+                profile_data[field] = match.group(1).strip() if match else ""
 
         logger.debug(f"Parsed profile for: {profile_data.get('name', 'Unknown')}")
 
@@ -106,7 +189,21 @@ def parse_diver_profile(html: str) -> Dict[str, Any]:
 
 
 def parse_diver_results(html: str) -> List[Dict[str, Any]]:
+    return extract_results_rows(BeautifulSoup(html, HTML_PARSER))
+
+
+def parse_diver_page(html: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Parse a diver's profile page once and return both the profile fields and the results rows.
+
+    Equivalent to (parse_diver_profile(html), parse_diver_results(html)) at the cost of a single parse.
+    """
     soup = BeautifulSoup(html, HTML_PARSER)
+    return extract_profile_fields(soup), extract_results_rows(soup)
+
+
+def extract_results_rows(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    """Extract the competition results rows from an already parsed profile page"""
     results = []
 
     try:
@@ -159,12 +256,12 @@ def parse_diver_results(html: str) -> List[Dict[str, Any]]:
                         event_name = event_text
 
                     # Extract dive count from the event name
-                    dive_match = re.search(r'\((\d+)\s*Dives?\)', event_name)
+                    dive_match = DIVE_COUNT_PATTERN.search(event_name)
                     if dive_match:
                         dive_count = int(dive_match.group(1))
 
                     # Clean up event name
-                    event_name = re.sub(r'\s*\(\d+\s*Dives?\)', '', event_name).strip()
+                    event_name = DIVE_COUNT_SUFFIX_PATTERN.sub('', event_name).strip()
 
                     # Extract score
                     total_score = None
@@ -174,7 +271,7 @@ def parse_diver_results(html: str) -> List[Dict[str, Any]]:
                         if link and link.has_attr('href'):
                             detail_href = link['href']
                         score_text = link.get_text() if link else score_cell.get_text()
-                        score_match = re.search(r'([\d.]+)', score_text.strip())
+                        score_match = NUMBER_PATTERN.search(score_text.strip())
                         if score_match:
                             total_score = float(score_match.group(1))
 
@@ -216,13 +313,36 @@ def parse_dive_sheet(html: str) -> Dict[str, Any]:
     }
 
     # Extract date information from the page text
-    page_text = soup.get_text()
+    parse_dive_sheet_dates(soup.get_text(), result)
 
+    # target the inner table with border="1" width="650"
+    table = soup.find('table', {'border': '1', 'width': '650'})
+    if not table:
+        logger.warning("No dive-sheet table found")
+        return result
+
+    # skip header row (0) and Totals row (last)
+    rows = table.find_all('tr')[1:-1]
+    for row in rows:
+        cells = row.find_all('td')
+        if len(cells) < 7:
+            continue
+        try:
+            # only the first text node in this cell is the DD
+            raw_dd = cells[4].find(string=True, recursive=False)
+        except Exception:
+            raw_dd = None
+        result['dives'].append(build_dive_from_cells([c.get_text(strip=True) for c in cells], raw_dd))
+    return result
+
+
+def parse_dive_sheet_dates(page_text: str, result: Dict[str, Any]) -> None:
+    """Fill start_date/end_date of a parsed dive sheet from the page text"""
     # Look for date pattern like "Mar 27, 2025 to Mar 29, 2025"
-    date_match = re.search(r'Date:\s*\*\*([^*]+)\*\*', page_text)
+    date_match = SHEET_DATE_PATTERN.search(page_text)
     if not date_match:
         # Alternative pattern without asterisks
-        date_match = re.search(r'Date:\s*([A-Za-z]+ \d{1,2}, \d{4}(?: to [A-Za-z]+ \d{1,2}, \d{4})?)', page_text)
+        date_match = SHEET_DATE_PLAIN_PATTERN.search(page_text)
 
     if date_match:
         date_str = date_match.group(1).strip()
@@ -244,66 +364,195 @@ def parse_dive_sheet(html: str) -> Dict[str, Any]:
             except ValueError as e:
                 logger.warning(f"Could not parse single date '{date_str}': {e}")
 
-    # target the inner table with border="1" width="650"
-    table = soup.find('table', {'border': '1', 'width': '650'})
-    if not table:
+
+def build_dive_from_cells(texts: List[str], raw_dd: Any) -> Dict[str, Any]:
+    """
+    Build one dive from the stripped texts of a dive-sheet row's cells.
+
+    Args:
+        texts: get_text(strip=True) of every td in the row
+        raw_dd: First direct text node of the DD cell
+    """
+    # core fields
+    dive_round = texts[0]
+    code = texts[1]
+    desc = texts[2]
+    height = texts[3]
+    # DD
+    try:
+        dd = float(raw_dd.strip()) if raw_dd else None
+    except Exception:
+        dd = None
+    # next 9 cells = judge scores
+    scores = []
+    for s in texts[5:14]:
+        m = NUMBER_PATTERN.match(s)
+        scores.append(float(m.group(1)) if m else None)
+    # net total, award, round place
+    try:
+        net_total = float(texts[14])
+    except Exception:
+        net_total = None
+    try:
+        award = float(texts[15])
+    except Exception:
+        award = None
+    try:
+        round_place = int(texts[16])
+    except Exception:
+        round_place = None
+
+    return {
+        'dive_round': dive_round,
+        'code': code,
+        'description': desc,
+        'height': height,
+        'difficulty': dd,
+        'scores': scores,
+        'net_total': net_total,
+        'award': award,
+        'round_place': round_place,
+    }
+
+
+class _FallbackToSoup(Exception):
+    """Raised by the fast dive-sheet parser on markup it does not handle exactly like BeautifulSoup"""
+
+
+def _unescape_entity(match: re.Match) -> str:
+    reference = match.group(0)
+    if reference.endswith(';'):
+        if reference[1] != '#':
+            character = HTML5_ENTITIES.get(reference[1:])
+            if character is not None:
+                return character
+        else:
+            code = int(reference[3:-1], 16) if reference[2] in 'xX' else int(reference[2:-1])
+            # The soup backends differ on NUL, C1 control, surrogate and out of range references
+            if (code >= 0x20 or code in (0x09, 0x0A)) and not 0x7F <= code <= 0x9F \
+                    and not 0xD800 <= code <= 0xDFFF and code <= 0x10FFFF:
+                return chr(code)
+    elif unescape(reference) == reference:
+        # Not a reference, e.g. the '&T' of 'AT&T'
+        return reference
+    # Unknown names and references without ';' are not decoded the same way by the soup backends
+    raise _FallbackToSoup(f'Ambiguous character reference {reference}')
+
+
+def _fast_unescape(text: str) -> str:
+    # Like html.unescape, but only for the references every soup backend decodes the same way
+    return ENTITY_PATTERN.sub(_unescape_entity, text) if '&' in text else text
+
+
+def _fast_cell_text(inner_html: str) -> str:
+    # Same as get_text(strip=True): every text node stripped, empty ones dropped, the rest joined
+    return ''.join(piece for piece in (_fast_unescape(text).strip() for text in TAG_PATTERN.split(inner_html))
+                   if piece)
+
+
+def _fast_first_direct_string(inner_html: str) -> Any:
+    # Same as find(string=True, recursive=False): the first text node that is a direct child of the cell
+    depth = 0
+    position = 0
+    for match in TAG_PATTERN.finditer(inner_html):
+        if depth == 0 and match.start() > position:
+            return _fast_unescape(inner_html[position:match.start()])
+        tag = match.group(0)
+        name = TAG_NAME_PATTERN.match(tag)
+        name = name.group(1).lower() if name else ''
+        if tag.startswith('</'):
+            depth -= 1
+        elif not tag.endswith('/>') and name not in VOID_ELEMENTS:
+            depth += 1
+        position = match.end()
+    if depth != 0:
+        raise _FallbackToSoup('Unbalanced tags in cell')
+    return _fast_unescape(inner_html[position:]) if position < len(inner_html) else None
+
+
+def _find_dive_table(html: str) -> Any:
+    # Same as soup.find('table', {'border': '1', 'width': '650'}), returns the table's inner HTML
+    for match in TABLE_START_PATTERN.finditer(html):
+        attributes = {}
+        for attribute in ATTRIBUTE_PATTERN.finditer(match.group(1)):
+            value = next((v for v in attribute.group(2, 3, 4) if v is not None), '')
+            attributes[attribute.group(1).lower()] = value
+
+        if attributes.get('border') == '1' and attributes.get('width') == '650':
+            end = TABLE_END_PATTERN.search(html, match.end())
+            if not end:
+                raise _FallbackToSoup('Unterminated dive-sheet table')
+            return html[match.end():end.start()]
+    return None
+
+
+def parse_dive_sheet_fast(html: str) -> Dict[str, Any]:
+    """
+    High-throughput drop-in replacement for parse_dive_sheet returning exactly the same dict.
+
+    The dive-sheet table is tokenized with precompiled patterns instead of building a soup of the
+    whole page. Comments, scripts and styles are skipped outside the table; markup the tokenizer cannot
+    mirror exactly (any of them inside the table, nested tables, unclosed rows or cells, unbalanced tags,
+    '<' or '>' in attribute values of the table, references the soup backends decode differently) falls
+    back to parse_dive_sheet.
+    """
+    try:
+        return _parse_dive_sheet_fast(html)
+    except _FallbackToSoup as e:
+        logger.debug(f"Fast dive-sheet parser falling back to BeautifulSoup: {e}")
+        return parse_dive_sheet(html)
+
+
+def _parse_dive_sheet_fast(html: str) -> Dict[str, Any]:
+    if HIDDEN_MARKUP in html:
+        raise _FallbackToSoup('Empty declaration on the page')
+    visible = HIDDEN_MARKUP_PATTERN.sub(HIDDEN_MARKUP, html)
+    if UNSUPPORTED_MARKUP_PATTERN.search(visible):
+        raise _FallbackToSoup('Unterminated comment, script or style, CDATA or textarea on the page')
+
+    result = {
+        'start_date': None,
+        'end_date': None,
+        'dives': []
+    }
+
+    parse_dive_sheet_dates(''.join(_fast_unescape(text) for text in TAG_PATTERN.split(visible)), result)
+
+    table_html = _find_dive_table(visible)
+    if table_html is None:
         logger.warning("No dive-sheet table found")
         return result
 
+    if HIDDEN_MARKUP in table_html:
+        raise _FallbackToSoup('Comment, script or style inside the dive-sheet table')
+    if QUOTED_ANGLE_BRACKET_PATTERN.search(table_html):
+        raise _FallbackToSoup("'<' or '>' in an attribute value of the dive-sheet table")
+    lowered = table_html.lower()
+    if '<table' in lowered:
+        raise _FallbackToSoup('Nested table inside the dive-sheet table')
+    if lowered.count('<tr') != lowered.count('</tr>') or lowered.count('<td') != lowered.count('</td>'):
+        raise _FallbackToSoup('Unclosed rows or cells')
+
     # skip header row (0) and Totals row (last)
-    rows = table.find_all('tr')[1:-1]
-    for row in rows:
-        cells = row.find_all('td')
+    rows = ROW_PATTERN.findall(table_html)[1:-1]
+    for row_html in rows:
+        cells = CELL_PATTERN.findall(row_html)
         if len(cells) < 7:
             continue
-        # core fields
-        dive_round = cells[0].get_text(strip=True)
-        code = cells[1].get_text(strip=True)
-        desc = cells[2].get_text(strip=True)
-        height = cells[3].get_text(strip=True)
-        # DD
-        try:
-            # only the first text node in this cell is the DD
-            raw_dd = cells[4].find(string=True, recursive=False)
-            dd = float(raw_dd.strip()) if raw_dd else None
-        except Exception:
-            dd = None
-            # next 9 cells = judge scores
-        raw_scores = [c.get_text(strip=True) for c in cells[5:14]]
-        scores = []
-        for s in raw_scores:
-            m = re.match(r"([\d.]+)", s)
-            scores.append(float(m.group(1)) if m else None)
-        # net total, award, round place
-        try:
-            net_total = float(cells[14].get_text(strip=True))
-        except:
-            net_total = None
-        try:
-            award = float(cells[15].get_text(strip=True))
-        except Exception:
-            award = None
-        try:
-            round_place = int(cells[16].get_text(strip=True))
-        except Exception:
-            round_place = None
-
-        result['dives'].append({
-            'dive_round': dive_round,
-            'code': code,
-            'description': desc,
-            'height': height,
-            'difficulty': dd,
-            'scores': scores,
-            'net_total': net_total,
-            'award': award,
-            'round_place': round_place,
-        })
+        raw_dd = _fast_first_direct_string(cells[4])
+        result['dives'].append(build_dive_from_cells([_fast_cell_text(cell) for cell in cells], raw_dd))
     return result
 
 
-def fetch_dive_sheet(session: requests.Session, base_url: str, event: Dict[str, Any], headers: Dict[str, str]) -> Dict[
-    str, Any]:
+def apply_dive_sheet(event: Dict[str, Any], dive_sheet_data: Dict[str, Any]) -> Dict[str, Any]:
+    event['dives'] = dive_sheet_data['dives']
+    event['start_date'] = dive_sheet_data['start_date']
+    event['end_date'] = dive_sheet_data['end_date']
+    return event
+
+
+def fetch_dive_sheet(engine: FetchEngine, base_url: str, event: Dict[str, Any],
+                     cache: DiveSheetCache = None) -> Dict[str, Any]:
     if not event.get('detail_href'):
         return event
 
@@ -314,17 +563,18 @@ def fetch_dive_sheet(session: requests.Session, base_url: str, event: Dict[str,
             'divesheetfinal.php'
         )
 
-        request_headers = headers.copy()
-        request_headers["Referer"] = referer_url
-
         url = base_url + final_href.lstrip('/')
-        response = session.get(url, headers=request_headers, timeout=30)
-        response.raise_for_status()
+        with metrics.timer('dive_sheet_fetch'):
+            response = engine.get(url, headers={"Referer": referer_url})
+            response.raise_for_status()
+
+        with metrics.timer('dive_sheet_parse'):
+            dive_sheet_data = parse_dive_sheet_fast(response.text)
+        apply_dive_sheet(event, dive_sheet_data)
 
-        dive_sheet_data = parse_dive_sheet(response.text)
-        event['dives'] = dive_sheet_data['dives']
-        event['start_date'] = dive_sheet_data['start_date']
-        event['end_date'] = dive_sheet_data['end_date']
+        # Sheets of finished meets never change, keep them for later runs
+        if cache:
+            cache.put(event['detail_href'], dive_sheet_data)
 
         logger.debug(f"Fetched dive sheet for: {event['meet_name']} - {event['event_name']}")
 
@@ -334,127 +584,313 @@ def fetch_dive_sheet(session: requests.Session, base_url: str, event: Dict[str,
     return event
 
 
-def process_diver_dive_sheets_parallel(session: requests.Session, base_url: str, results_data: List[Dict[str, Any]],
-                                       headers: Dict[str, str], max_workers: int = 5) -> List[Dict[str, Any]]:
+def process_diver_dive_sheets_parallel(engine: FetchEngine, base_url: str, results_data: List[Dict[str, Any]],
+                                       cache: DiveSheetCache = None) -> List[Dict[str, Any]]:
     events_with_sheets = [event for event in results_data if event.get('detail_href')]
 
     if not events_with_sheets:
         return results_data
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all dive sheet fetch tasks
-        future_to_event = {
-            executor.submit(fetch_dive_sheet, session, base_url, event, headers): event
-            for event in events_with_sheets
-        }
+    # Serve dive sheets seen by earlier runs from the cache, only the rest hit the network
+    if cache:
+        cached_sheets = cache.get_many({event['detail_href'] for event in events_with_sheets})
+        for event in events_with_sheets:
+            if event['detail_href'] in cached_sheets:
+                apply_dive_sheet(event, cached_sheets[event['detail_href']])
+        events_with_sheets = [event for event in events_with_sheets if event['detail_href'] not in cached_sheets]
+
+        if not events_with_sheets:
+            return results_data
+
+    # Rows linking the same dive sheet share one download
+    events_by_href: Dict[str, List[Dict[str, Any]]] = {}
+    for event in events_with_sheets:
+        events_by_href.setdefault(normalize_detail_href(event['detail_href']), []).append(event)
+
+    # Dive sheets of all divers share the engine's worker pool and in-flight budget
+    future_to_events = {
+        engine.submit(metrics.run, fetch_dive_sheet, engine, base_url, events[0], cache): events
+        for events in events_by_href.values()
+    }
 
-        for future in as_completed(future_to_event):
-            try:
-                updated_event = future.result()
-                # Find and update the original event in results_data
-                for i, event in enumerate(results_data):
-                    if (event.get('meet_name') == updated_event.get('meet_name') and
-                            event.get('event_name') == updated_event.get('event_name')):
-                        results_data[i] = updated_event
-                        break
-            except Exception as e:
-                event = future_to_event[future]
-                logger.error(f"Error processing dive sheet for {event.get('meet_name', 'Unknown')}: {e}")
+    for future in as_completed(future_to_events):
+        events = future_to_events[future]
+        try:
+            # fetch_dive_sheet fills in the event dict in place. Matching events back by meet and
+            # event name could clobber a different round of the same event.
+            future.result()
+            if 'dives' in events[0]:
+                for event in events[1:]:
+                    apply_dive_sheet(event, events[0])
+        except Exception as e:
+            logger.error(f"Error processing dive sheet for {events[0].get('meet_name', 'Unknown')}: {e}")
 
     return results_data
 
 
-def process_single_diver(diver: Dict[str, Any], base_url: str, headers: Dict[str, str]) -> Dict[str, Any]:
-    diver_id = diver['id']
+def compute_diver_fingerprint(profile_data: Dict[str, Any], results_data: List[Dict[str, Any]]) -> str:
+    """
+    Hash the parsed profile page so unchanged divers can be detected on later runs.
 
-    # Create a session for this diver to reuse connections
-    with requests.Session() as session:
-        session.headers.update(headers)
+    Args:
+        profile_data: Output of parse_diver_profile
+        results_data: Output of parse_diver_results (before dive sheets are fetched)
 
-        try:
-            # Fetch and parse the profile page
-            profile_full_url = base_url + diver['profile_url']
-            profile_response = session.get(profile_full_url, timeout=30)
-            profile_response.raise_for_status()
-            profile_html = profile_response.text
+    Returns:
+        Hex digest identifying the content of the profile page
+    """
+    payload = json.dumps({
+        'version': FINGERPRINT_VERSION,
+        # A new profile document format has every diver reprocessed, so their documents are rebuilt
+        'document_format': PROFILE_DOCUMENT_FORMAT,
+        'profile': profile_data,
+        'results': results_data
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-            profile_data = parse_diver_profile(profile_html)
-            results_data = parse_diver_results(profile_html)
 
-            # Process dive sheets in parallel for this diver
-            results_data = process_diver_dive_sheets_parallel(
-                session, base_url, results_data, headers, max_workers=5
-            )
+def load_diver_fingerprints(diver_ids: List[int], max_retries: int = 8) -> Dict[int, str]:
+    """
+    Load the stored profile fingerprints for the given divers from the Divers table.
 
-            # Update progress
-            update_progress()
+    UnprocessedKeys are retried with jittered backoff, divers still unread after max_retries are simply
+    scraped again.
+    """
+    import boto3
+    import os
 
-            return {
-                'id': diver_id,
-                **profile_data,
-                'results': results_data
+    table_name = os.environ.get('DIVERS_TABLE_NAME')
+    if not table_name or not diver_ids:
+        return {}
+
+    dynamodb = boto3.resource('dynamodb')
+    fingerprints = {}
+
+    # BatchGetItem accepts at most 100 keys per request
+    for start in range(0, len(diver_ids), 100):
+        request_items = {
+            table_name: {
+                'Keys': [{'diver_id': diver_id} for diver_id in diver_ids[start:start + 100]],
+                'ProjectionExpression': 'diver_id, profile_fingerprint'
             }
+        }
+        attempt = 0
+        while request_items:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(table_name, []):
+                if item.get('profile_fingerprint'):
+                    fingerprints[int(item['diver_id'])] = item['profile_fingerprint']
+            request_items = response.get('UnprocessedKeys') or None
+            if request_items:
+                # The table is throttling, give it time instead of resending at once
+                if attempt >= max_retries:
+                    logger.warning(f"Could not load the fingerprints of "
+                                   f"{len(request_items[table_name]['Keys'])} divers, they are scraped again")
+                    break
+                backoff(attempt)
+                attempt += 1
+
+    logger.info(f"Loaded stored fingerprints for {len(fingerprints)}/{len(diver_ids)} divers")
+    return fingerprints
+
+
+def process_single_diver(diver: Dict[str, Any], engine: FetchEngine, base_url: str,
+                         known_fingerprint: str = None, dive_sheet_cache: DiveSheetCache = None) -> Dict[str, Any]:
+    diver_id = diver['id']
+    # This diver's own stage timings, reported in the run report
+    started_at = time.perf_counter()
+    timings = {}
 
-        except Exception as e:
-            logger.error(f"Error processing diver ID {diver_id}: {e}")
+    try:
+        # Fetch and parse the profile page
+        profile_full_url = base_url + diver['profile_url']
+        with metrics.timer('profile_fetch', timings=timings):
+            profile_response = engine.get(profile_full_url)
+            profile_response.raise_for_status()
+            profile_html = profile_response.text
+
+        # One parse of the page yields both the profile fields and the results rows
+        with metrics.timer('profile_parse', timings=timings):
+            profile_data, results_data = parse_diver_page(profile_html)
+
+        # Skip the diver entirely when the profile page has not changed since the last import
+        fingerprint = compute_diver_fingerprint(profile_data, results_data)
+        if known_fingerprint and fingerprint == known_fingerprint:
+            logger.debug(f"Profile unchanged for diver ID {diver_id}, skipping")
             update_progress()
             return {
                 'id': diver_id,
-                'name': diver.get('name', 'Unknown'),
-                'error': str(e),
-                'results': []
+                'name': profile_data.get('name') or diver.get('name', 'Unknown'),
+                'skipped': True,
+                'results': [],
+                'timings': {**timings, 'total_ms': round(1000 * (time.perf_counter() - started_at), 1)}
             }
 
+        # Fetch this diver's dive sheets on the engine's shared workers
+        sheets_started_at = time.perf_counter()
+        results_data = process_diver_dive_sheets_parallel(engine, base_url, results_data, cache=dive_sheet_cache)
+        timings['dive_sheets_ms'] = round(1000 * (time.perf_counter() - sheets_started_at), 1)
+
+        # Update progress
+        update_progress()
+
+        diver_data = {
+            'id': diver_id,
+            **profile_data,
+            'results': results_data,
+            'timings': {**timings, 'total_ms': round(1000 * (time.perf_counter() - started_at), 1)}
+        }
+
+        # Only remember the fingerprint when every dive sheet was fetched,
+        # otherwise the next run would skip a diver with missing dives
+        if not any(result.get('detail_href') and 'dives' not in result for result in results_data):
+            diver_data['fingerprint'] = fingerprint
+
+        return diver_data
+
+    except Exception as e:
+        logger.error(f"Error processing diver ID {diver_id}: {e}")
+        update_progress()
+        return {
+            'id': diver_id,
+            'name': diver.get('name', 'Unknown'),
+            'error': str(e),
+            'results': [],
+            'timings': {**timings, 'total_ms': round(1000 * (time.perf_counter() - started_at), 1)}
+        }
+
 
-def extract_diving_data(max_diver_workers: int = 8) -> List[Dict[str, Any]]:
+def iter_diving_data(max_diver_workers: int = 8, incremental: bool = False,
+                     dive_sheet_cache: DiveSheetCache = None, queue_size: int = 16,
+                     engine: FetchEngine = None, max_in_flight: int = 16,
+                     max_per_host: int = 12, archive: PageArchive = None, replay: bool = False,
+                     replay_as_of: str = None, checkpoint: ImportCheckpoint = None,
+                     should_stop: Callable[[], bool] = None, divers: List[Dict[str, Any]] = None,
+                     team_numbers: List[str] = None) -> Iterator[Dict[str, Any]]:
     """
-    Main function to orchestrate the parallel data extraction process.
-    
+    Scrape the teams and yield each diver's data as soon as it has been processed.
+
+    At most max_diver_workers + queue_size divers are in flight or waiting to be consumed, so memory
+    stays bounded by the queue size instead of the team size and the consumer (e.g. the DynamoDB
+    writer) overlaps with scraping.
+
     Args:
         max_diver_workers: Maximum number of divers to process simultaneously
-    
-    Returns:
-        List of processed diver data
+        incremental: Skip divers whose profile page matches the fingerprint stored by the last import
+        dive_sheet_cache: Optional persistent cache for final dive sheets
+        queue_size: Number of finished divers allowed to wait for the consumer
+        engine: Shared fetch engine, one is created (with the limits below) when not given
+        max_in_flight: Global limit of concurrent HTTP requests
+        max_per_host: Limit of concurrent HTTP requests per host
+        archive: Optional page archive, every fetched page is recorded in it
+        replay: Serve every page from the archive instead of the network
+        replay_as_of: In replay mode, ignore pages archived after this ISO date/datetime
+        checkpoint: Progress of a resumable import, divers it lists as completed are not scraped again
+            and the number of divers left unscraped is recorded on it
+        should_stop: Checked while divers are processed, once it returns True no further divers are
+            started, divers queued but not yet started are left for the next invocation and the divers
+            already running are finished
+        divers: Scrape only these divers (as returned by load_teams_divers) instead of the team pages
+        team_numbers: Teams to import, defaults to TEAM_NUMBERS / TEAM_NUMBER. All teams share the
+            engine's request budget and a diver listed by several teams is scraped once
+
+    Yields:
+        Processed diver data, in completion order
     """
     start_time = time.time()
 
-    # Get team number from environment variable (required)
+    # Configuration
     import os
-    team_number = os.environ.get('TEAM_NUMBER')
-    
-    if not team_number:
-        logger.error("TEAM_NUMBER environment variable is required but not set.")
-        raise ValueError("TEAM_NUMBER environment variable is required but not set.")
+    base_url = os.environ.get('DIVEMEETS_BASE_URL', DEFAULT_BASE_URL)
+    team_numbers = get_team_numbers(team_numbers)
+
+    owns_engine = engine is None
+    if owns_engine:
+        engine = FetchEngine(DEFAULT_HEADERS, max_in_flight=max_in_flight, max_per_host=max_per_host,
+                             archive=archive, replay=replay, replay_as_of=replay_as_of)
 
-    # Validate team number is numeric
     try:
-        int(team_number)
-    except ValueError:
-        logger.error(f"Invalid team number: {team_number}. Team number must be numeric.")
-        raise ValueError(f"Invalid team number: {team_number}. Team number must be numeric.")
+        yield from _iter_team_divers(engine, base_url, team_numbers, max_diver_workers, incremental,
+                                     dive_sheet_cache, queue_size, checkpoint, should_stop, divers)
+    finally:
+        if owns_engine:
+            logger.info(f"Fetch stats: {engine.stats()}")
+            engine.close()
 
-    logger.info(f"Starting diving data extraction for team number: {team_number}")
+    execution_time = time.time() - start_time
+    logger.info(f"Total execution time: {execution_time:.2f} seconds")
 
 
-    # Configuration
-    base_url = 'https://secure.meetcontrol.com/divemeets/system/'
-    team_link = f"profilet.php?number={team_number}"
-
-    # Headers to mimic a real browser request
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
+def get_team_numbers(team_numbers: List[str] = None) -> List[str]:
+    """
+    Return the validated team numbers to import.
+
+    Uses the given list, else the comma-separated TEAM_NUMBERS environment variable, else TEAM_NUMBER.
+    """
+    import os
+    if not team_numbers:
+        # Get team numbers from environment variables (required)
+        configured = os.environ.get('TEAM_NUMBERS') or os.environ.get('TEAM_NUMBER')
+        if not configured:
+            logger.error("TEAM_NUMBER environment variable is required but not set.")
+            raise ValueError("TEAM_NUMBER environment variable is required but not set.")
+        team_numbers = configured.split(',')
+
+    validated = []
+    for team_number in team_numbers:
+        team_number = str(team_number).strip()
+        if not team_number:
+            continue
+
+        # Validate team number is numeric
+        try:
+            int(team_number)
+        except ValueError:
+            logger.error(f"Invalid team number: {team_number}. Team number must be numeric.")
+            raise ValueError(f"Invalid team number: {team_number}. Team number must be numeric.")
+
+        if team_number not in validated:
+            validated.append(team_number)
+
+    if not validated:
+        raise ValueError("No team numbers to import")
 
+    logger.info(f"Starting diving data extraction for team numbers: {', '.join(validated)}")
+    return validated
+
+
+def get_team_link(team_number: str) -> str:
+    return f"profilet.php?number={team_number}"
+
+
+def load_teams_divers(engine: FetchEngine, base_url: str, team_numbers: List[str]) -> List[Dict[str, Any]]:
+    """
+    Load the team pages of all teams and merge their divers.
+
+    A diver listed by several teams appears once, with every team in its 'team_numbers', so the diver,
+    its dive sheets and its meets are only scraped and written once per run.
+    """
+    futures = [engine.submit(metrics.run, load_team_divers, engine, base_url, get_team_link(team_number))
+               for team_number in team_numbers]
+
+    divers_by_id: Dict[int, Dict[str, Any]] = {}
+    for team_number, future in zip(team_numbers, futures):
+        for diver in future.result():
+            merged = divers_by_id.setdefault(diver['id'], {**diver, 'team_numbers': []})
+            merged['team_numbers'].append(team_number)
+
+    shared = sum(len(diver['team_numbers']) > 1 for diver in divers_by_id.values())
+    if len(team_numbers) > 1:
+        logger.info(f"{len(divers_by_id)} divers in {len(team_numbers)} teams, {shared} listed by several teams")
+    return list(divers_by_id.values())
+
+
+def load_team_divers(engine: FetchEngine, base_url: str, team_link: str) -> List[Dict[str, Any]]:
+    """Fetch the team page and return its divers"""
     # Load the team page
     team_url = base_url + team_link
-    with requests.Session() as session:
-        session.headers.update(headers)
-        response = session.get(team_url, timeout=30)
+    with metrics.timer('team_fetch'):
+        response = engine.get(team_url)
         response.raise_for_status()
         team_html = response.text
 
@@ -468,50 +904,136 @@ def extract_diving_data(max_diver_workers: int = 8) -> List[Dict[str, Any]]:
         logger.error("No divers found in team page")
         raise Exception("No divers found in team page")
 
+    return divers
+
+
+def _iter_team_divers(engine: FetchEngine, base_url: str, team_numbers: List[str], max_diver_workers: int,
+                      incremental: bool, dive_sheet_cache: DiveSheetCache, queue_size: int,
+                      checkpoint: ImportCheckpoint = None, should_stop: Callable[[], bool] = None,
+                      divers: List[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    if divers is None:
+        divers = load_teams_divers(engine, base_url, team_numbers)
+
+    # Resume a checkpointed import where the previous invocation stopped
+    if checkpoint and checkpoint.completed:
+        divers = [diver for diver in divers if diver['id'] not in checkpoint.completed]
+        logger.info(f"Resuming import, {len(checkpoint.completed)} divers already done, {len(divers)} left")
+
     # Initialize progress counter
     progress_counter['total'] = len(divers)
     progress_counter['processed'] = 0
 
+    fingerprints = load_diver_fingerprints([diver['id'] for diver in divers]) if incremental and divers else {}
+
     logger.info(f"Processing {len(divers)} divers with {max_diver_workers} parallel workers")
 
-    # Process divers in parallel
-    all_diver_data = []
+    # Process divers in parallel, keeping a bounded number of them in flight
+    max_pending = max_diver_workers + max(queue_size, 0)
+    remaining_divers = iter(divers)
+    future_to_diver = {}
+    totals = {'total': 0, 'errors': 0, 'skipped': 0, 'submitted': 0}
+
+    stopping = False
+
+    def time_is_up() -> bool:
+        nonlocal stopping
+        stopping = stopping or bool(should_stop and should_stop())
+        return stopping
+
+    def submit_next(executor) -> bool:
+        # Leave the rest of the team for the next invocation once time runs out
+        if time_is_up():
+            return False
+        diver = next(remaining_divers, None)
+        if diver is None:
+            return False
+        future = executor.submit(
+            metrics.run, process_single_diver, diver, engine, base_url, fingerprints.get(diver['id']), dive_sheet_cache
+        )
+        future_to_diver[future] = diver
+        totals['submitted'] += 1
+        return True
+
     with ThreadPoolExecutor(max_workers=max_diver_workers) as executor:
-        # Submit all diver processing tasks
-        future_to_diver = {
-            executor.submit(process_single_diver, diver, base_url, headers): diver
-            for diver in divers
-        }
+        try:
+            while len(future_to_diver) < max_pending and submit_next(executor):
+                pass
+
+            while future_to_diver:
+                # Wake up regularly, so the deadline is noticed while long divers are still running
+                done, _ = wait(future_to_diver, timeout=1, return_when=FIRST_COMPLETED)
+                if time_is_up():
+                    # Queued divers would run past the deadline, only the running ones are finished
+                    for future in list(future_to_diver):
+                        if future not in done and future.cancel():
+                            del future_to_diver[future]
+                            totals['submitted'] -= 1
+                for future in done:
+                    diver = future_to_diver.pop(future)
+                    try:
+                        diver_data = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process diver {diver.get('name', 'Unknown')}: {e}")
+                        # Add error entry
+                        diver_data = {
+                            'id': diver['id'],
+                            'name': diver.get('name', 'Unknown'),
+                            'error': str(e),
+                            'results': []
+                        }
 
-        # Collect results as they complete
-        for future in as_completed(future_to_diver):
-            try:
-                diver_data = future.result()
-                all_diver_data.append(diver_data)
-            except Exception as e:
-                diver = future_to_diver[future]
-                logger.error(f"Failed to process diver {diver.get('name', 'Unknown')}: {e}")
-                # Add error entry
-                all_diver_data.append({
-                    'id': diver['id'],
-                    'name': diver.get('name', 'Unknown'),
-                    'error': str(e),
-                    'results': []
-                })
+                    diver_data.setdefault('team_numbers', diver.get('team_numbers', []))
 
-    # Sort results by diver ID for consistent output
-    all_diver_data.sort(key=lambda x: x['id'])
+                    totals['total'] += 1
+                    totals['errors'] += 'error' in diver_data
+                    totals['skipped'] += bool(diver_data.get('skipped'))
 
-    # Log summary
-    successful_divers = [d for d in all_diver_data if 'error' not in d]
-    error_divers = [d for d in all_diver_data if 'error' in d]
+                    # Refill before handing the diver over so scraping continues while it is consumed
+                    submit_next(executor)
+                    yield diver_data
+        finally:
+            # Stop scraping divers nobody will consume if the consumer stopped early
+            for future in future_to_diver:
+                future.cancel()
+
+    remaining = len(divers) - totals['submitted']
+    if checkpoint:
+        checkpoint.remaining = remaining
+    if remaining:
+        logger.warning(f"Stopped before the deadline with {remaining} divers left")
 
+    # Log summary
     logger.info(
-        f"Extraction completed - Total: {len(all_diver_data)}, Successful: {len(successful_divers)}, Errors: {len(error_divers)}")
+        f"Extraction completed - Total: {totals['total']}, Successful: {totals['total'] - totals['errors']}, "
+        f"Errors: {totals['errors']}, Unchanged: {totals['skipped']}")
 
-    execution_time = time.time() - start_time
-    logger.info(f"Total execution time: {execution_time:.2f} seconds")
 
+def extract_diving_data(max_diver_workers: int = 8, incremental: bool = False,
+                        dive_sheet_cache: DiveSheetCache = None, archive: PageArchive = None,
+                        replay: bool = False, replay_as_of: str = None,
+                        team_numbers: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Main function to orchestrate the parallel data extraction process.
+    
+    Args:
+        max_diver_workers: Maximum number of divers to process simultaneously
+        incremental: Skip divers whose profile page matches the fingerprint stored by the last import
+        dive_sheet_cache: Optional persistent cache for final dive sheets
+        archive: Optional page archive to record fetched pages in (or to replay from)
+        replay: Rebuild the data from the archive without any network request
+        replay_as_of: In replay mode, ignore pages archived after this ISO date/datetime
+        team_numbers: Teams to import, defaults to TEAM_NUMBERS / TEAM_NUMBER
+    
+    Returns:
+        List of processed diver data
+    """
+    all_diver_data = list(iter_diving_data(
+        max_diver_workers, incremental, dive_sheet_cache,
+        archive=archive, replay=replay, replay_as_of=replay_as_of, team_numbers=team_numbers
+    ))
+
+    # Sort results by diver ID for consistent output
+    all_diver_data.sort(key=lambda x: x['id'])
     return all_diver_data
 
 
@@ -552,145 +1074,129 @@ def generate_result_key(diver_id: int, competition_id: str, event_name: str, rou
     return f"{diver_id}_{competition_id}_{clean_event}"
 
 
-def insert_diver_data(dynamodb, table_name: str, diver_data: Dict[str, Any]) -> bool:
-    """Insert or update diver profile data in DynamoDB"""
-    try:
-        table = dynamodb.Table(table_name)
-
-        # Prepare diver item
-        diver_item = {
-            'diver_id': diver_data['id'],
-            'name': diver_data.get('name', ''),
-            'city_state': diver_data.get('city_state', ''),
-            'country': diver_data.get('country', ''),
-            'gender': diver_data.get('gender', ''),
-            'age': convert_to_decimal(diver_data.get('age')),
-            'fina_age': convert_to_decimal(diver_data.get('fina_age')),
-            'hs_grad_year': convert_to_decimal(diver_data.get('hs_grad_year')),
-            'last_updated': datetime.utcnow().isoformat()
-        }
-
-        # Remove None values
-        diver_item = {k: v for k, v in diver_item.items() if v is not None}
-
-        # Use put_item to insert or update
-        table.put_item(Item=diver_item)
-        logger.debug(f"Inserted/updated diver: {diver_data.get('name', 'Unknown')} (ID: {diver_data['id']})")
-        return True
-
-    except Exception as e:
-        logger.error(f"Error inserting diver data for ID {diver_data['id']}: {e}")
-        return False
-
-
-def insert_competition_data(dynamodb, table_name: str, competition_id: str, meet_name: str,
-                            start_date: str = None, end_date: str = None) -> bool:
-    """Insert or update competition data in DynamoDB"""
-    try:
-        table = dynamodb.Table(table_name)
-
-        # Prepare competition item
-        competition_item = {
-            'competition_id': competition_id,
-            'meet_name': meet_name,
-            'start_date': start_date,
-            'end_date': end_date,
-            'last_updated': datetime.utcnow().isoformat()
-        }
+def build_diver_item(diver_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the Divers table item for a scraped diver"""
+    diver_item = {
+        'diver_id': diver_data['id'],
+        'name': diver_data.get('name', ''),
+        'city_state': diver_data.get('city_state', ''),
+        'country': diver_data.get('country', ''),
+        'gender': diver_data.get('gender', ''),
+        'age': convert_to_decimal(diver_data.get('age')),
+        'fina_age': convert_to_decimal(diver_data.get('fina_age')),
+        'hs_grad_year': convert_to_decimal(diver_data.get('hs_grad_year')),
+        'profile_fingerprint': diver_data.get('fingerprint'),
+        'last_updated': datetime.utcnow().isoformat()
+    }
 
-        # Remove None values
-        competition_item = {k: v for k, v in competition_item.items() if v is not None}
+    # Remove None values
+    return {k: v for k, v in diver_item.items() if v is not None}
 
-        # Use put_item to insert or update
-        table.put_item(Item=competition_item)
-        logger.debug(f"Inserted/updated competition: {meet_name}")
-        return True
-
-    except Exception as e:
-        logger.error(f"Error inserting competition data for {meet_name}: {e}")
-        return False
 
+def build_competition_item(competition_id: str, meet_name: str, start_date: str = None,
+                           end_date: str = None) -> Dict[str, Any]:
+    """Build the Competitions table item for a meet"""
+    competition_item = {
+        'competition_id': competition_id,
+        'meet_name': meet_name,
+        'start_date': start_date,
+        'end_date': end_date,
+        'last_updated': datetime.utcnow().isoformat()
+    }
 
-def insert_result_data(dynamodb, results_table_name: str, diver_id: int, result_data: Dict[str, Any],
-                       competition_id: str) -> bool:
-    try:
-        table = dynamodb.Table(results_table_name)
-
-        event_key = f"{competition_id}#{result_data['event_name']}"
-        if result_data.get('round_type'):
-            event_key += f"#{result_data['round_type']}"
-
-        result_item = {
-            'diver_id': diver_id,
-            'competition_event_key': event_key,
-            'competition_id': competition_id,
-            'meet_name': result_data['meet_name'],
-            'event_name': result_data['event_name'],
-            'round_type': result_data.get('round_type', ''),
-            'total_score': convert_to_decimal(result_data.get('total_score')),
-            'detail_href': result_data.get('detail_href'),
-            'start_date': result_data.get('start_date'),
-            'end_date': result_data.get('end_date'),
-            'last_updated': datetime.utcnow().isoformat()
-        }
+    # Remove None values
+    return {k: v for k, v in competition_item.items() if v is not None}
+
+
+def build_result_item(diver_id: int, result_data: Dict[str, Any], competition_id: str) -> Dict[str, Any]:
+    """Build the Results table item for one event result of a diver"""
+    event_key = f"{competition_id}#{result_data['event_name']}"
+    if result_data.get('round_type'):
+        event_key += f"#{result_data['round_type']}"
+
+    result_item = {
+        'diver_id': diver_id,
+        'competition_event_key': event_key,
+        'competition_id': competition_id,
+        'meet_name': result_data['meet_name'],
+        'event_name': result_data['event_name'],
+        'round_type': result_data.get('round_type', ''),
+        'total_score': convert_to_decimal(result_data.get('total_score')),
+        'detail_href': result_data.get('detail_href'),
+        'start_date': result_data.get('start_date'),
+        'end_date': result_data.get('end_date'),
+        'last_updated': datetime.utcnow().isoformat()
+    }
 
-        # Remove None values
-        result_item = {k: v for k, v in result_item.items() if v is not None}
+    # Remove None values
+    return {k: v for k, v in result_item.items() if v is not None}
+
+
+def build_dive_item(result_key: str, dive_data: Dict[str, Any], diver_id: int = None) -> Dict[str, Any]:
+    """Build the Dives table item for a single dive of a result"""
+    dive_item = {
+        'result_key': result_key,
+        'dive_round': dive_data['dive_round'],
+        # Partition key of the DiverIndex, which loads a diver's whole dive history in one query
+        'diver_id': diver_id,
+        'code': dive_data.get('code', ''),
+        'description': dive_data.get('description', ''),
+        'height': dive_data.get('height', ''),
+        'difficulty': convert_to_decimal(dive_data.get('difficulty')),
+        'scores': [convert_to_decimal(score) for score in dive_data.get('scores', [])],
+        'net_total': convert_to_decimal(dive_data.get('net_total')),
+        'award': convert_to_decimal(dive_data.get('award')),
+        'round_place': convert_to_decimal(dive_data.get('round_place')),
+        'last_updated': datetime.utcnow().isoformat()
+    }
 
-        # Use put_item to insert or update
-        table.put_item(Item=result_item)
-        logger.debug(f"Inserted/updated result: {result_data['meet_name']} - {result_data['event_name']}")
-        return True
+    # Remove None values (but keep empty lists)
+    return {k: v for k, v in dive_item.items() if v is not None}
 
-    except Exception as e:
-        logger.error(f"Error inserting result data: {e}")
-        return False
 
+def store_data_in_dynamodb(diving_data: Iterable[Dict[str, Any]], max_write_workers: int = 4,
+                           skip_unchanged: bool = True, processed_competitions: set = None,
+                           dive_layout: str = ITEMS_LAYOUT,
+                           on_divers_stored: Callable[[List[int]], None] = None,
+                           progress_every: int = 20, written_competitions: set = None) -> Dict[str, Any]:
+    """
+    Write scraped divers to DynamoDB. diving_data may be a generator, divers are written as they arrive.
 
-def insert_dive_data(dynamodb, dives_table_name: str, result_key: str, dive_data: Dict[str, Any]) -> bool:
-    try:
-        table = dynamodb.Table(dives_table_name)
-
-        # Prepare dive item
-        dive_item = {
-            'result_key': result_key,
-            'dive_round': dive_data['dive_round'],
-            'code': dive_data.get('code', ''),
-            'description': dive_data.get('description', ''),
-            'height': dive_data.get('height', ''),
-            'difficulty': convert_to_decimal(dive_data.get('difficulty')),
-            'scores': [convert_to_decimal(score) for score in dive_data.get('scores', [])],
-            'net_total': convert_to_decimal(dive_data.get('net_total')),
-            'award': convert_to_decimal(dive_data.get('award')),
-            'round_place': convert_to_decimal(dive_data.get('round_place')),
-            'last_updated': datetime.utcnow().isoformat()
-        }
+    Every item carries a content_hash and every result a dives_hash over its dives. With skip_unchanged,
+    the stored hashes are loaded (one Results query per diver, BatchGetItem for competitions and divers)
+    and only new or changed rows are written. Results and dives stored for a diver but no longer scraped
+    are reported as stale, they are not deleted.
 
-        # Remove None values (but keep empty lists)
-        dive_item = {k: v for k, v in dive_item.items() if v is not None}
+    With dive_layout 'packed', all dives of a result are written as one compressed item (see packed_dives)
+    and the result is marked with dive_layout, so readers know which layout to load.
 
-        # Use put_item to insert or update
-        table.put_item(Item=dive_item)
-        logger.debug(f"Inserted/updated dive: {result_key} - Round {dive_data['dive_round']}")
-        return True
+    When DIVER_PROFILES_TABLE_NAME is set, every stored diver's profile API response is also materialized
+    in that table (see diver_profiles). Divers whose dives could not all be fetched or written get a
+    stale marker instead, so the API assembles their profile live.
 
-    except Exception as e:
-        logger.error(f"Error inserting dive data: {e}")
-        return False
+    processed_competitions may be shared between calls so a meet seen by several teams is written once.
+    written_competitions collects the IDs of the competitions queued for writing.
 
+    With on_divers_stored, the divers are finished in batches of progress_every: all their rows are written
+    and on_divers_stored is called with their IDs (skipped and failed divers included), e.g. to save the
+    progress of a resumable import. Without it, results, divers and profiles are written once at the end.
+    """
+    if dive_layout not in DIVE_LAYOUTS:
+        raise ValueError(f"Invalid dive_layout: {dive_layout}. Use 'items' or 'packed'.")
 
-def store_data_in_dynamodb(diving_data: List[Dict[str, Any]]) -> Dict[str, int]:
     import boto3
     import os
 
     # Initialize DynamoDB resource
     dynamodb = boto3.resource('dynamodb')
+    client = dynamodb.meta.client
 
     # Get table names from environment variables
     divers_table_name = os.environ.get('DIVERS_TABLE_NAME')
     competitions_table_name = os.environ.get('COMPETITIONS_TABLE_NAME')
     results_table_name = os.environ.get('RESULTS_TABLE_NAME')
     dives_table_name = os.environ.get('DIVES_TABLE_NAME')
+    diver_profiles_table_name = profiles_table_name()
 
     if not all([divers_table_name, competitions_table_name, results_table_name, dives_table_name]):
         raise ValueError("Missing required environment variables for DynamoDB table names")
@@ -701,70 +1207,783 @@ def store_data_in_dynamodb(diving_data: List[Dict[str, Any]]) -> Dict[str, int]:
         'competitions': 0,
         'results': 0,
         'dives': 0,
-        'errors': 0
+        'skipped': 0,
+        'errors': 0,
+        # Stored results left as they are because their dive sheet could not be fetched
+        'kept_results': 0
     }
+    unchanged = {'divers': 0, 'competitions': 0, 'results': 0, 'dives': 0, 'profiles': 0}
+    stale = {'results': 0, 'dives': 0, 'result_keys': []}
 
     # Keep track of competitions we've already processed
-    processed_competitions = set()
-
-    logger.info(f"Starting to store data for {len(diving_data)} divers in DynamoDB")
+    if processed_competitions is None:
+        processed_competitions = set()
+
+    # Divers whose rows could not all be queued, their fingerprint must not be stored
+    incomplete_divers = set()
+
+    # Diver and result items are written after the dives they vouch for, see below
+    pending_divers = []
+    pending_results = []
+    # Compressed profile documents, written last as they describe everything else
+    pending_profiles = []
+    # Divers read since the last write_pending, reported to on_divers_stored once all their rows are written
+    batch_diver_ids = []
+
+    logger.info("Starting to store diver data in DynamoDB")
+
+    writer = ParallelBatchWriter(dynamodb, {
+        divers_table_name: ['diver_id'],
+        competitions_table_name: ['competition_id'],
+        results_table_name: ['diver_id', 'competition_event_key'],
+        dives_table_name: ['result_key', 'dive_round'],
+        **({diver_profiles_table_name: ['diver_id']} if diver_profiles_table_name else {}),
+    }, max_workers=max_write_workers, metrics=metrics)
+
+    def write_pending() -> None:
+        # A result's hashes vouch for its dives, so result items are only written once the dives are.
+        # Results of divers with failed writes are stored without hashes and rewritten by the next run.
+        writer.flush()
+        for diver_id, result_item in pending_results:
+            if diver_id in incomplete_divers or diver_id in writer.failed_tags:
+                result_item.pop(HASH_ATTRIBUTE, None)
+                result_item.pop('dives_hash', None)
+                result_item.pop(DIVE_COUNT_ATTRIBUTE, None)
+            writer.put(results_table_name, result_item, tag=diver_id)
+
+        # Diver items carry the fingerprint used by incremental imports, so they are only written once
+        # every result and dive of the diver has been written
+        writer.flush()
+        diver_items = []
+        for diver_data in pending_divers:
+            if diver_data['id'] in incomplete_divers or diver_data['id'] in writer.failed_tags:
+                diver_data.pop('fingerprint', None)
+            diver_items.append(with_content_hash(build_diver_item(diver_data)))
+
+        stored_divers = {}
+        if skip_unchanged and diver_items:
+            try:
+                with metrics.timer('dynamodb_read', table=divers_table_name):
+                    stored_divers = batch_get_hashes(client, divers_table_name, ['diver_id'],
+                                                     [(item['diver_id'],) for item in diver_items])
+            except Exception as e:
+                logger.warning(f"Could not load stored diver hashes: {e}")
+        for item in diver_items:
+            if stored_divers.get((item['diver_id'],)) == item[HASH_ATTRIBUTE]:
+                unchanged['divers'] += 1
+            else:
+                writer.put(divers_table_name, item)
+
+        # Profile documents go last, only divers whose rows were all written get one
+        if pending_profiles:
+            writer.flush()
+            profile_items = []
+            for diver_id, item in pending_profiles:
+                if item is None or diver_id in incomplete_divers or diver_id in writer.failed_tags:
+                    item = build_stale_profile_item(diver_id)
+                profile_items.append(item)
+
+            stored_profiles = {}
+            if skip_unchanged:
+                try:
+                    with metrics.timer('dynamodb_read', table=diver_profiles_table_name):
+                        stored_profiles = batch_get_hashes(client, diver_profiles_table_name, ['diver_id'],
+                                                           [(item['diver_id'],) for item in profile_items])
+                except Exception as e:
+                    logger.warning(f"Could not load stored profile document hashes: {e}")
+            for item in profile_items:
+                stored_hash = stored_profiles.get((item['diver_id'],), False)
+                if HASH_ATTRIBUTE in item and stored_hash == item[HASH_ATTRIBUTE]:
+                    unchanged['profiles'] += 1
+                else:
+                    writer.put(diver_profiles_table_name, item)
+
+        # Every row of the divers read so far is written now, so their progress may be recorded
+        writer.flush()
+        pending_results.clear()
+        pending_divers.clear()
+        pending_profiles.clear()
+        if on_divers_stored and batch_diver_ids:
+            on_divers_stored(list(batch_diver_ids))
+        batch_diver_ids.clear()
+
+    with writer:
+        for diver_data in diving_data:
+            batch_diver_ids.append(diver_data.get('id'))
+            try:
+                # Skip divers with errors
+                if 'error' in diver_data:
+                    logger.warning(
+                        f"Skipping diver {diver_data.get('name', 'Unknown')} due to error: {diver_data['error']}")
+                    counts['errors'] += 1
+                    continue
 
-    for diver_data in diving_data:
-        try:
-            # Skip divers with errors
-            if 'error' in diver_data:
-                logger.warning(
-                    f"Skipping diver {diver_data.get('name', 'Unknown')} due to error: {diver_data['error']}")
-                counts['errors'] += 1
-                continue
+                # Skip divers whose profile page has not changed since the last import
+                if diver_data.get('skipped'):
+                    counts['skipped'] += 1
+                    continue
 
-            # Insert diver profile data
-            if insert_diver_data(dynamodb, divers_table_name, diver_data):
-                counts['divers'] += 1
+                diver_id = diver_data['id']
+
+                existing_results = None
+                if skip_unchanged:
+                    try:
+                        with metrics.timer('dynamodb_read', table=results_table_name):
+                            existing_results = query_hashes(client, results_table_name, 'diver_id', diver_id,
+                                                            'competition_event_key',
+                                                            ['dives_hash', DIVE_LAYOUT_ATTRIBUTE])
+                    except Exception as e:
+                        # Without the stored hashes every row of the diver is simply rewritten
+                        logger.warning(f"Could not load stored hashes for diver {diver_id}: {e}")
+
+                new_competitions = {}
+                profile_results = []
+
+                # Process each competition result
+                for result in diver_data.get('results', []):
+                    try:
+                        # Generate competition ID
+                        competition_id = generate_competition_id(
+                            result['meet_name'],
+                            result.get('start_date')
+                        )
 
-            # Process each competition result
-            for result in diver_data.get('results', []):
-                try:
-                    # Generate competition ID
-                    competition_id = generate_competition_id(
-                        result['meet_name'],
-                        result.get('start_date')
-                    )
-
-                    # Insert competition data (if not already processed)
-                    if competition_id not in processed_competitions:
-                        if insert_competition_data(
-                                dynamodb, competitions_table_name, competition_id,
-                                result['meet_name'], result.get('start_date'), result.get('end_date')
-                        ):
-                            counts['competitions'] += 1
+                        # Collect competition data (if not already processed)
+                        if competition_id not in processed_competitions:
+                            new_competitions[competition_id] = with_content_hash(build_competition_item(
+                                competition_id, result['meet_name'], result.get('start_date'), result.get('end_date')
+                            ))
                             processed_competitions.add(competition_id)
 
-                    # Insert result data
-                    if insert_result_data(dynamodb, results_table_name, diver_data['id'], result, competition_id):
-                        counts['results'] += 1
-
-                    # Insert individual dive data
-                    if result.get('dives'):
                         result_key = generate_result_key(
-                            diver_data['id'], competition_id,
+                            diver_id, competition_id,
                             result['event_name'], result.get('round_type', '')
                         )
+                        dive_items = [with_content_hash(build_dive_item(result_key, dive, diver_id))
+                                      for dive in result.get('dives') or []]
+
+                        result_item = build_result_item(diver_id, result, competition_id)
+                        # Tells readers of the DiverIndex how many dives to expect. Without a dive sheet a
+                        # result has none, a sheet that could not be fetched leaves the stored dives alone.
+                        if dive_items or not result.get('detail_href'):
+                            result_item[DIVE_COUNT_ATTRIBUTE] = len(dive_items)
+                        if dive_items:
+                            result_item['dives_hash'] = combine_hashes(
+                                (item['dive_round'], item[HASH_ATTRIBUTE]) for item in dive_items
+                            )
+                            if dive_layout == PACKED_LAYOUT:
+                                result_item[DIVE_LAYOUT_ATTRIBUTE] = PACKED_LAYOUT
+                        with_content_hash(result_item)
+
+                        if diver_profiles_table_name:
+                            profile_results.append(format_result(result_item, format_dives(dive_items)))
+
+                        stored = (existing_results or {}).pop(result_item['competition_event_key'], None)
+                        # Rewriting a result whose sheet could not be fetched would drop the dives_hash,
+                        # dive_count and dive_layout that lead readers to its stored (e.g. packed) dives.
+                        # Only a result known to be new is written without them.
+                        if result.get('detail_href') and 'dives' not in result \
+                                and (stored or existing_results is None):
+                            counts['kept_results'] += 1
+                            continue
+                        if stored and stored.get(HASH_ATTRIBUTE) == result_item[HASH_ATTRIBUTE]:
+                            unchanged['results'] += 1
+                            unchanged['dives'] += len(dive_items)
+                            continue
+
+                        # Dives are only compared with stored dives of the same layout
+                        stored_layout = (stored or {}).get(DIVE_LAYOUT_ATTRIBUTE, ITEMS_LAYOUT)
+                        same_layout = stored_layout == result_item.get(DIVE_LAYOUT_ATTRIBUTE, ITEMS_LAYOUT)
+
+                        # Queue individual dive data, only the dives that changed when the stored result has them
+                        if stored and same_layout and stored.get('dives_hash') == result_item.get('dives_hash'):
+                            unchanged['dives'] += len(dive_items)
+                        elif dive_layout == PACKED_LAYOUT:
+                            # One item replaces all dives of the result, a changed dive rewrites it whole
+                            if dive_items:
+                                writer.put(dives_table_name, pack_dives(result_key, dive_items,
+                                                                        result_item['dives_hash'], diver_id),
+                                           tag=diver_id)
+                        elif stored and same_layout and stored.get('dives_hash'):
+                            with metrics.timer('dynamodb_read', table=dives_table_name):
+                                stored_dives = query_hashes(client, dives_table_name, 'result_key', result_key,
+                                                            'dive_round')
+                            # A packed item left over from an earlier layout is ignored by readers of this result
+                            stored_dives.pop(PACKED_DIVE_ROUND, None)
+                            for item in dive_items:
+                                stored_dive = stored_dives.pop(item['dive_round'], {})
+                                if stored_dive.get(HASH_ATTRIBUTE) == item[HASH_ATTRIBUTE]:
+                                    unchanged['dives'] += 1
+                                else:
+                                    writer.put(dives_table_name, item, tag=diver_id)
+                            stale['dives'] += len(stored_dives)
+                        else:
+                            for item in dive_items:
+                                writer.put(dives_table_name, item, tag=diver_id)
+
+                        pending_results.append((diver_id, result_item))
+
+                    except Exception as e:
+                        logger.error(f"Error processing result for diver {diver_id}: {e}")
+                        counts['errors'] += 1
+                        incomplete_divers.add(diver_id)
+
+                # Queue the diver's new or changed competitions
+                stored_competitions = {}
+                if skip_unchanged and new_competitions:
+                    try:
+                        with metrics.timer('dynamodb_read', table=competitions_table_name):
+                            stored_competitions = batch_get_hashes(
+                                client, competitions_table_name, ['competition_id'],
+                                [(competition_id,) for competition_id in new_competitions]
+                            )
+                    except Exception as e:
+                        logger.warning(f"Could not load stored competition hashes: {e}")
+                for competition_id, item in new_competitions.items():
+                    if stored_competitions.get((competition_id,)) == item[HASH_ATTRIBUTE]:
+                        unchanged['competitions'] += 1
+                    else:
+                        writer.put(competitions_table_name, item, tag=diver_id)
+                        if written_competitions is not None:
+                            written_competitions.add(competition_id)
+
+                # Whatever is left in the table was not scraped this time
+                if existing_results and diver_id not in incomplete_divers:
+                    stale['results'] += len(existing_results)
+                    for event_key in existing_results:
+                        if len(stale['result_keys']) < 100:
+                            stale['result_keys'].append(f"{diver_id}/{event_key}")
+
+                # Keep only the profile fields, the results are already queued
+                pending_divers.append({k: v for k, v in diver_data.items() if k != 'results'})
+
+                if diver_profiles_table_name:
+                    # A document missing dives would hide the dives stored by earlier runs
+                    complete = not any(result.get('detail_href') and 'dives' not in result
+                                       for result in diver_data.get('results', []))
+                    profile = {**format_diver(build_diver_item(diver_data)), 'results': sort_results(profile_results)}
+                    pending_profiles.append((diver_id, build_profile_item(diver_id, profile) if complete else None))
+
+            except Exception as e:
+                logger.error(f"Error processing diver {diver_data.get('id', 'Unknown')}: {e}")
+                counts['errors'] += 1
+            finally:
+                # Finish the divers read so far every now and then, so their progress can be saved
+                if on_divers_stored and len(batch_diver_ids) >= progress_every:
+                    write_pending()
+
+        write_pending()
+
+    write_stats = writer.stats()
+    table_counts = {
+        'divers': divers_table_name,
+        'competitions': competitions_table_name,
+        'results': results_table_name,
+        'dives': dives_table_name,
+        'profiles': diver_profiles_table_name,
+    }
+    for count_name, table_name in table_counts.items():
+        counts[count_name] = write_stats['tables'].get(table_name, {}).get('written', 0)
+    counts['errors'] += write_stats['items_failed']
+    counts['unchanged'] = unchanged
+    counts['stale'] = stale
+    counts['write_stats'] = write_stats
+
+    logger.info(f"Data storage completed. Counts: {counts}")
+    return counts
 
-                        for dive in result['dives']:
-                            if insert_dive_data(dynamodb, dives_table_name, result_key, dive):
-                                counts['dives'] += 1
 
-                except Exception as e:
-                    logger.error(f"Error processing result for diver {diver_data['id']}: {e}")
-                    counts['errors'] += 1
+def diver_report_line(diver_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The run report's line for one processed diver"""
+    results = diver_data.get('results', [])
+    if 'error' in diver_data:
+        status = 'error'
+    elif diver_data.get('skipped'):
+        status = 'unchanged'
+    else:
+        status = 'ok'
+
+    line = {
+        'type': 'diver',
+        'diver_id': diver_data['id'],
+        'name': diver_data.get('name'),
+        'team_numbers': diver_data.get('team_numbers'),
+        'status': status,
+        'results': len(results),
+        'dives': sum(len(result.get('dives') or []) for result in results),
+        'missing_dive_sheets': sum(bool(result.get('detail_href')) and 'dives' not in result for result in results),
+        'timings': diver_data.get('timings'),
+    }
+    if 'error' in diver_data:
+        line['error'] = diver_data['error']
+    return line
+
+
+def track_divers(diving_data: Iterable[Dict[str, Any]], summary: Dict[str, int], report: RunReport = None,
+                 team_summaries: Dict[str, Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """Pass divers through unchanged while tallying the run summary (and writing their run report lines)"""
+    for diver_data in diving_data:
+        # A diver listed by several teams counts for each of them
+        if team_summaries is not None:
+            results = diver_data.get('results', [])
+            for team_number in diver_data.get('team_numbers') or []:
+                team = team_summaries.setdefault(team_number, {
+                    'total_divers': 0, 'successful_divers': 0, 'error_divers': 0, 'unchanged_divers': 0,
+                    'results': 0, 'dives': 0
+                })
+                team['total_divers'] += 1
+                team['error_divers' if 'error' in diver_data else 'successful_divers'] += 1
+                team['unchanged_divers'] += bool(diver_data.get('skipped'))
+                team['results'] += len(results)
+                team['dives'] += sum(len(result.get('dives') or []) for result in results)
+
+        summary['total_divers'] += 1
+        if 'error' in diver_data:
+            summary['error_divers'] += 1
+        else:
+            summary['successful_divers'] += 1
+        if diver_data.get('skipped'):
+            summary['unchanged_divers'] += 1
+        if report is not None:
+            report.write(diver_report_line(diver_data))
+        yield diver_data
 
+
+def start_run_report(run_id: str, part: str = None, **header) -> RunReport:
+    """Start the configured run report (None when there is none) with a line describing the run"""
+    try:
+        report = create_run_report(run_id, part)
+    except Exception as e:
+        logger.warning(f"Could not start the run report: {e}")
+        return None
+
+    if report is not None:
+        report.write({'type': 'run', 'run_id': run_id, 'started_at': datetime.utcnow().isoformat(), **header})
+    return report
+
+
+def finish_run_report(report: RunReport, body: Dict[str, Any]) -> str:
+    """Close the report with a summary line holding the response body. Returns its location."""
+    if report is None:
+        return None
+    report.write({'type': 'summary', **{name: value for name, value in body.items() if name != 'profile'}})
+    return report.close()
+
+
+def create_page_sources(archive_mode: str) -> Tuple[PageArchive, bool, DiveSheetCache]:
+    """Return the page archive, the replay flag and the dive-sheet cache for an archive_mode"""
+    if archive_mode not in ('record', 'replay', 'off'):
+        raise ValueError(f"Invalid archive_mode: {archive_mode}. Use 'record', 'replay' or 'off'.")
+
+    archive = create_page_archive() if archive_mode != 'off' else None
+    replay = archive_mode == 'replay'
+    if replay and archive is None:
+        raise ValueError("archive_mode 'replay' needs ARCHIVE_BUCKET or ARCHIVE_PATH to be set")
+
+    # Replaying re-parses every archived page, cached dive sheets would hide the pages
+    dive_sheet_cache = None if replay else create_dive_sheet_cache()
+    return archive, replay, dive_sheet_cache
+
+
+def run_import_shard(divers: List[Dict[str, Any]], max_workers: int = 8, incremental: bool = False,
+                     max_write_workers: int = 4, queue_size: int = 16, max_in_flight: int = 8,
+                     max_per_host: int = 8, max_requests: int = 20000, max_retries: int = 3,
+                     archive_mode: str = 'off', replay_as_of: str = None,
+                     skip_unchanged: bool = True, dive_layout: str = ITEMS_LAYOUT, run_id: str = None,
+                     shard_index: int = None, should_stop: Callable[[], bool] = None) -> Dict[str, Any]:
+    """
+    Scrape and store one shard of divers handed out by the import coordinator.
+
+    Args:
+        divers: Divers as returned by load_teams_divers
+        run_id: ID of the coordinated run, names the shard's run report
+        shard_index: Position of the shard in the run
+        should_stop: Deadline check of the worker invocation, once it returns True no further divers are
+            started and the divers not started are returned as unstarted_divers
+        (the other arguments are the import options of the same name, see handler)
+
+    Returns:
+        Summary counts, storage counts and fetch stats of the shard, the divers left unstarted, the IDs of
+        the competitions it wrote and the location of its run report
+    """
+    archive, replay, dive_sheet_cache = create_page_sources(archive_mode)
+    summary = {'total_divers': 0, 'successful_divers': 0, 'error_divers': 0, 'unchanged_divers': 0}
+    team_summaries = {}
+    # Divers whose rows have all been written, whatever is missing at the deadline is left for later
+    stored_diver_ids = set()
+    written_competitions = set()
+    # Local worker processes run several shards, their timings are reported per shard
+    metrics.reset(profiling=metrics.profiling)
+    report = start_run_report(run_id or uuid.uuid4().hex, f"shard-{shard_index}" if shard_index is not None else None,
+                              mode='worker', shard_index=shard_index, divers=len(divers))
+
+    with FetchEngine(DEFAULT_HEADERS, max_in_flight=max_in_flight, max_per_host=max_per_host,
+                     max_requests=max_requests, max_retries=max_retries, archive=archive,
+                     replay=replay, replay_as_of=replay_as_of) as engine:
+        diver_stream = iter_diving_data(
+            max_diver_workers=max_workers, incremental=incremental, dive_sheet_cache=dive_sheet_cache,
+            queue_size=queue_size, engine=engine, divers=divers, should_stop=should_stop
+        )
+        storage_counts = metrics.run(
+            store_data_in_dynamodb, track_divers(diver_stream, summary, report, team_summaries=team_summaries),
+            max_write_workers=max_write_workers, skip_unchanged=skip_unchanged, dive_layout=dive_layout,
+            on_divers_stored=stored_diver_ids.update, written_competitions=written_competitions
+        )
+
+    body = {
+        **summary,
+        'teams': team_summaries,
+        'storage_counts': storage_counts,
+        'unstarted_divers': [diver for diver in divers if diver['id'] not in stored_diver_ids],
+        'competition_ids': sorted(written_competitions),
+        'dive_sheet_cache': dive_sheet_cache.stats() if dive_sheet_cache else None,
+        'fetch_stats': engine.stats(),
+        'metrics': metrics.summary()
+    }
+    body['report'] = finish_run_report(report, body)
+    return body
+
+
+def invoke_import_worker(client, function_name: str, event: Dict[str, Any]) -> None:
+    """Start a worker invocation of the import function for one shard, without waiting for it"""
+    client.invoke(
+        FunctionName=function_name,
+        InvocationType='Event',
+        Payload=json.dumps({**event, 'mode': 'worker'})
+    )
+
+
+def add_counts(total: Dict[str, Any], counts: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the numeric (and nested numeric) values of counts to total"""
+    for name, value in counts.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            total[name] = total.get(name, 0) + value
+        elif isinstance(value, dict):
+            add_counts(total.setdefault(name, {}), value)
+    return total
+
+
+def add_shard_counts(total: Dict[str, Any], shard_counts: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the counts of a shard (or of shards added up before) to total"""
+    add_counts(total, {name: value for name, value in shard_counts.items()
+                       if name not in ('fetch_stats', 'dive_sheet_cache', 'metrics')})
+    add_counts(total.setdefault('fetch_stats', {}), {
+        name: (shard_counts.get('fetch_stats') or {}).get(name, 0)
+        for name in ('requests', 'retries', 'errors', 'bytes', 'replayed')
+    })
+    add_counts(total.setdefault('dive_sheet_cache', {}), shard_counts.get('dive_sheet_cache') or {})
+
+    # Shards do not share processed_competitions, a meet of divers in several shards is written by each of them
+    competition_ids = set(total.get('competition_ids', []))
+    shard_competition_ids = set(shard_counts.get('competition_ids', []))
+    storage_counts = total.setdefault('storage_counts', {})
+    storage_counts['duplicate_competition_writes'] = (storage_counts.get('duplicate_competition_writes', 0)
+                                                      + len(competition_ids & shard_competition_ids))
+    total['competition_ids'] = sorted(competition_ids | shard_competition_ids)
+    return total
+
+
+def coordinated_import_body(run_id: str, shards: int, totals: Dict[str, Any], failed_shards: List[Dict[str, Any]],
+                            reports: List[str], execution_time: float) -> Dict[str, Any]:
+    """Response body of a coordinated import from the counts added up over its shards"""
+    # Per-shard write throughput does not add up, drop it from the combined counts
+    totals.get('storage_counts', {}).pop('write_stats', None)
+    # Only needed to count the competitions written by several shards
+    totals.pop('competition_ids', None)
+    logger.info(f"Coordinated import finished in {execution_time:.2f} seconds, {len(failed_shards)} shards failed")
+    return {
+        **totals,
+        'run_id': run_id,
+        'shards': shards,
+        'failed_shards': failed_shards,
+        'reports': reports,
+        'execution_seconds': round(execution_time, 3)
+    }
+
+
+def coordinate_import(context, worker_options: Dict[str, Any], shard_size: int = 10,
+                      max_shards_in_flight: int = 4, worker_backend: str = 'lambda',
+                      team_numbers: List[str] = None) -> Dict[str, Any]:
+    """
+    Split the team into shards of divers and import them in parallel workers.
+
+    The coordinator only loads the team page, so the import time grows with roster size / workers instead
+    of roster size. The 'local' backend runs the shards on a pool of max_shards_in_flight processes and
+    waits for them. The 'lambda' backend stores the shards in the ImportState table, starts
+    max_shards_in_flight asynchronous worker invocations and returns: each worker stores its shard's counts
+    and starts the next shard, and the worker that finishes the last shard adds up the counts and
+    publishes the changes (see run_coordinated_shard), so no invocation waits on another.
+
+    Competitions are only known once the divers' profile pages are scraped, so they cannot be handed out
+    to shards: a meet of divers in several shards is written by each of them, in parallel (and by every
+    invocation of a shard continued after its deadline). Each shard builds the item from its own divers'
+    results and the last write wins. The merged storage_counts count these writes as duplicate_competition_writes.
+
+    Args:
+        context: Lambda context, the 'lambda' backend invokes the same function in worker mode
+        worker_options: Import options passed to every worker (see run_import_shard)
+        shard_size: Number of divers per work item
+        max_shards_in_flight: Number of workers running at the same time
+        worker_backend: 'lambda' for worker invocations, 'local' for local processes (tests, local runs)
+        team_numbers: Teams to import, defaults to TEAM_NUMBERS / TEAM_NUMBER
+
+    Returns:
+        'local': Summary and storage counts added up over all shards, the shards that failed and the
+        shards' run reports. 'lambda': The run ID and the number of shards and workers started.
+    """
+    import os
+    start_time = time.time()
+    if worker_backend not in ('lambda', 'local'):
+        raise ValueError(f"Invalid worker_backend: {worker_backend}. Use 'lambda' or 'local'.")
+    run_store = create_import_run_store() if worker_backend == 'lambda' else None
+    if worker_backend == 'lambda' and run_store is None:
+        raise ValueError("worker_backend 'lambda' needs IMPORT_STATE_TABLE_NAME to be set")
+
+    # Shard reports of one run share its ID
+    run_id = uuid.uuid4().hex
+    worker_options = {**worker_options, 'run_id': run_id}
+
+    base_url = os.environ.get('DIVEMEETS_BASE_URL', DEFAULT_BASE_URL)
+    with FetchEngine(DEFAULT_HEADERS, max_retries=worker_options.get('max_retries', 3)) as engine:
+        divers = load_teams_divers(engine, base_url, get_team_numbers(team_numbers))
+
+    shard_size = max(1, shard_size)
+    shards = [divers[start:start + shard_size] for start in range(0, len(divers), shard_size)]
+    logger.info(f"Importing {len(divers)} divers in {len(shards)} shards on {max_shards_in_flight} "
+                f"{worker_backend} workers")
+
+    if worker_backend == 'lambda':
+        import boto3
+
+        function_name = os.environ.get('IMPORT_WORKER_FUNCTION_NAME') or context.invoked_function_arn
+        started = min(max(1, max_shards_in_flight), len(shards))
+        run_store.create(run_id, shards, dispatched=started)
+        client = boto3.client('lambda')
+        failed_starts = sum(start_shard_worker(run_store, client, function_name, worker_options, index)
+                            for index in range(started))
+        # Only when no worker could be started at all is the run complete already
+        if failed_starts and run_store.finish_shard(run_id, failed_starts):
+            return complete_coordinated_import(run_store, run_id)
+        logger.info(f"Started {started} workers for run {run_id}, the last one to finish publishes the changes")
+        return {'run_id': run_id, 'divers': len(divers), 'shards': len(shards), 'workers_started': started,
+                'message': 'Competition data import started in workers'}
+
+    totals: Dict[str, Any] = {}
+    failed_shards = []
+    reports = {}
+    # Lambda has no /dev/shm, so process pools are only available outside of it
+    with ProcessPoolExecutor(max_workers=max_shards_in_flight) as executor:
+        future_to_shard = {executor.submit(run_import_shard, shard, shard_index=index, **worker_options): index
+                           for index, shard in enumerate(shards)}
+        for future in as_completed(future_to_shard):
+            index = future_to_shard[future]
+            try:
+                shard_counts = future.result()
+                add_shard_counts(totals, shard_counts)
+                if shard_counts.get('report'):
+                    reports[index] = shard_counts['report']
+            except Exception as e:
+                logger.error(f"Shard {index} failed: {e}")
+                failed_shards.append({
+                    'shard': index,
+                    'diver_ids': [diver['id'] for diver in shards[index]],
+                    'error': str(e)
+                })
+
+    return coordinated_import_body(run_id, len(shards), totals, failed_shards,
+                                   [reports[index] for index in sorted(reports)], time.time() - start_time)
+
+
+def run_coordinated_shard(context, event: Dict[str, Any], shard_options: Dict[str, Any],
+                          should_stop: Callable[[], bool] = None) -> Dict[str, Any]:
+    """
+    Import one shard of a coordinated run in a worker invocation started by coordinate_import.
+
+    The shard's counts are added to the ImportState table. When the deadline leaves divers unstarted,
+    the worker stores them as the shard's divers and invokes itself to carry on. Once the shard is done
+    the worker starts the next shard that has not been handed out yet, and the worker of the run's last
+    shard completes the run.
+
+    Args:
+        context: Lambda context of the worker invocation
+        event: The worker event, with the run_id and shard_index
+        shard_options: Import options of the run (see run_import_shard)
+        should_stop: Deadline check of the invocation
+
+    Returns:
+        The shard's counts of this invocation, or the run's response body when it completed the run
+    """
+    import os
+    import boto3
+
+    run_store = create_import_run_store()
+    if run_store is None:
+        raise ValueError("Coordinated workers need IMPORT_STATE_TABLE_NAME to be set")
+    run_id, index = event['run_id'], event['shard_index']
+    shard = run_store.load_shard(run_id, index)
+    # A retried invocation of a shard that has already been finished must not count it twice
+    if shard['status'] != 'pending':
+        logger.info(f"Shard {index} of run {run_id} is already {shard['status']}")
+        return {'run_id': run_id, 'shard_index': index, 'status': shard['status']}
+
+    function_name = os.environ.get('IMPORT_WORKER_FUNCTION_NAME') or context.invoked_function_arn
+    client = boto3.client('lambda')
+
+    body, error = {}, None
+    try:
+        body = run_import_shard(shard['divers'], **shard_options, run_id=run_id, shard_index=index,
+                                should_stop=should_stop)
+    except Exception as e:
+        logger.error(f"Shard {index} of run {run_id} failed: {e}")
+        error = str(e)
+
+    counts = add_shard_counts(shard['counts'], {name: value for name, value in body.items()
+                                                if name not in ('unstarted_divers', 'report')})
+    reports = shard['reports'] + ([body['report']] if body.get('report') else [])
+    unstarted = body.get('unstarted_divers') or []
+    # An invocation that imported nobody would hand the same divers on forever
+    if unstarted and len(unstarted) == len(shard['divers']) and not error:
+        error = 'No diver was imported before the deadline'
+    if unstarted and not error:
+        logger.info(f"Shard {index} of run {run_id} stopped before the deadline with {len(unstarted)} divers left")
+        run_store.save_shard(run_id, index, 'pending', unstarted, counts, reports)
+        try:
+            invoke_import_worker(client, function_name, event)
+            return body
         except Exception as e:
-            logger.error(f"Error processing diver {diver_data.get('id', 'Unknown')}: {e}")
-            counts['errors'] += 1
+            logger.error(f"Could not continue shard {index} of run {run_id}: {e}")
+            error = f"Stopped with {len(unstarted)} divers left: {e}"
 
-    logger.info(f"Data storage completed. Counts: {counts}")
-    return counts
+    # A failed shard keeps its divers, so failed_shards lists the ones that were not imported
+    run_store.save_shard(run_id, index, 'failed' if error else 'done', unstarted if body else shard['divers'],
+                         counts, reports, error)
+
+    # Hand out the next shard before counting this one, so the run cannot complete while shards are left
+    failed_starts = start_shard_worker(run_store, client, function_name, event, run_store.claim_next_shard(run_id))
+    if run_store.finish_shard(run_id, 1 + failed_starts):
+        return complete_coordinated_import(run_store, run_id)
+    return body
+
+
+def start_shard_worker(run_store: ImportRunStore, client, function_name: str, event: Dict[str, Any],
+                       index: int = None) -> int:
+    """
+    Start the worker of a shard handed out to it (nothing when index is None). A shard whose worker cannot
+    be started is recorded as failed, as nobody else would import it, and the next shard is tried instead.
+
+    Returns:
+        The number of shards recorded as failed, which the caller counts as finished
+    """
+    run_id = event['run_id']
+    failed = 0
+    while index is not None:
+        try:
+            invoke_import_worker(client, function_name, {**event, 'shard_index': index})
+            break
+        except Exception as e:
+            logger.error(f"Could not start shard {index} of run {run_id}: {e}")
+            shard = run_store.load_shard(run_id, index)
+            run_store.save_shard(run_id, index, 'failed', shard['divers'], shard['counts'], shard['reports'],
+                                 f"Could not start the worker: {e}")
+            failed += 1
+            index = run_store.claim_next_shard(run_id)
+    return failed
+
+
+def complete_coordinated_import(run_store: ImportRunStore, run_id: str) -> Dict[str, Any]:
+    """Add up the counts of every shard of a finished run, publish its changes and store its summary"""
+    run = run_store.load_run(run_id)
+    totals: Dict[str, Any] = {}
+    failed_shards = []
+    reports = []
+    for index in range(run['shards']):
+        shard = run_store.load_shard(run_id, index)
+        add_shard_counts(totals, shard['counts'])
+        reports.extend(shard['reports'])
+        if shard['status'] == 'failed':
+            failed_shards.append({
+                'shard': index,
+                'diver_ids': [diver['id'] for diver in shard['divers']],
+                'error': shard['error']
+            })
+
+    execution_time = (datetime.now(timezone.utc) - datetime.fromisoformat(run['created_at'])).total_seconds()
+    body = coordinated_import_body(run_id, run['shards'], totals, failed_shards, reports, execution_time)
+    body['message'] = 'Competition data imported by workers'
+    body.update(publish_changes(body.get('storage_counts', {})))
+    try:
+        run_store.save_summary(run_id, body)
+    except Exception as e:
+        logger.warning(f"Could not store the summary of run {run_id}: {e}")
+    logger.info(f"Coordinated import {run_id} complete: {body.get('storage_counts')}")
+    return body
+
+
+def report_metrics(body: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """Emit the invocation's stage timings and add their percentiles (and the profile, if any) to body"""
+    try:
+        metrics.emit(create_metrics_sink(), dimensions={'Mode': mode})
+    except Exception as e:
+        logger.warning(f"Could not emit import metrics: {e}")
+
+    body['metrics'] = metrics.summary()
+    profile = metrics.profile_report()
+    if profile:
+        body['profile'] = profile
+    return body
+
+
+def publish_changes(storage_counts: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    After rows were written, rebuild the roster snapshot served by get_all_divers and then bump the data
+    version, so the API's cached responses are dropped.
+
+    Returns the new data_version and the number of divers in the snapshot (None when nothing was published)
+    """
+    import os
+
+    written = sum(storage_counts.get(name, 0) for name in ('divers', 'competitions', 'results', 'dives', 'profiles'))
+    if not written:
+        return {'data_version': None, 'roster_divers': None}
+
+    roster_divers = None
+    state_table_name = os.environ.get('IMPORT_STATE_TABLE_NAME')
+    if state_table_name:
+        try:
+            with metrics.timer('roster_snapshot'):
+                roster_divers = rebuild_roster_snapshot(os.environ['DIVERS_TABLE_NAME'], state_table_name)
+        except Exception as e:
+            logger.warning(f"Could not rebuild the roster snapshot: {e}")
+    return {'data_version': bump_data_version(), 'roster_divers': roster_divers}
+
+
+def make_deadline_check(context, safety_margin_seconds: float) -> Callable[[], bool]:
+    """Return a should_stop check that turns True safety_margin_seconds before the Lambda times out"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+
+    def should_stop() -> bool:
+        return context.get_remaining_time_in_millis() < safety_margin_seconds * 1000
+
+    return should_stop
+
+
+def continue_import(context, event: Dict[str, Any], continuation_token: str) -> bool:
+    """Invoke this function again asynchronously to resume the import. Returns True on success."""
+    import boto3
+
+    try:
+        boto3.client('lambda').invoke(
+            FunctionName=context.invoked_function_arn,
+            InvocationType='Event',
+            Payload=json.dumps({**(event or {}), 'continuation_token': continuation_token})
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Could not start the next import invocation: {e}")
+        return False
 
 
 def handler(event, context):
@@ -778,32 +1997,189 @@ def handler(event, context):
     Returns:
         Dictionary containing status and results
     """
+    import os
+
     try:
         logger.info("Lambda function started - Import Competition Data")
 
         # Extract configuration from the event if provided
         max_workers = event.get('max_workers', 8) if event else 8
+        # Opt-in: fingerprints only cover what the parsers read when FINGERPRINT_VERSION was last bumped
+        incremental = event.get('incremental', False) if event else False
+        max_write_workers = event.get('max_write_workers', 4) if event else 4
+        queue_size = event.get('queue_size', 16) if event else 16
+        max_in_flight = event.get('max_in_flight', 16) if event else 16
+        max_per_host = event.get('max_per_host', 12) if event else 12
+        max_requests = event.get('max_requests', 20000) if event else 20000
+        max_retries = event.get('max_retries', 3) if event else 3
+        # Recording uploads every fetched page, so it is opt-in per event or through ARCHIVE_MODE
+        archive_mode = (event or {}).get('archive_mode') or os.environ.get('ARCHIVE_MODE', 'off')
+        replay_as_of = event.get('replay_as_of') if event else None
+        skip_unchanged = event.get('skip_unchanged', True) if event else True
+        dive_layout = (event or {}).get('dive_layout') or os.environ.get('DIVE_LAYOUT', ITEMS_LAYOUT)
+        continuation_token = event.get('continuation_token') if event else None
+        safety_margin_seconds = event.get('safety_margin_seconds', 120) if event else 120
+        auto_continue = event.get('auto_continue', True) if event else True
+        max_invocations = event.get('max_invocations', 10) if event else 10
+        mode = event.get('mode', 'single') if event else 'single'
+        team_numbers = event.get('team_numbers') if event else None
+        profile = event.get('profile', False) if event else False
+
+        # Stage timings (and the profile) cover this invocation only
+        metrics.reset(profiling=profile)
+
+        if mode == 'worker':
+            shard_options = {
+                'max_workers': max_workers, 'incremental': incremental, 'max_write_workers': max_write_workers,
+                'queue_size': queue_size, 'max_in_flight': max_in_flight, 'max_per_host': max_per_host,
+                'max_requests': max_requests, 'max_retries': max_retries, 'archive_mode': archive_mode,
+                'replay_as_of': replay_as_of, 'skip_unchanged': skip_unchanged, 'dive_layout': dive_layout
+            }
+            should_stop = make_deadline_check(context, safety_margin_seconds)
+            if 'divers' not in event:
+                # A shard of a coordinated run, its divers and counts are kept in the ImportState table
+                body = run_coordinated_shard(context, event, shard_options, should_stop)
+                return {'statusCode': 200, 'body': report_metrics(body, mode)}
+
+            body = run_import_shard(event['divers'], **shard_options, run_id=event.get('run_id'),
+                                    shard_index=event.get('shard_index'), should_stop=should_stop)
+            logger.info(f"Worker finished shard of {len(event['divers'])} divers: {body['storage_counts']}")
+            return {'statusCode': 200, 'body': report_metrics(body, mode)}
+
+        if mode == 'coordinator':
+            worker_max_in_flight = event.get('worker_max_in_flight', 8)
+            worker_backend = event.get('worker_backend', 'lambda')
+            body = coordinate_import(
+                context,
+                {
+                    'max_workers': max_workers, 'incremental': incremental,
+                    'max_write_workers': max_write_workers, 'queue_size': queue_size,
+                    'max_in_flight': worker_max_in_flight, 'max_per_host': worker_max_in_flight,
+                    'max_requests': max_requests, 'max_retries': max_retries,
+                    'archive_mode': archive_mode, 'replay_as_of': replay_as_of,
+                    'skip_unchanged': skip_unchanged, 'dive_layout': dive_layout
+                },
+                shard_size=event.get('shard_size', 10),
+                max_shards_in_flight=event.get('max_shards_in_flight', 4),
+                worker_backend=worker_backend,
+                team_numbers=team_numbers
+            )
+            # Lambda workers run on after the coordinator returns, the last one to finish publishes the changes
+            if worker_backend == 'local':
+                body['message'] = 'Competition data imported by workers'
+                body.update(publish_changes(body.get('storage_counts', {})))
+            return {'statusCode': 200, 'body': report_metrics(body, mode)}
+
+        if mode != 'single':
+            raise ValueError(f"Invalid mode: {mode}. Use 'single', 'coordinator' or 'worker'.")
+
+        archive, replay, dive_sheet_cache = create_page_sources(archive_mode)
+
+        # Progress survives across invocations when a checkpoint store is configured
+        checkpoint_store = create_checkpoint_store()
+        if continuation_token:
+            if checkpoint_store is None:
+                raise ValueError("continuation_token needs IMPORT_STATE_TABLE_NAME or IMPORT_STATE_PATH to be set")
+            checkpoint = checkpoint_store.load(continuation_token)
+            logger.info(f"Resuming import {checkpoint.token} (invocation {checkpoint.invocations + 1})")
+        else:
+            checkpoint = None
+            # Lambda retries a timed-out invocation with the same request ID, the retry resumes its progress
+            request_id = getattr(context, 'aws_request_id', None)
+            if checkpoint_store is not None and request_id:
+                try:
+                    checkpoint = checkpoint_store.load(request_id)
+                    logger.info(f"Resuming import {request_id} in a retry of its first invocation")
+                except CheckpointNotFound:
+                    pass
+            if checkpoint is None:
+                checkpoint = ImportCheckpoint(token=request_id, team_numbers=get_team_numbers(team_numbers))
+        checkpoint.invocations += 1
+
+        summary = {'total_divers': 0, 'successful_divers': 0, 'error_divers': 0, 'unchanged_divers': 0}
+        team_summaries = {}
+        # Per-diver details go to the run report, the response only carries the summary
+        report = start_run_report(checkpoint.token, f"invocation-{checkpoint.invocations}", mode=mode,
+                                  invocation=checkpoint.invocations, team_numbers=checkpoint.team_numbers)
+
+        def save_progress(diver_ids: List[int]) -> None:
+            # Every row of these divers is written. Divers that failed are not retried by a resumed run
+            # either, same as in a single-invocation run.
+            for diver_id in diver_ids:
+                checkpoint.mark_done(diver_id)
+            # Saved as the import goes, so an invocation killed by the time limit loses at most one batch
+            if checkpoint_store:
+                try:
+                    checkpoint_store.save(checkpoint, {**summary, 'teams': team_summaries})
+                except Exception as e:
+                    logger.warning(f"Could not save the import checkpoint: {e}")
+
+        # One connection pool and one request budget for every fetch of the run
+        with FetchEngine(DEFAULT_HEADERS, max_in_flight=max_in_flight, max_per_host=max_per_host,
+                         max_requests=max_requests, max_retries=max_retries, archive=archive,
+                         replay=replay, replay_as_of=replay_as_of) as engine:
+            # Stream divers from the scraper straight into DynamoDB, scraping and writing overlap
+            diver_stream = iter_diving_data(
+                max_diver_workers=max_workers, incremental=incremental,
+                dive_sheet_cache=dive_sheet_cache, queue_size=queue_size, engine=engine,
+                checkpoint=checkpoint, should_stop=make_deadline_check(context, safety_margin_seconds),
+                team_numbers=checkpoint.team_numbers
+            )
+            # Storing consumes the stream on this thread, the scrape itself runs on the worker pools
+            storage_counts = metrics.run(
+                store_data_in_dynamodb, track_divers(diver_stream, summary, report, team_summaries),
+                max_write_workers=max_write_workers, skip_unchanged=skip_unchanged, dive_layout=dive_layout,
+                on_divers_stored=save_progress
+            )
+
+        # Every diver marked done has been written, only now may the checkpoint say so
+        checkpoint.add_summary({**summary, 'teams': team_summaries})
+        if checkpoint_store:
+            checkpoint_store.save(checkpoint)
+
+        published = publish_changes(storage_counts)
 
-        # Extract the diving data
-        diving_data = extract_diving_data(max_diver_workers=max_workers)
+        resumable = not checkpoint.complete and checkpoint_store is not None
+        continued = False
+        if resumable and auto_continue and context is not None:
+            if checkpoint.invocations < max_invocations:
+                continued = continue_import(context, event, checkpoint.token)
+            else:
+                logger.error(f"Import {checkpoint.token} is still incomplete after {max_invocations} invocations")
+
+        if checkpoint.complete:
+            message = 'Competition data imported and stored successfully'
+        else:
+            message = 'Competition data partially imported before the time limit'
 
-        # Store data in DynamoDB
-        storage_counts = store_data_in_dynamodb(diving_data)
         # Prepare response
         response = {
             'statusCode': 200,
             'body': {
-                'message': 'Competition data imported and stored successfully',
-                'total_divers': len(diving_data),
-                'successful_divers': len([d for d in diving_data if 'error' not in d]),
-                'error_divers': len([d for d in diving_data if 'error' in d]),
+                'message': message,
+                **summary,
+                'teams': team_summaries,
+                'complete': checkpoint.complete,
+                'remaining_divers': checkpoint.remaining,
+                'continuation_token': checkpoint.token if resumable else None,
+                'continued': continued,
+                'invocations': checkpoint.invocations,
+                'run_summary': checkpoint.summary,
                 'storage_counts': storage_counts,
-                'data': diving_data
+                **published,
+                'dive_sheet_cache': dive_sheet_cache.stats() if dive_sheet_cache else None,
+                'fetch_stats': engine.stats()
             }
         }
 
-        logger.info(f"Lambda function completed successfully - Processed {len(diving_data)} divers")
+        report_metrics(response['body'], mode)
+        response['body']['report'] = finish_run_report(report, response['body'])
+
+        logger.info(f"Lambda function completed successfully - Processed {summary['total_divers']} divers")
         logger.info(f"Storage summary: {storage_counts}")
+        logger.info(f"Fetch stats: {engine.stats()}")
+        if dive_sheet_cache:
+            logger.info(f"Dive sheet cache: {dive_sheet_cache.stats()}")
         return response
 
     except Exception as e:
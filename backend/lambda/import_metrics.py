@@ -0,0 +1,210 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import time
+from contextlib import contextmanager
+from threading import Lock, local
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DEFAULT_NAMESPACE = 'DivingAnalytics/Import'
+
+# Samples kept per stage for percentiles, a reservoir sample keeps them representative on long runs
+MAX_SAMPLES = 5000
+
+# CloudWatch accepts at most 100 values per metric in one EMF record
+EMF_MAX_VALUES = 100
+
+
+class MemorySink:
+    """Keeps emitted metric records in memory, used in tests and local runs"""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+
+class EmfLogSink:
+    """
+    Writes metric records as CloudWatch Embedded Metric Format log lines.
+
+    Lambda ships stdout to CloudWatch Logs, which extracts the metrics. The records are printed rather
+    than logged because the logging format would prefix them and EMF lines have to be plain JSON.
+    """
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        print(json.dumps(record), flush=True)
+
+
+def create_metrics_sink():
+    """METRICS_SINK selects 'emf' (default), 'memory' or 'off'"""
+    sink = os.environ.get('METRICS_SINK', 'emf')
+    if sink == 'off':
+        return None
+    if sink == 'memory':
+        return MemorySink()
+    return EmfLogSink()
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = seconds
+
+
+class ImportMetrics:
+    """
+    Per-stage timings of a competition import.
+
+    Stages are named after the import step (team_fetch, profile_fetch, profile_parse, dive_sheet_fetch,
+    dive_sheet_parse, dynamodb_write, dynamodb_read) and may carry a table name. Timings are thread-safe
+    to record from the scraper and writer pools. summary() returns count, total and percentiles per stage,
+    emit() sends them as EMF records.
+
+    With profiling enabled, run() executes a function under a per-thread cProfile profiler, so work done
+    on the worker pools shows up in profile_report() and not just the calling thread.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.stages: Dict[Tuple[str, Optional[str]], StageStats] = {}
+        self.profiling = False
+        self.profilers: List[cProfile.Profile] = []
+        self.thread_state = local()
+
+    def reset(self, profiling: bool = False) -> None:
+        with self.lock:
+            self.stages = {}
+            self.profiling = profiling
+            self.profilers = []
+        self.thread_state = local()
+
+    def record(self, stage: str, seconds: float, table: str = None) -> None:
+        with self.lock:
+            key = (stage, table)
+            if key not in self.stages:
+                self.stages[key] = StageStats()
+            self.stages[key].add(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, table: str = None, timings: Dict[str, float] = None):
+        """Time a block as stage, optionally also adding its milliseconds to timings[f'{stage}_ms']"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(stage, elapsed, table)
+            if timings is not None:
+                key = f"{stage}_ms"
+                timings[key] = round(timings.get(key, 0) + 1000 * elapsed, 1)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Count, total and percentile timings in milliseconds per stage"""
+        with self.lock:
+            stages = {key: (stats.count, stats.total, stats.max, sorted(stats.samples))
+                      for key, stats in self.stages.items()}
+
+        summary = {}
+        for (stage, table), (count, total, maximum, samples) in sorted(stages.items(), key=lambda kv: str(kv[0])):
+            def pick(fraction: float) -> float:
+                return round(1000 * samples[min(len(samples) - 1, int(fraction * len(samples)))], 1)
+
+            summary[f"{stage}:{table}" if table else stage] = {
+                'count': count,
+                'total_ms': round(1000 * total, 1),
+                'p50_ms': pick(0.50),
+                'p90_ms': pick(0.90),
+                'p99_ms': pick(0.99),
+                'max_ms': round(1000 * maximum, 1),
+            }
+        return summary
+
+    def emit(self, sink, namespace: str = None, dimensions: Dict[str, str] = None) -> int:
+        """Send every stage's timing samples to the sink as EMF records. Returns the number of records."""
+        if sink is None:
+            return 0
+
+        namespace = namespace or os.environ.get('METRICS_NAMESPACE', DEFAULT_NAMESPACE)
+        with self.lock:
+            stages = {key: list(stats.samples) for key, stats in self.stages.items()}
+
+        emitted = 0
+        for (stage, table), samples in stages.items():
+            record_dimensions = {**(dimensions or {}), 'Stage': stage}
+            if table:
+                record_dimensions['Table'] = table
+
+            for start in range(0, len(samples), EMF_MAX_VALUES):
+                sink.emit({
+                    '_aws': {
+                        'Timestamp': int(time.time() * 1000),
+                        'CloudWatchMetrics': [{
+                            'Namespace': namespace,
+                            'Dimensions': [list(record_dimensions)],
+                            'Metrics': [{'Name': 'Duration', 'Unit': 'Milliseconds'}],
+                        }],
+                    },
+                    **record_dimensions,
+                    'Duration': [round(1000 * value, 3) for value in samples[start:start + EMF_MAX_VALUES]],
+                })
+                emitted += 1
+        return emitted
+
+    def run(self, function: Callable, *args, **kwargs):
+        """Call function, under this thread's profiler when profiling is enabled"""
+        if not self.profiling:
+            return function(*args, **kwargs)
+
+        state = self.thread_state
+        if getattr(state, 'depth', 0):
+            # Already profiled further up this thread's stack
+            return function(*args, **kwargs)
+
+        if not hasattr(state, 'profiler'):
+            state.profiler = cProfile.Profile()
+            with self.lock:
+                self.profilers.append(state.profiler)
+
+        state.depth = 1
+        state.profiler.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            state.profiler.disable()
+            state.depth = 0
+
+    def profile_report(self, limit: int = 30, sort: str = 'cumulative') -> Optional[str]:
+        """Top functions of all profiled threads, or None when profiling was off"""
+        with self.lock:
+            profilers = list(self.profilers)
+        if not profilers:
+            return None
+
+        output = io.StringIO()
+        stats = pstats.Stats(profilers[0], stream=output)
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+# Shards and results of coordinated runs are removed by the table's TTL after this many seconds
+RUN_TTL_SECONDS = 7 * 24 * 3600
+
+
+class ImportRunStore:
+    """
+    Shards of a coordinated import and the results of their workers, kept in the ImportState table.
+
+    The run item counts the shards handed out to workers and the shards finished, each shard item holds
+    its divers (the ones not imported yet) and the counts of the worker invocations that imported it.
+    Workers are invoked asynchronously, so whichever worker finishes the last shard completes the run.
+    """
+
+    def __init__(self, table_name: str):
+        import boto3
+
+        self.table_name = table_name
+        self.client = boto3.client('dynamodb')
+
+    @staticmethod
+    def _run_key(run_id: str) -> Dict[str, Any]:
+        return {'state_key': {'S': f"import-run#{run_id}"}}
+
+    @staticmethod
+    def _shard_key(run_id: str, index: int) -> Dict[str, Any]:
+        return {'state_key': {'S': f"import-run#{run_id}#shard#{index}"}}
+
+    @staticmethod
+    def _expires_at() -> Dict[str, str]:
+        return {'N': str(int(time.time()) + RUN_TTL_SECONDS)}
+
+    def create(self, run_id: str, shards: List[List[Dict[str, Any]]], dispatched: int) -> None:
+        """Store the shards of a new run, the first dispatched shards are handed out by the coordinator"""
+        for index, divers in enumerate(shards):
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    **self._shard_key(run_id, index),
+                    'status': {'S': 'pending'},
+                    'divers': {'S': json.dumps(divers)},
+                    'expires_at': self._expires_at()
+                }
+            )
+        # Written last, a run item only exists once all its shards do
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                **self._run_key(run_id),
+                'shards': {'N': str(len(shards))},
+                'dispatched': {'N': str(dispatched)},
+                'finished': {'N': '0'},
+                'created_at': {'S': datetime.now(timezone.utc).isoformat()},
+                'expires_at': self._expires_at()
+            }
+        )
+
+    def load_run(self, run_id: str) -> Dict[str, Any]:
+        item = self.client.get_item(TableName=self.table_name, Key=self._run_key(run_id),
+                                    ConsistentRead=True)['Item']
+        return {
+            'shards': int(item['shards']['N']),
+            'dispatched': int(item['dispatched']['N']),
+            'finished': int(item['finished']['N']),
+            'created_at': item['created_at']['S'],
+            'summary': json.loads(item['summary']['S']) if 'summary' in item else None
+        }
+
+    def load_shard(self, run_id: str, index: int) -> Dict[str, Any]:
+        """A shard's status, the divers left to import, the counts so far, its run reports and error"""
+        item = self.client.get_item(TableName=self.table_name, Key=self._shard_key(run_id, index),
+                                    ConsistentRead=True)['Item']
+        return {
+            'status': item['status']['S'],
+            'divers': json.loads(item['divers']['S']),
+            'counts': json.loads(item['counts']['S']) if 'counts' in item else {},
+            'reports': json.loads(item['reports']['S']) if 'reports' in item else [],
+            'error': item['error']['S'] if 'error' in item else None
+        }
+
+    def save_shard(self, run_id: str, index: int, status: str, divers: List[Dict[str, Any]],
+                   counts: Dict[str, Any], reports: List[str], error: str = None) -> None:
+        """Store a shard's progress, status is 'pending' while divers are left, else 'done' or 'failed'"""
+        item = {
+            **self._shard_key(run_id, index),
+            'status': {'S': status},
+            'divers': {'S': json.dumps(divers)},
+            'counts': {'S': json.dumps(counts)},
+            'reports': {'S': json.dumps(reports)},
+            'expires_at': self._expires_at()
+        }
+        if error:
+            item['error'] = {'S': error}
+        self.client.put_item(TableName=self.table_name, Item=item)
+
+    def claim_next_shard(self, run_id: str) -> Optional[int]:
+        """The index of the next shard to hand out to a worker, None once all shards are handed out"""
+        try:
+            response = self.client.update_item(
+                TableName=self.table_name,
+                Key=self._run_key(run_id),
+                UpdateExpression='SET #dispatched = #dispatched + :one',
+                ConditionExpression='#dispatched < #shards',
+                ExpressionAttributeNames={'#dispatched': 'dispatched', '#shards': 'shards'},
+                ExpressionAttributeValues={':one': {'N': '1'}},
+                ReturnValues='UPDATED_OLD'
+            )
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return None
+        return int(response['Attributes']['dispatched']['N'])
+
+    def finish_shard(self, run_id: str, count: int = 1) -> bool:
+        """Count finished shards. Returns True when they were the last shards of the run."""
+        response = self.client.update_item(
+            TableName=self.table_name,
+            Key=self._run_key(run_id),
+            UpdateExpression='ADD #finished :count',
+            ExpressionAttributeNames={'#finished': 'finished'},
+            ExpressionAttributeValues={':count': {'N': str(count)}},
+            ReturnValues='ALL_NEW'
+        )
+        attributes = response['Attributes']
+        return int(attributes['finished']['N']) == int(attributes['shards']['N'])
+
+    def save_summary(self, run_id: str, summary: Dict[str, Any]) -> None:
+        self.client.update_item(
+            TableName=self.table_name,
+            Key=self._run_key(run_id),
+            UpdateExpression='SET #summary = :summary',
+            ExpressionAttributeNames={'#summary': 'summary'},
+            ExpressionAttributeValues={':summary': {'S': json.dumps(summary, default=str)}}
+        )
+
+
+def create_import_run_store() -> Optional[ImportRunStore]:
+    """The store of coordinated runs in IMPORT_STATE_TABLE_NAME, None when the table is not configured"""
+    table_name = os.environ.get('IMPORT_STATE_TABLE_NAME')
+    return ImportRunStore(table_name) if table_name else None
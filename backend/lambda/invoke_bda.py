@@ -10,6 +10,8 @@ from typing import Any
 import boto3
 
 import get_json_from_bedrock
+from parallel_scan import ParallelScan, parallel_scan
+from training_status_index import STATUS_DATE_ATTRIBUTE, make_status_date, stored_session_date
 
 logger = logging.getLogger()
 logger.setLevel("INFO")
@@ -62,11 +64,13 @@ def wait_for_data_automation_to_complete(invocation_arn, loop_time_in_seconds=2)
 
 def create_initial_record(record_id, s3_url, diver_name=None):
     try:
+        session_date = datetime.now(timezone.utc).date().isoformat()
         item = {
             'id': record_id,
             'extraction_status': STATUS_PROCESSING,
             'created_at': datetime.now(timezone.utc).isoformat(),
-            'session_date': datetime.now(timezone.utc).date().isoformat(),
+            'session_date': session_date,
+            STATUS_DATE_ATTRIBUTE: make_status_date(STATUS_PROCESSING, session_date),
             's3_url': s3_url
         }
 
@@ -89,20 +93,29 @@ def get_diver_id_by_name(diver_name) -> Any | None:
         return None
 
     try:
-        response = divers_table.scan()
-        items = response['Items']
-
-        while 'LastEvaluatedKey' in response:
-            response = divers_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
-
-        diver_name_lower = diver_name.lower().strip()
-        for item in items:
-            stored_name = item.get('name', '').lower().strip()
-            if diver_name_lower in stored_name or stored_name in diver_name_lower:
-                diver_id = item.get('diver_id')
-                logger.info(f"Found diver ID {diver_id} for name '{diver_name}' (matched with '{item.get('name')}')")
-                return diver_id
+        diver_name_lower = ' '.join(diver_name.lower().split())
+        exact_matches = {}
+        partial_matches = {}
+        # Every diver is read, the scan's segments return them in no particular order
+        for item in ParallelScan(divers_table, attributes=['diver_id', 'name']):
+            stored_name = ' '.join(item.get('name', '').lower().split())
+            if not stored_name:
+                continue
+            if stored_name == diver_name_lower:
+                exact_matches[item.get('diver_id')] = item.get('name')
+            elif diver_name_lower in stored_name or stored_name in diver_name_lower:
+                partial_matches[item.get('diver_id')] = item.get('name')
+
+        # A case-insensitive exact match wins, otherwise the partial match has to be the only one
+        matches = exact_matches or partial_matches
+        if len(matches) == 1:
+            diver_id, matched_name = next(iter(matches.items()))
+            logger.info(f"Found diver ID {diver_id} for name '{diver_name}' (matched with '{matched_name}')")
+            return diver_id
+        if matches:
+            logger.warning(f"Name '{diver_name}' matches {len(matches)} divers, leaving the diver unassigned: "
+                           f"{sorted(matches.values())}")
+            return None
 
         logger.warning(f"No diver found for name: '{diver_name}'")
         return None
@@ -118,8 +131,11 @@ def update_record_with_results(record_id, json_output, extracted_csv):
     try:
 
         update_expression = "SET extraction_status = :status, json_output = :json_output, extracted_csv = :csv, updated_at = :updated_at"
+        update_expression += f", {STATUS_DATE_ATTRIBUTE} = :status_date"
+        session_date = stored_session_date(training_data_table, record_id)
         expression_attribute_values = {
             ':status': STATUS_PENDING_REVIEW,
+            ':status_date': make_status_date(STATUS_PENDING_REVIEW, session_date),
             ':json_output': json.dumps({"dives": json.loads(json_output)["dives"]}),
             ':csv': extracted_csv,
             ':updated_at': datetime.now(timezone.utc).isoformat()
@@ -155,8 +171,10 @@ def update_record_with_results(record_id, json_output, extracted_csv):
 def update_record_status(record_id, status, error_message=None):
     try:
         update_expression = "SET extraction_status = :status, json_output = :json_output, updated_at = :updated_at"
+        update_expression += f", {STATUS_DATE_ATTRIBUTE} = :status_date"
         expression_attribute_values = {
             ':status': status,
+            ':status_date': make_status_date(status, stored_session_date(training_data_table, record_id)),
             ':json_output': json.dumps({"dives": []}),
             ':updated_at': datetime.now(timezone.utc).isoformat()
         }
@@ -181,13 +199,7 @@ def update_record_status(record_id, status, error_message=None):
 
 def get_names_of_divers():
     try:
-        response = divers_table.scan()
-        items = response['Items']
-
-        # Handle pagination if there are more items
-        while 'LastEvaluatedKey' in response:
-            response = divers_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
+        items = parallel_scan(divers_table, attributes=['name'])
 
         # Extract names from the items
         diver_names = []
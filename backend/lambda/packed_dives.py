@@ -0,0 +1,92 @@
+import json
+import zlib
+from decimal import Decimal
+from typing import Dict, Any, List
+
+# Sort key of the item holding all dives of a result, sorts after the numeric dive rounds
+PACKED_DIVE_ROUND = 'PACKED'
+
+# Attribute of a Results item naming the layout of its dives, absent for one item per dive
+DIVE_LAYOUT_ATTRIBUTE = 'dive_layout'
+PACKED_LAYOUT = 'packed'
+ITEMS_LAYOUT = 'items'
+DIVE_LAYOUTS = (ITEMS_LAYOUT, PACKED_LAYOUT)
+
+# Attribute of a Results item counting its dives, present once its dives carry diver_id for the DiverIndex
+DIVE_COUNT_ATTRIBUTE = 'dive_count'
+DIVER_INDEX_NAME = 'DiverIndex'
+
+# Bump when the column list changes, unpack_dives reads every version it knows
+PACKED_FORMAT = 1
+PACKED_COLUMNS = ['dive_round', 'code', 'description', 'height', 'difficulty', 'scores', 'net_total', 'award',
+                  'round_place']
+NUMBER_COLUMNS = {'difficulty', 'net_total', 'award', 'round_place'}
+
+
+def _encode_number(value: Any) -> Any:
+    # Numbers travel as strings so Decimal values come back exactly as they were stored
+    return None if value is None else str(value)
+
+
+def pack_dives(result_key: str, dive_items: List[Dict[str, Any]], dives_hash: str = None,
+               diver_id: int = None) -> Dict[str, Any]:
+    """
+    Build the Dives item holding all dives of a result as one zlib-compressed JSON array.
+
+    Args:
+        result_key: Partition key of the result's dives
+        dive_items: Dives table items of the result (as built by build_dive_item or read from the table)
+        dives_hash: The result's dives_hash, lets readers check the packed dives belong to the stored result
+        diver_id: The result's diver, puts the packed item into the DiverIndex
+
+    Returns:
+        Dives table item with dive_round PACKED_DIVE_ROUND
+    """
+    rows = []
+    for item in sorted(dive_items, key=lambda dive: dive.get('dive_round', '')):
+        row = []
+        for column in PACKED_COLUMNS:
+            value = item.get(column)
+            if column in NUMBER_COLUMNS:
+                value = _encode_number(value)
+            elif column == 'scores':
+                value = [_encode_number(score) for score in value or []]
+            row.append(value)
+        rows.append(row)
+
+    encoded = json.dumps(rows, separators=(',', ':')).encode('utf-8')
+    packed_item = {
+        'result_key': result_key,
+        'dive_round': PACKED_DIVE_ROUND,
+        'packed_format': PACKED_FORMAT,
+        'dive_count': len(rows),
+        'dives': zlib.compress(encoded, 9),
+    }
+    if dives_hash:
+        packed_item['dives_hash'] = dives_hash
+    if diver_id is not None:
+        packed_item['diver_id'] = diver_id
+    return packed_item
+
+
+def unpack_dives(packed_item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the dives of a packed item as Dives table items (Decimal numbers, no bookkeeping attributes)"""
+    blob = packed_item['dives']
+    # boto3 returns Binary attributes wrapped, its value is the raw bytes
+    blob = getattr(blob, 'value', blob)
+    packed_format = int(packed_item.get('packed_format', PACKED_FORMAT))
+    if packed_format != PACKED_FORMAT:
+        raise ValueError(f"Unknown packed dives format {packed_format} for {packed_item.get('result_key')}")
+
+    dive_items = []
+    for row in json.loads(zlib.decompress(blob)):
+        item = {'result_key': packed_item['result_key']}
+        for column, value in zip(PACKED_COLUMNS, row):
+            if column in NUMBER_COLUMNS:
+                value = None if value is None else Decimal(value)
+            elif column == 'scores':
+                value = [Decimal(score) for score in value if score is not None]
+            if value is not None:
+                item[column] = value
+        dive_items.append(item)
+    return dive_items
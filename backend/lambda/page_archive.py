@@ -0,0 +1,227 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# fetched_at is stored in this compact form so blob names sort chronologically
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%S.%fZ'
+
+
+class PageNotArchived(Exception):
+    """Raised in replay mode when a page was never archived"""
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def format_timestamp(moment: datetime = None) -> str:
+    return (moment or datetime.now(timezone.utc)).strftime(TIMESTAMP_FORMAT)
+
+
+def normalize_timestamp(value: str) -> str:
+    """Accept an ISO date/datetime or an archive timestamp and return an archive timestamp"""
+    if 'T' in value and value.endswith('Z') and '-' not in value:
+        return value
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_timestamp(moment.astimezone(timezone.utc))
+
+
+class ArchivedResponse:
+    """Minimal stand-in for requests.Response built from an archived page"""
+
+    def __init__(self, url: str, status_code: int, text: str, encoding: str = 'utf-8', fetched_at: str = None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.encoding = encoding
+        self.fetched_at = fetched_at
+        self.headers: Dict[str, str] = {}
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode(self.encoding or 'utf-8')
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error (archived) for url: {self.url}", response=self)
+
+
+class PageArchive:
+    """
+    Base class for raw page archives.
+
+    Every page is stored as a gzip-compressed JSON blob at pages/<sha256(url)>/<fetched_at>.json.gz, so all
+    fetches of a URL live under one prefix and the newest one sorts last.
+    """
+
+    def __init__(self):
+        self.pages_written = 0
+        self.pages_read = 0
+
+    @staticmethod
+    def _blob_prefix(url: str) -> str:
+        return f"pages/{url_hash(url)}/"
+
+    def save(self, url: str, status_code: int, text: str, encoding: str = 'utf-8') -> Optional[str]:
+        """Archive one fetched page. Returns the blob name, or None when archiving failed."""
+        fetched_at = format_timestamp()
+        name = f"{self._blob_prefix(url)}{fetched_at}.json.gz"
+        blob = gzip.compress(json.dumps({
+            'url': url,
+            'status_code': status_code,
+            'encoding': encoding,
+            'fetched_at': fetched_at,
+            'text': text,
+        }).encode('utf-8'))
+
+        try:
+            self._write(name, blob)
+        except Exception as e:
+            # Archiving is best effort and must never fail the import
+            logger.warning(f"Could not archive {url}: {e}")
+            return None
+
+        self.pages_written += 1
+        return name
+
+    def load(self, url: str, as_of: str = None) -> ArchivedResponse:
+        """
+        Return the newest archived fetch of a URL.
+
+        Args:
+            url: Page URL exactly as it was fetched
+            as_of: Optional ISO date/datetime, fetches after it are ignored
+        """
+        names = sorted(self._list(self._blob_prefix(url)))
+        if as_of:
+            cutoff = f"{self._blob_prefix(url)}{normalize_timestamp(as_of)}"
+            names = [name for name in names if name <= cutoff]
+        if not names:
+            raise PageNotArchived(f"No archived copy of {url}")
+
+        record = json.loads(gzip.decompress(self._read(names[-1])).decode('utf-8'))
+        self.pages_read += 1
+        return ArchivedResponse(record['url'], record['status_code'], record['text'],
+                                record.get('encoding') or 'utf-8', record['fetched_at'])
+
+    def iter_pages(self, as_of: str = None):
+        """Yield the newest archived response of every URL in the archive"""
+        latest: Dict[str, str] = {}
+        cutoff = normalize_timestamp(as_of) if as_of else None
+        for name in self._list('pages/'):
+            prefix, _, blob = name.rpartition('/')
+            if cutoff and blob.split('.json')[0] > cutoff:
+                continue
+            if name > latest.get(prefix, ''):
+                latest[prefix] = name
+
+        for name in sorted(latest.values()):
+            record = json.loads(gzip.decompress(self._read(name)).decode('utf-8'))
+            yield ArchivedResponse(record['url'], record['status_code'], record['text'],
+                                   record.get('encoding') or 'utf-8', record['fetched_at'])
+
+    def stats(self) -> Dict[str, int]:
+        return {'pages_written': self.pages_written, 'pages_read': self.pages_read}
+
+    def _write(self, name: str, blob: bytes) -> None:
+        raise NotImplementedError
+
+    def _read(self, name: str) -> bytes:
+        raise NotImplementedError
+
+    def _list(self, prefix: str) -> List[str]:
+        raise NotImplementedError
+
+
+class LocalPageArchive(PageArchive):
+    """Page archive in a local directory, used for local runs, debugging and benchmarks"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def _write(self, name: str, blob: bytes) -> None:
+        full_path = os.path.join(self.path, name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Write to a temporary file first so a crashed run never leaves a truncated blob behind
+        temp_path = f"{full_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(temp_path, full_path)
+
+    def _read(self, name: str) -> bytes:
+        with open(os.path.join(self.path, name), 'rb') as f:
+            return f.read()
+
+    def _list(self, prefix: str) -> List[str]:
+        directory = os.path.join(self.path, prefix)
+        if not os.path.isdir(directory):
+            return []
+
+        names = []
+        for root, _, files in os.walk(directory):
+            for file_name in files:
+                if file_name.endswith('.json.gz'):
+                    relative = os.path.relpath(os.path.join(root, file_name), self.path)
+                    names.append(relative.replace(os.sep, '/'))
+        return names
+
+
+class S3PageArchive(PageArchive):
+    """Page archive in an S3 bucket"""
+
+    def __init__(self, bucket: str, prefix: str = ''):
+        super().__init__()
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        # Low-level clients are thread-safe, the archive is shared by all scraper threads
+        self.client = boto3.client('s3')
+
+    def _write(self, name: str, blob: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + name, Body=blob,
+                               ContentType='application/json', ContentEncoding='gzip')
+
+    def _read(self, name: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + name)['Body'].read()
+
+    def _list(self, prefix: str) -> List[str]:
+        names = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + prefix):
+            for item in page.get('Contents', []):
+                names.append(item['Key'][len(self.prefix):])
+        return names
+
+
+def create_page_archive() -> Optional[PageArchive]:
+    """
+    Build the page archive configured through the environment.
+
+    ARCHIVE_BUCKET (with optional ARCHIVE_PREFIX) selects the S3 backend, ARCHIVE_PATH the local directory
+    backend. Returns None when no archive is configured.
+    """
+    bucket = os.environ.get('ARCHIVE_BUCKET')
+    if bucket:
+        return S3PageArchive(bucket, os.environ.get('ARCHIVE_PREFIX', ''))
+
+    path = os.environ.get('ARCHIVE_PATH')
+    if path:
+        return LocalPageArchive(path)
+
+    return None
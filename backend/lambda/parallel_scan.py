@@ -0,0 +1,139 @@
+import logging
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from typing import Dict, Any, Iterator, List
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DEFAULT_SEGMENTS = 4
+
+# Pages waiting for the consumer, bounds the memory of a scan that is consumed slower than it is read
+QUEUE_PAGES = 16
+
+# Marks the end of a segment in the page queue
+_SEGMENT_DONE = object()
+
+
+class ParallelScan:
+    """
+    Read a whole DynamoDB table with a parallel scan (Segment / TotalSegments).
+
+    Each segment is scanned page by page on its own worker thread, and the pages are handed to the consumer
+    through a bounded queue, so iterating starts as soon as the first page arrives and memory stays bounded.
+    Items come in no particular order. Stopping the iteration early (break, return) stops the workers after
+    their current page.
+
+    Usage:
+        scan = ParallelScan(table, attributes=['diver_id', 'name'])
+        for item in scan:
+            ...
+        logger.info(scan.stats())
+    """
+
+    def __init__(self, table, total_segments: int = None, max_workers: int = None, attributes: List[str] = None,
+                 page_size: int = None, **scan_kwargs):
+        """
+        Args:
+            table: boto3 resource Table
+            total_segments: Number of segments, defaults to PARALLEL_SCAN_SEGMENTS or DEFAULT_SEGMENTS
+            max_workers: Number of segments scanned at the same time, defaults to total_segments
+            attributes: Only read these attributes (builds the projection expression)
+            page_size: Limit of each Scan request
+            scan_kwargs: Further Scan parameters, e.g. FilterExpression
+        """
+        self.table = table
+        self.total_segments = max(1, total_segments or int(os.environ.get('PARALLEL_SCAN_SEGMENTS', DEFAULT_SEGMENTS)))
+        self.max_workers = max(1, min(max_workers or self.total_segments, self.total_segments))
+        self.scan_kwargs = dict(scan_kwargs)
+        if attributes:
+            names = dict(self.scan_kwargs.get('ExpressionAttributeNames') or {})
+            names.update({f'#p{i}': name for i, name in enumerate(attributes)})
+            self.scan_kwargs['ProjectionExpression'] = ', '.join(f'#p{i}' for i in range(len(attributes)))
+            self.scan_kwargs['ExpressionAttributeNames'] = names
+        if page_size:
+            self.scan_kwargs['Limit'] = page_size
+
+        self.lock = Lock()
+        self.pages = 0
+        self.items = 0
+        self.scanned = 0
+        self.capacity_units = 0.0
+        self.elapsed_seconds = 0.0
+
+    def _scan_segment(self, segment: int, pages: queue.Queue, stop: Event) -> None:
+        kwargs = {**self.scan_kwargs, 'Segment': segment, 'TotalSegments': self.total_segments,
+                  'ReturnConsumedCapacity': 'TOTAL'}
+        try:
+            while not stop.is_set():
+                response = self.table.scan(**kwargs)
+                with self.lock:
+                    self.pages += 1
+                    self.scanned += response.get('ScannedCount', len(response.get('Items', [])))
+                    self.capacity_units += (response.get('ConsumedCapacity') or {}).get('CapacityUnits', 0)
+                self._put(pages, response.get('Items', []), stop)
+                if 'LastEvaluatedKey' not in response:
+                    break
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            self._put(pages, e, stop)
+        finally:
+            self._put(pages, _SEGMENT_DONE, stop)
+
+    @staticmethod
+    def _put(pages: queue.Queue, value: Any, stop: Event) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        pages: queue.Queue = queue.Queue(maxsize=QUEUE_PAGES)
+        stop = Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for segment in range(self.total_segments):
+                executor.submit(self._scan_segment, segment, pages, stop)
+            remaining = self.total_segments
+            while remaining:
+                page = pages.get()
+                if page is _SEGMENT_DONE:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    with self.lock:
+                        self.items += len(page)
+                    yield from page
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+            self.elapsed_seconds = time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        """The scan's request and consumed-capacity report"""
+        with self.lock:
+            return {
+                'table': getattr(self.table, 'name', None),
+                'segments': self.total_segments,
+                'pages': self.pages,
+                'items': self.items,
+                'scanned': self.scanned,
+                'consumed_capacity_units': round(self.capacity_units, 1),
+                'elapsed_seconds': round(self.elapsed_seconds, 3)
+            }
+
+
+def parallel_scan(table, **kwargs) -> List[Dict[str, Any]]:
+    """Read all items of a table with a ParallelScan (see its arguments) and log its consumed capacity"""
+    scan = ParallelScan(table, **kwargs)
+    items = list(scan)
+    logger.info(f"Parallel scan: {scan.stats()}")
+    return items
+
@@ -0,0 +1,94 @@
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+from data_version import DataVersion, create_data_version
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 3600
+
+
+class ResponseCache:
+    """
+    Response bodies kept in the memory of a warm Lambda container.
+
+    Entries are evicted least recently used first once their bodies add up to more than max_bytes, and
+    expire after ttl_seconds. When a DataVersion is given, the whole cache is dropped as soon as an import
+    bumps the version, so cached responses never outlive the data they were built from for longer than the
+    version check interval.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 data_version: DataVersion = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.data_version = data_version
+        self.entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.size = 0
+        self.version: Optional[int] = None
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self) -> None:
+        if self.data_version is None:
+            return
+        version = self.data_version.current()
+        if version is not None and version != self.version:
+            self.clear()
+            self.version = version
+
+    def get(self, key: Hashable) -> Optional[str]:
+        self._check_version()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, body: str) -> None:
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, body = self.entries.pop(key)
+        self.size -= len(body)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses,
+                    'version': self.version}
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    Build the response cache configured through the environment.
+
+    RESPONSE_CACHE_MAX_BYTES bounds its memory (0 disables it), RESPONSE_CACHE_TTL_SECONDS the age of an entry.
+    The data version is read from IMPORT_STATE_TABLE_NAME when it is set.
+    """
+    max_bytes = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+    if max_bytes <= 0:
+        return None
+    ttl_seconds = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+    return ResponseCache(max_bytes, ttl_seconds, create_data_version())
@@ -0,0 +1,144 @@
+import base64
+import gzip
+import json
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from parallel_scan import parallel_scan
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# ImportState item holding the name-sorted roster served by get_all_divers
+ROSTER_KEY = 'roster'
+
+# Bump whenever the roster entry shape changes, readers fall back to scanning the Divers table for others
+ROSTER_FORMAT = 1
+
+# Snapshots are only stored well below DynamoDB's 400 KB item limit
+MAX_SNAPSHOT_BYTES = 350 * 1024
+
+# Divers table attributes of a roster entry
+ROSTER_ATTRIBUTES = ['diver_id', 'name', 'gender', 'age', 'city_state', 'country', 'hs_grad_year']
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def format_roster_diver(item: Dict[str, Any]) -> Dict[str, Any]:
+    """The roster entry of the divers API for a Divers item"""
+    return {
+        "id": str(item.get('diver_id', '')),
+        "name": item.get('name', ''),
+        "gender": item.get('gender', ''),
+        "age": _plain(item.get('age')),
+        "city_state": item.get('city_state', ''),
+        "country": item.get('country', ''),
+        "hs_grad_year": _plain(item.get('hs_grad_year'))
+    }
+
+
+def build_roster(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The roster of the given Divers items, sorted by name (and id for equal names)"""
+    roster = [format_roster_diver(item) for item in items]
+    roster.sort(key=lambda diver: (diver.get('name') or '', diver['id']))
+    return roster
+
+
+def filter_roster(roster: List[Dict[str, Any]], prefix: str) -> List[Dict[str, Any]]:
+    """Divers whose name (or any of its words) starts with prefix, ignoring case"""
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return roster
+    return [diver for diver in roster
+            if (diver.get('name') or '').lower().startswith(prefix)
+            or any(word.startswith(prefix) for word in (diver.get('name') or '').lower().split())]
+
+
+def encode_roster_cursor(diver: Dict[str, Any]) -> str:
+    position = [diver.get('name') or '', diver['id']]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def decode_roster_cursor(cursor: str) -> Tuple[str, str]:
+    """The (name, id) position of a cursor, raises ValueError for malformed cursors"""
+    try:
+        name, diver_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(name, str) or not isinstance(diver_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return name, diver_id
+
+
+def page_roster(roster: List[Dict[str, Any]], limit: int,
+                cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return one page of a roster sorted by build_roster.
+
+    Returns:
+        The page and the cursor of the next page (None after the last page)
+    """
+    start = 0
+    if cursor:
+        position = decode_roster_cursor(cursor)
+        start = next((i for i, diver in enumerate(roster)
+                      if (diver.get('name') or '', diver['id']) > position), len(roster))
+    page = roster[start:start + limit]
+    next_cursor = encode_roster_cursor(page[-1]) if page and start + limit < len(roster) else None
+    return page, next_cursor
+
+
+def write_roster_snapshot(client, table_name: str, roster: List[Dict[str, Any]]) -> bool:
+    """
+    Store the roster gzip-compressed in the ImportState table.
+
+    Returns False (and removes the stored snapshot) when the compressed roster would be too large for an item.
+    """
+    body = json.dumps(roster, separators=(',', ':'))
+    data = gzip.compress(body.encode('utf-8'), mtime=0)
+    if len(data) > MAX_SNAPSHOT_BYTES:
+        logger.warning(f"Roster of {len(roster)} divers is too large for a snapshot, divers are listed by scan")
+        client.delete_item(TableName=table_name, Key={'state_key': {'S': ROSTER_KEY}})
+        return False
+
+    client.put_item(
+        TableName=table_name,
+        Item={
+            'state_key': {'S': ROSTER_KEY},
+            'roster_format': {'N': str(ROSTER_FORMAT)},
+            'roster': {'B': data},
+            'diver_count': {'N': str(len(roster))},
+            'updated_at': {'S': datetime.now(timezone.utc).isoformat()}
+        }
+    )
+    return True
+
+
+def read_roster_snapshot(client, table_name: str) -> Optional[List[Dict[str, Any]]]:
+    """The stored roster, or None when there is no snapshot of the current format"""
+    response = client.get_item(TableName=table_name, Key={'state_key': {'S': ROSTER_KEY}})
+    item = response.get('Item')
+    if not item or int(item.get('roster_format', {}).get('N', 0)) != ROSTER_FORMAT:
+        return None
+    return json.loads(gzip.decompress(item['roster']['B']))
+
+
+def scan_roster(table) -> List[Dict[str, Any]]:
+    """Build the roster from a full (parallel) scan of the Divers table"""
+    return build_roster(parallel_scan(table, attributes=ROSTER_ATTRIBUTES))
+
+
+def rebuild_roster_snapshot(divers_table_name: str, state_table_name: str) -> Optional[int]:
+    """Rebuild the snapshot from the Divers table. Returns the number of divers, None when it could not be stored."""
+    import boto3
+
+    roster = scan_roster(boto3.resource('dynamodb').Table(divers_table_name))
+    if not write_roster_snapshot(boto3.client('dynamodb'), state_table_name, roster):
+        return None
+    return len(roster)
@@ -0,0 +1,136 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class RunReport:
+    """
+    Base class for import run reports.
+
+    A report is a gzip-compressed NDJSON file with one line per record: a 'run' header, one 'diver' line per
+    processed diver and a closing 'summary' line. Lines are compressed as they are written, so only the
+    compressor's buffer is held in memory however large the team is.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lines = 0
+        self.lock = Lock()
+        self.closed = False
+        self.file = self._open()
+        self.gzip_file = gzip.GzipFile(fileobj=self.file, mode='wb')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+        with self.lock:
+            self.gzip_file.write(line)
+            self.lines += 1
+
+    def close(self) -> Optional[str]:
+        """Finish the report and store it. Returns its location, or None when storing failed."""
+        with self.lock:
+            if self.closed:
+                return self.location
+            self.closed = True
+            self.gzip_file.close()
+
+        try:
+            self._store()
+            logger.info(f"Wrote run report with {self.lines} lines to {self.location}")
+            return self.location
+        except Exception as e:
+            logger.error(f"Could not store run report {self.location}: {e}")
+            return None
+        finally:
+            self.file.close()
+
+    @property
+    def location(self) -> str:
+        raise NotImplementedError
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _store(self) -> None:
+        raise NotImplementedError
+
+
+class LocalRunReport(RunReport):
+    """Run report written to a local directory, used for local runs"""
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        super().__init__(name)
+
+    @property
+    def location(self) -> str:
+        return os.path.join(self.path, self.name)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.location), exist_ok=True)
+        return open(f"{self.location}.tmp", 'wb')
+
+    def _store(self) -> None:
+        self.file.close()
+        os.replace(f"{self.location}.tmp", self.location)
+
+
+class S3RunReport(RunReport):
+    """Run report spooled to a temporary file and uploaded to an S3 bucket when closed"""
+
+    def __init__(self, bucket: str, prefix: str, name: str):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.client = boto3.client('s3')
+        super().__init__(name)
+
+    @property
+    def location(self) -> str:
+        return f"s3://{self.bucket}/{self.prefix}{self.name}"
+
+    def _open(self):
+        # Lambda's /tmp holds the report, not the function's memory
+        return tempfile.TemporaryFile()
+
+    def _store(self) -> None:
+        self.file.seek(0)
+        self.client.upload_fileobj(self.file, self.bucket, self.prefix + self.name, ExtraArgs={
+            'ContentType': 'application/x-ndjson', 'ContentEncoding': 'gzip'
+        })
+
+
+def report_name(run_id: str, part: str = None) -> str:
+    """Reports of a day share a prefix, parts of one run (invocations, shards) share the run ID"""
+    now = datetime.now(timezone.utc)
+    suffix = f"-{part}" if part else ''
+    return f"{now:%Y/%m/%d}/{now:%Y%m%dT%H%M%SZ}-{run_id}{suffix}.ndjson.gz"
+
+
+def create_run_report(run_id: str, part: str = None) -> Optional[RunReport]:
+    """
+    Start the run report configured through the environment.
+
+    REPORT_BUCKET (with optional REPORT_PREFIX) selects the S3 backend, REPORT_PATH the local directory
+    backend. Returns None when no report location is configured.
+    """
+    name = report_name(run_id, part)
+
+    bucket = os.environ.get('REPORT_BUCKET')
+    if bucket:
+        return S3RunReport(bucket, os.environ.get('REPORT_PREFIX', ''), name)
+
+    path = os.environ.get('REPORT_PATH')
+    if path:
+        return LocalRunReport(path, name)
+
+    return None
@@ -0,0 +1,80 @@
+import re
+from typing import Dict, Any, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+
+# TrainingData GSI of a diver's records, sorted by status and then session date
+STATUS_DATE_INDEX = 'diver-status-date-index'
+
+# Sort key of STATUS_DATE_INDEX: '<extraction_status>#<session_date>'
+STATUS_DATE_ATTRIBUTE = 'status_date'
+
+# TrainingData GSI of all of a diver's records, finds the ones STATUS_DATE_INDEX does not have yet
+DIVER_ID_INDEX = 'diver-id-index'
+
+SESSION_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def make_status_date(extraction_status: str, session_date: Optional[str]) -> str:
+    """The STATUS_DATE_ATTRIBUTE value of a record, records without a session date sort first in their status"""
+    return f"{extraction_status}#{session_date or ''}"
+
+
+def parse_session_date(value: Optional[str]) -> Optional[str]:
+    """A YYYY-MM-DD date query parameter, raises ValueError for other formats"""
+    if not value:
+        return None
+    if not SESSION_DATE.match(value):
+        raise ValueError(f"Invalid date: {value}")
+    return value
+
+
+def status_date_condition(diver_id: str, extraction_status: str, date_from: Optional[str] = None,
+                          date_to: Optional[str] = None):
+    """
+    Key condition of a STATUS_DATE_INDEX query for a diver's records with one status.
+
+    Args:
+        diver_id: The diver's id (stored as a string)
+        extraction_status: e.g. CONFIRMED
+        date_from: Only sessions on or after this YYYY-MM-DD date
+        date_to: Only sessions on or before this YYYY-MM-DD date
+    """
+    condition = Key('diver_id').eq(str(diver_id))
+    if not date_from and not date_to:
+        return condition & Key(STATUS_DATE_ATTRIBUTE).begins_with(make_status_date(extraction_status, None))
+    # Records without a session date are outside every range, '$' follows '#' so '<status>$' sorts after them all
+    lower = make_status_date(extraction_status, date_from or '0000-00-00')
+    upper = make_status_date(extraction_status, date_to) if date_to else f"{extraction_status}$"
+    return condition & Key(STATUS_DATE_ATTRIBUTE).between(lower, upper)
+
+
+def unindexed_records_query(diver_id: str, extraction_status: str, date_from: Optional[str] = None,
+                            date_to: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Query parameters for a diver's records with one status that have no STATUS_DATE_ATTRIBUTE.
+
+    Records written before STATUS_DATE_INDEX existed are missing from it until scripts/backfill_status_date.py
+    has set their status_date, readers add them from DIVER_ID_INDEX. Same arguments as status_date_condition.
+    """
+    condition = Attr(STATUS_DATE_ATTRIBUTE).not_exists() & Attr('extraction_status').eq(extraction_status)
+    if date_from:
+        condition &= Attr('session_date').gte(date_from)
+    if date_to:
+        condition &= Attr('session_date').lte(date_to)
+    return {
+        'IndexName': DIVER_ID_INDEX,
+        'KeyConditionExpression': Key('diver_id').eq(str(diver_id)),
+        'FilterExpression': condition
+    }
+
+
+def stored_session_date(table, record_id: str) -> Optional[str]:
+    """The session_date of a stored TrainingData record, for updates that change only its status"""
+    response = table.get_item(
+        Key={'id': record_id},
+        ProjectionExpression='#session_date',
+        ExpressionAttributeNames={'#session_date': 'session_date'}
+    )
+    return response.get('Item', {}).get('session_date')
+
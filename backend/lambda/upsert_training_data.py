@@ -8,6 +8,9 @@ from typing import Dict, Any
 import boto3
 from botocore.exceptions import ClientError
 
+from http_responses import error_response, json_request_body
+from training_status_index import STATUS_DATE_ATTRIBUTE, make_status_date, stored_session_date
+
 dynamodb = boto3.resource('dynamodb')
 
 APPLICATION_JSON = 'application/json'
@@ -22,47 +25,22 @@ def decimal_default(obj):
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
         # Validate request body exists
-        if 'body' not in event:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Request body is required'})
-            }
+        if event.get('body') is None:
+            return error_response(400, 'Request body is required')
 
-        # Parse request body
-        if isinstance(event['body'], str):
-            try:
-                body = json.loads(event['body'])
-            except json.JSONDecodeError:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Content-Type': APPLICATION_JSON,
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'error': 'Invalid JSON in request body'})
-                }
-        else:
-            body = event['body']
+        # Parse request body, JSON bodies arrive base64-encoded since application/json is a binary media type
+        try:
+            body = json_request_body(event)
+        except ValueError:
+            # Malformed JSON, base64 or UTF-8
+            return error_response(400, 'Invalid JSON in request body')
 
         # Validate required fields (training_data_id is now optional)
         required_fields = ['name', 'diver_id', 'updated_json']
         missing_fields = [field for field in required_fields if field not in body or body[field] is None]
 
         if missing_fields:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'error': f'Missing required fields: {", ".join(missing_fields)}'
-                })
-            }
+            return error_response(400, f'Missing required fields: {", ".join(missing_fields)}')
 
         # Extract input data
         name = body['name']
@@ -112,6 +90,12 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             update_expression_parts.append('extraction_status = :extraction_status')
             expression_attribute_values[':extraction_status'] = 'CONFIRMED'
 
+            # Keep the diver-status-date-index sort key in step with the status and session date
+            if session_date is None:
+                session_date = stored_session_date(table, training_data_id)
+            update_expression_parts.append(f'{STATUS_DATE_ATTRIBUTE} = :status_date')
+            expression_attribute_values[':status_date'] = make_status_date('CONFIRMED', session_date)
+
             # Build final update expression
             update_expression = 'SET ' + ', '.join(update_expression_parts)
 
@@ -145,6 +129,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'diver_id': str(diver_id),
                 'json_output': json.dumps(updated_json),
                 'extraction_status': 'CONFIRMED',
+                STATUS_DATE_ATTRIBUTE: make_status_date('CONFIRMED', session_date),
                 'created_at': current_timestamp,
                 'updated_at': current_timestamp
             }
@@ -180,34 +165,14 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         error_code = e.response['Error']['Code']
 
         if error_code == 'ResourceNotFoundException':
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'error': f'Training data with ID {training_data_id if "training_data_id" in locals() else "unknown"} not found'
-                })
-            }
+            return error_response(
+                404,
+                f'Training data with ID {training_data_id if "training_data_id" in locals() else "unknown"} not found'
+            )
         else:
             print(f"DynamoDB ClientError: {str(e)}")
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': APPLICATION_JSON,
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Database operation failed'})
-            }
+            return error_response(500, 'Database operation failed')
 
     except Exception as e:
         print(f"Error processing training data: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': APPLICATION_JSON,
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        return error_response(500, 'Internal server error')
@@ -12,6 +12,7 @@ import * as targets from 'aws-cdk-lib/aws-events-targets';
 export class DivingAnalyticsBackendStack extends cdk.Stack {
     public readonly inputBucket: s3.Bucket;
     public readonly outputBucket: s3.Bucket;
+    public readonly pageArchiveBucket: s3.Bucket;
     public readonly dataAutomationProject: bedrock.CfnDataAutomationProject;
     public readonly invokeBdaFunction: lambda.Function;
 
@@ -19,6 +20,9 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
     public readonly competitionsTable: dynamodb.Table;
     public readonly resultsTable: dynamodb.Table;
     public readonly divesTable: dynamodb.Table;
+    public readonly diveSheetCacheTable: dynamodb.Table;
+    public readonly importStateTable: dynamodb.Table;
+    public readonly diverProfilesTable: dynamodb.Table;
 
     public readonly getAllDiversFunction: lambda.Function;
     public readonly getDiverProfileFunction: lambda.Function;
@@ -60,6 +64,29 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
             ],
         });
 
+        // Raw DiveMeets pages recorded by the competition import, replayed to re-process history offline,
+        // and the import's run reports under reports/
+        this.pageArchiveBucket = new s3.Bucket(this, 'divemeets-page-archive', {
+            publicReadAccess: false,
+            blockPublicAccess: s3.BlockPublicAccess.BLOCK_ALL,
+            removalPolicy: cdk.RemovalPolicy.RETAIN,
+            lifecycleRules: [
+                {
+                    transitions: [
+                        {
+                            storageClass: s3.StorageClass.INFREQUENT_ACCESS,
+                            transitionAfter: cdk.Duration.days(30),
+                        },
+                    ],
+                },
+                {
+                    // Run reports of the competition import are only kept for a while
+                    prefix: 'reports/',
+                    expiration: cdk.Duration.days(180),
+                },
+            ],
+        });
+
         this.dataAutomationProject = new bedrock.CfnDataAutomationProject(this, 'DivingAnalyticsDataAutomationProject', {
             projectName: 'DivingAnalyticsDataAutomationProject',
             overrideConfiguration: {
@@ -157,6 +184,39 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
             removalPolicy: cdk.RemovalPolicy.RETAIN,
         });
 
+        // A diver's whole dive history in one query, dives carry their result's diver_id
+        this.divesTable.addGlobalSecondaryIndex({
+            indexName: 'DiverIndex',
+            partitionKey: {name: 'diver_id', type: dynamodb.AttributeType.NUMBER},
+            sortKey: {name: 'result_key', type: dynamodb.AttributeType.STRING},
+            projectionType: dynamodb.ProjectionType.ALL,
+        });
+
+        // Dive sheet cache - Parsed final dive sheets keyed by normalized detail_href
+        this.diveSheetCacheTable = new dynamodb.Table(this, 'DiveSheetCacheTable', {
+            tableName: 'DiveSheetCache',
+            partitionKey: {name: 'sheet_key', type: dynamodb.AttributeType.STRING},
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            removalPolicy: cdk.RemovalPolicy.DESTROY,
+        });
+
+        // Checkpoints of resumable competition imports, abandoned ones expire through the TTL
+        this.importStateTable = new dynamodb.Table(this, 'ImportStateTable', {
+            tableName: 'ImportState',
+            partitionKey: {name: 'state_key', type: dynamodb.AttributeType.STRING},
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            timeToLiveAttribute: 'expires_at',
+            removalPolicy: cdk.RemovalPolicy.DESTROY,
+        });
+
+        // Diver profile responses materialized by the competition import
+        this.diverProfilesTable = new dynamodb.Table(this, 'DiverProfilesTable', {
+            tableName: 'DiverProfiles',
+            partitionKey: {name: 'diver_id', type: dynamodb.AttributeType.NUMBER},
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            removalPolicy: cdk.RemovalPolicy.DESTROY,
+        });
+
         // Table 5: LLM Results - Store LLM JSON responses
         const trainingDataTable = new dynamodb.Table(this, 'TrainingDataTable', {
             tableName: 'TrainingData',
@@ -176,6 +236,14 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
             partitionKey: {name: 'diver_id', type: dynamodb.AttributeType.STRING},
         });
 
+        // Add GSI for querying a diver's records by status and session date (status_date is '<status>#<session_date>',
+        // backfilled on older records by scripts/backfill_status_date.py)
+        trainingDataTable.addGlobalSecondaryIndex({
+            indexName: 'diver-status-date-index',
+            partitionKey: {name: 'diver_id', type: dynamodb.AttributeType.STRING},
+            sortKey: {name: 'status_date', type: dynamodb.AttributeType.STRING},
+        });
+
         this.invokeBdaFunction = new lambda.Function(this, 'InvokeBdaFunction', {
             runtime: lambda.Runtime.PYTHON_3_12,
             handler: 'invoke_bda.handler',
@@ -253,7 +321,9 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
             }),
             timeout: cdk.Duration.seconds(30),
             environment: {
-                DIVERS_TABLE_NAME: this.diversTable.tableName
+                DIVERS_TABLE_NAME: this.diversTable.tableName,
+                // Holds the roster snapshot rebuilt by every import that changed data
+                IMPORT_STATE_TABLE_NAME: this.importStateTable.tableName
             }
         });
 
@@ -275,7 +345,10 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
                 DIVERS_TABLE_NAME: this.diversTable.tableName,
                 COMPETITIONS_TABLE_NAME: this.competitionsTable.tableName,
                 RESULTS_TABLE_NAME: this.resultsTable.tableName,
-                DIVES_TABLE_NAME: this.divesTable.tableName
+                DIVES_TABLE_NAME: this.divesTable.tableName,
+                DIVER_PROFILES_TABLE_NAME: this.diverProfilesTable.tableName,
+                // Cached responses are dropped once the import bumps the data version stored here
+                IMPORT_STATE_TABLE_NAME: this.importStateTable.tableName
             }
         });
 
@@ -319,7 +392,17 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
                 COMPETITIONS_TABLE_NAME: this.competitionsTable.tableName,
                 RESULTS_TABLE_NAME: this.resultsTable.tableName,
                 DIVES_TABLE_NAME: this.divesTable.tableName,
-                TEAM_NUMBER: this.node.tryGetContext('teamNumber')
+                DIVE_SHEET_CACHE_TABLE_NAME: this.diveSheetCacheTable.tableName,
+                ARCHIVE_BUCKET: this.pageArchiveBucket.bucketName,
+                REPORT_BUCKET: this.pageArchiveBucket.bucketName,
+                REPORT_PREFIX: 'reports',
+                IMPORT_STATE_TABLE_NAME: this.importStateTable.tableName,
+                DIVER_PROFILES_TABLE_NAME: this.diverProfilesTable.tableName,
+                TEAM_NUMBER: this.node.tryGetContext('teamNumber'),
+                // Optional comma-separated list of teams imported together in one run
+                ...(this.node.tryGetContext('teamNumbers') ? {TEAM_NUMBERS: this.node.tryGetContext('teamNumbers')} : {}),
+                // 'packed' stores all dives of a result in one item, see backend/scripts/migrate_dives.py
+                ...(this.node.tryGetContext('diveLayout') ? {DIVE_LAYOUT: this.node.tryGetContext('diveLayout')} : {})
             }
         });
         // EventBridge rule to schedule importCompetitionDataFunction every Sunday
@@ -391,10 +474,13 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
         });
 
         this.diversTable.grantReadData(this.getAllDiversFunction);
+        this.importStateTable.grantReadData(this.getAllDiversFunction);
         this.diversTable.grantReadData(this.getDiverProfileFunction);
         this.competitionsTable.grantReadData(this.getDiverProfileFunction);
         this.resultsTable.grantReadData(this.getDiverProfileFunction);
         this.divesTable.grantReadData(this.getDiverProfileFunction);
+        this.diverProfilesTable.grantReadData(this.getDiverProfileFunction);
+        this.importStateTable.grantReadData(this.getDiverProfileFunction);
         this.diversTable.grantReadData(this.getDiverTrainingFunction);
         this.resultsTable.grantReadData(this.getDiverTrainingFunction);
         trainingDataTable.grantReadData(this.getDiverTrainingFunction);
@@ -402,6 +488,24 @@ export class DivingAnalyticsBackendStack extends cdk.Stack {
         this.competitionsTable.grantReadWriteData(this.importCompetitionDataFunction);
         this.resultsTable.grantReadWriteData(this.importCompetitionDataFunction);
         this.divesTable.grantReadWriteData(this.importCompetitionDataFunction);
+        this.diveSheetCacheTable.grantReadWriteData(this.importCompetitionDataFunction);
+        this.pageArchiveBucket.grantReadWrite(this.importCompetitionDataFunction);
+        this.importStateTable.grantReadWriteData(this.importCompetitionDataFunction);
+        this.diverProfilesTable.grantReadWriteData(this.importCompetitionDataFunction);
+
+        // The import re-invokes itself to resume after stopping before the 15 minute limit and, in coordinator
+        // mode, to run its worker shards. A separate policy avoids the circular dependency between the function
+        // and its default role policy.
+        const importSelfInvokePolicy = new iam.Policy(this, 'ImportCompetitionDataSelfInvokePolicy', {
+            statements: [
+                new iam.PolicyStatement({
+                    effect: iam.Effect.ALLOW,
+                    actions: ['lambda:InvokeFunction'],
+                    resources: [this.importCompetitionDataFunction.functionArn]
+                })
+            ]
+        });
+        importSelfInvokePolicy.attachToRole(this.importCompetitionDataFunction.role!);
         trainingDataTable.grantReadData(this.getTrainingDataByStatusFunction);
         trainingDataTable.grantReadWriteData(this.updateTrainingDataFunction);
         trainingDataTable.grantReadWriteData(this.deleteTrainingDataFunction);
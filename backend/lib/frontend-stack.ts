@@ -147,6 +147,10 @@ export class FrontendStack extends cdk.Stack {
         this.api = new apigateway.RestApi(this, "DivingAnalyticsApi", {
             restApiName: "Diving Analytics API",
             description: "API for diving analytics platform",
+            // Read handlers return compressed JSON bodies base64-encoded (http_responses.py), API Gateway
+            // decodes them for requests that send `Accept: application/json`. This covers every route, so JSON
+            // request bodies reach all handlers base64-encoded: read them with http_responses.json_request_body
+            binaryMediaTypes: ["application/json"],
             defaultCorsPreflightOptions: {
                 allowOrigins: apigateway.Cors.ALL_ORIGINS,
                 allowMethods: apigateway.Cors.ALL_METHODS,
@@ -269,6 +273,10 @@ export class FrontendStack extends cdk.Stack {
         });
 
         const trainingDataIdResource = trainingDataResource.addResource("{id}");
+        trainingDataIdResource.addMethod("GET", new apigateway.LambdaIntegration(props.backendStack.getTrainingDataByStatusFunction), {
+            authorizer: cognitoAuthorizer,
+            authorizationType: apigateway.AuthorizationType.COGNITO,
+        });
         trainingDataIdResource.addMethod("DELETE", new apigateway.LambdaIntegration(props.backendStack.deleteTrainingDataFunction), {
             authorizer: cognitoAuthorizer,
             authorizationType: apigateway.AuthorizationType.COGNITO,
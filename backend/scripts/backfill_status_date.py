@@ -0,0 +1,100 @@
+"""
+Backfill the status_date sort key of the diver-status-date-index on TrainingData records.
+
+Records written before the index existed have no status_date, so they are missing from the index that
+get_diver_training and the per-diver training data listing query. The script scans the table and sets
+status_date ('<extraction_status>#<session_date>') on every record where it is missing or stale. Each
+update is conditional on the record's status and session date being unchanged since the scan, so it is
+safe to run while the application is in use, and it can be re-run at any time.
+
+Usage (from the backend directory, with AWS credentials for the account):
+    python scripts/backfill_status_date.py --dry-run
+    python scripts/backfill_status_date.py --segments 8
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Dict, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+import boto3  # noqa: E402
+from botocore.exceptions import ClientError  # noqa: E402
+
+from parallel_scan import ParallelScan  # noqa: E402
+from training_status_index import STATUS_DATE_ATTRIBUTE, make_status_date  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_record(item: Dict[str, Any], table, dry_run: bool) -> Dict[str, int]:
+    """Set one record's status_date. Returns the counts of the backfill step."""
+    if not item.get('extraction_status'):
+        return {'without_status': 1}
+
+    status_date = make_status_date(item['extraction_status'], item.get('session_date'))
+    if item.get(STATUS_DATE_ATTRIBUTE) == status_date:
+        return {'up_to_date': 1}
+    if dry_run:
+        return {'records_updated': 1}
+
+    names = {'#status_date': STATUS_DATE_ATTRIBUTE, '#extraction_status': 'extraction_status',
+             '#session_date': 'session_date'}
+    values = {':status_date': status_date, ':extraction_status': item['extraction_status']}
+    condition = '#extraction_status = :extraction_status'
+    if item.get('session_date'):
+        values[':session_date'] = item['session_date']
+        condition += ' AND #session_date = :session_date'
+    else:
+        condition += ' AND attribute_not_exists(#session_date)'
+
+    try:
+        table.update_item(
+            Key={'id': item['id']},
+            UpdateExpression='SET #status_date = :status_date',
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        # Changed since the scan, the writer that changed it also set status_date
+        return {'changed_meanwhile': 1}
+    return {'records_updated': 1}
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--table', default=os.environ.get('TRAINING_DATA_TABLE_NAME', 'TrainingData'))
+    arg_parser.add_argument('--segments', type=int, default=None,
+                            help='Number of parallel scan segments of the TrainingData table')
+    arg_parser.add_argument('--dry-run', action='store_true', help='Only count what would be updated')
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    table = boto3.resource('dynamodb').Table(args.table)
+    scan = ParallelScan(table, total_segments=args.segments,
+                        attributes=['id', 'extraction_status', 'session_date', STATUS_DATE_ATTRIBUTE])
+
+    totals: Dict[str, int] = {}
+    start = time.perf_counter()
+    for item in scan:
+        try:
+            counts = backfill_record(item, table, args.dry_run)
+        except Exception as e:
+            logger.error(f"Could not backfill record {item.get('id')}: {e}")
+            counts = {'errors': 1}
+        for name, value in counts.items():
+            totals[name] = totals.get(name, 0) + value
+
+    logger.info(f"Scanned records: {scan.stats()}")
+    logger.info(f"{'Dry run: ' if args.dry_run else ''}{totals} in {time.perf_counter() - start:.1f}s")
+    return 1 if totals.get('errors') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
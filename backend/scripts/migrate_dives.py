@@ -0,0 +1,174 @@
+"""
+Migrate stored dives to the current Dives layout.
+
+For every result, the script rewrites its dives with diver_id (so the DiverIndex can load a diver's
+whole history in one query) in the chosen layout: one item per dive ('items') or all dives of the
+result in one item ('packed'). It then updates the result's dive_count, dive_layout and hashes, so
+get_diver_profile reads it from the index and the next import sees it as unchanged. With
+--delete-items, the items of the other layout are removed afterwards. Migrated results are skipped,
+so the script can be re-run after an interruption. Run it while no import is running, and set
+DIVE_LAYOUT on the import function to the same layout.
+
+Usage (from the backend directory, with AWS credentials for the account):
+    python scripts/migrate_dives.py --dry-run
+    python scripts/migrate_dives.py --layout packed --delete-items
+    python scripts/migrate_dives.py --diver-id 12345 --diver-id 23456
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, Any, Iterator, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+import boto3  # noqa: E402
+from boto3.dynamodb.conditions import Key  # noqa: E402
+
+from dynamodb_change_detection import (HASH_ATTRIBUTE, IGNORED_ATTRIBUTES, combine_hashes,  # noqa: E402
+                                       with_content_hash)
+from import_competition_data import generate_result_key  # noqa: E402
+from packed_dives import (DIVE_COUNT_ATTRIBUTE, DIVE_LAYOUT_ATTRIBUTE, DIVE_LAYOUTS, ITEMS_LAYOUT,  # noqa: E402
+                          PACKED_DIVE_ROUND, PACKED_LAYOUT, pack_dives, unpack_dives)
+from parallel_scan import ParallelScan  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pages(operation, **kwargs) -> Iterator[Dict[str, Any]]:
+    while True:
+        response = operation(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def iter_results(results_table, diver_ids: List[int], segments: int = None) -> Iterator[Dict[str, Any]]:
+    if not diver_ids:
+        scan = ParallelScan(results_table, total_segments=segments)
+        yield from scan
+        logger.info(f"Scanned results: {scan.stats()}")
+        return
+    for diver_id in diver_ids:
+        yield from iter_pages(results_table.query, KeyConditionExpression=Key('diver_id').eq(diver_id))
+
+
+def migrate_result(result_item: Dict[str, Any], results_table, dives_table, layout: str, dry_run: bool,
+                   delete_items: bool) -> Dict[str, int]:
+    """Migrate one result's dives. Returns the counts of the migration step."""
+    stored_layout = result_item.get(DIVE_LAYOUT_ATTRIBUTE, ITEMS_LAYOUT)
+    if DIVE_COUNT_ATTRIBUTE in result_item and stored_layout == layout:
+        return {'already_migrated': 1}
+
+    diver_id = int(result_item['diver_id'])
+    result_key = generate_result_key(
+        diver_id,
+        result_item.get('competition_id'),
+        result_item.get('event_name', ''),
+        result_item.get('round_type', '')
+    )
+
+    stored_items = list(iter_pages(dives_table.query, KeyConditionExpression=Key('result_key').eq(result_key)))
+    packed_item = next((item for item in stored_items if item['dive_round'] == PACKED_DIVE_ROUND), None)
+    dive_items = [item for item in stored_items if item['dive_round'] != PACKED_DIVE_ROUND]
+    source_items = unpack_dives(packed_item) if stored_layout == PACKED_LAYOUT and packed_item else dive_items
+
+    if not source_items and result_item.get('detail_href'):
+        # The dive sheet was never fetched, the next import that gets it stores the dives
+        return {'without_dives': 1}
+
+    # Rebuild the dives the way the import builds them, so their hashes match the next import's
+    new_items = []
+    for item in source_items:
+        new_item = {name: value for name, value in item.items() if name not in IGNORED_ATTRIBUTES}
+        new_item.update(result_key=result_key, diver_id=diver_id)
+        if 'last_updated' in item:
+            new_item['last_updated'] = item['last_updated']
+        new_items.append(with_content_hash(new_item))
+
+    updated_result = {name: value for name, value in result_item.items() if name != DIVE_LAYOUT_ATTRIBUTE}
+    updated_result[DIVE_COUNT_ATTRIBUTE] = len(new_items)
+    if new_items:
+        updated_result['dives_hash'] = combine_hashes((item['dive_round'], item[HASH_ATTRIBUTE]) for item in new_items)
+        if layout == PACKED_LAYOUT:
+            updated_result[DIVE_LAYOUT_ATTRIBUTE] = PACKED_LAYOUT
+    # Results written before hashing keep being rewritten by the import, the others keep their hash current
+    if HASH_ATTRIBUTE in result_item:
+        with_content_hash(updated_result)
+
+    counts = {'results_migrated': 1, 'dives_migrated': len(new_items)}
+    if dry_run:
+        return counts
+
+    # The dives have to be in place before the result points readers at them
+    with dives_table.batch_writer() as batch:
+        if layout == PACKED_LAYOUT and new_items:
+            batch.put_item(Item=pack_dives(result_key, new_items, updated_result['dives_hash'], diver_id))
+        elif layout == ITEMS_LAYOUT:
+            for item in new_items:
+                batch.put_item(Item=item)
+    results_table.put_item(Item=updated_result)
+
+    if delete_items:
+        leftovers = dive_items if layout == PACKED_LAYOUT else [packed_item] if packed_item else []
+        with dives_table.batch_writer() as batch:
+            for item in leftovers:
+                batch.delete_item(Key={'result_key': result_key, 'dive_round': item['dive_round']})
+        counts['items_deleted'] = len(leftovers)
+    return counts
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--results-table', default=os.environ.get('RESULTS_TABLE_NAME', 'Results'))
+    arg_parser.add_argument('--dives-table', default=os.environ.get('DIVES_TABLE_NAME', 'Dives'))
+    arg_parser.add_argument('--layout', choices=DIVE_LAYOUTS, default=os.environ.get('DIVE_LAYOUT', ITEMS_LAYOUT))
+    arg_parser.add_argument('--diver-id', type=int, action='append', default=[],
+                            help='Only migrate these divers (repeatable), default is every stored result')
+    arg_parser.add_argument('--workers', type=int, default=8, help='Number of results migrated in parallel')
+    arg_parser.add_argument('--segments', type=int, default=None,
+                            help='Number of parallel scan segments of the Results table')
+    arg_parser.add_argument('--delete-items', action='store_true',
+                            help="Delete the other layout's items once a result is migrated")
+    arg_parser.add_argument('--dry-run', action='store_true', help='Only count what would be migrated')
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    dynamodb = boto3.resource('dynamodb')
+    results_table = dynamodb.Table(args.results_table)
+    dives_table = dynamodb.Table(args.dives_table)
+
+    totals: Dict[str, int] = {}
+    lock = Lock()
+    start = time.perf_counter()
+
+    def migrate(result_item: Dict[str, Any]) -> None:
+        try:
+            counts = migrate_result(result_item, results_table, dives_table, args.layout, args.dry_run,
+                                    args.delete_items)
+        except Exception as e:
+            logger.error(f"Could not migrate result {result_item.get('diver_id')}/"
+                         f"{result_item.get('competition_event_key')}: {e}")
+            counts = {'errors': 1}
+        with lock:
+            for name, value in counts.items():
+                totals[name] = totals.get(name, 0) + value
+            done = totals.get('results_migrated', 0)
+            if done and done % 500 == 0 and 'results_migrated' in counts:
+                logger.info(f"{done} results migrated")
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for _ in executor.map(migrate, iter_results(results_table, args.diver_id, args.segments)):
+            pass
+
+    logger.info(f"{'Dry run: ' if args.dry_run else ''}{totals} in {time.perf_counter() - start:.1f}s")
+    return 1 if totals.get('errors') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The Lambda modules are flat files in backend/lambda, as the functions import them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda'))
+
+# The parser tests reuse the synthetic DiveMeets pages of the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
@@ -0,0 +1,78 @@
+import pytest
+
+import import_competition_data
+
+DIVERS = [{'id': 1000 + number, 'name': f'Diver {number}', 'team_numbers': ['1']} for number in range(5)]
+
+# Diver whose shard fails while it is stored
+FAILING_DIVER_ID = 1004
+
+
+def scrape_diver(diver, engine, base_url, fingerprint=None, dive_sheet_cache=None):
+    """Stand-in for process_single_diver, every diver has two results of three dives, one of them at a shared meet"""
+    return {'id': diver['id'], 'name': diver['name'], 'results': [
+        {'meet_name': 'Big Ten Championships', 'dives': [{}, {}, {}]},
+        {'meet_name': f"{diver['name']} Invitational", 'dives': [{}, {}, {}]},
+    ]}
+
+
+def store_divers(diving_data, failing_diver_id=None, on_divers_stored=None, written_competitions=None, **options):
+    """Stand-in for store_data_in_dynamodb, counts the divers instead of writing them"""
+    counts = {'divers': 0, 'results': 0, 'dives': 0, 'write_stats': {'items_per_second': 100.0}}
+    for diver_data in diving_data:
+        if diver_data['id'] == failing_diver_id:
+            raise RuntimeError('DynamoDB is unavailable')
+        counts['divers'] += 1
+        counts['results'] += len(diver_data['results'])
+        counts['dives'] += sum(len(result['dives']) for result in diver_data['results'])
+        written_competitions.update(result['meet_name'] for result in diver_data['results'])
+        if on_divers_stored:
+            on_divers_stored([diver_data['id']])
+    return counts
+
+
+@pytest.fixture
+def stubbed_import(monkeypatch, tmp_path):
+    """The import with stand-ins for the DiveMeets pages and DynamoDB, inherited by the forked shard processes"""
+    for name in ('DIVE_SHEET_CACHE_TABLE_NAME', 'DIVE_SHEET_CACHE_PATH', 'ARCHIVE_BUCKET', 'ARCHIVE_PATH',
+                 'REPORT_BUCKET', 'IMPORT_STATE_TABLE_NAME', 'TEAM_NUMBERS'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('TEAM_NUMBER', '1')
+    monkeypatch.setenv('REPORT_PATH', str(tmp_path))
+    monkeypatch.setattr(import_competition_data, 'load_teams_divers', lambda engine, base_url, teams: DIVERS)
+    monkeypatch.setattr(import_competition_data, 'process_single_diver', scrape_diver)
+    monkeypatch.setattr(import_competition_data, 'store_data_in_dynamodb', store_divers)
+    return monkeypatch
+
+
+def coordinate():
+    return import_competition_data.coordinate_import(
+        None, {'incremental': False, 'max_workers': 2}, shard_size=3, max_shards_in_flight=2, worker_backend='local'
+    )
+
+
+def test_local_shards_add_up(stubbed_import):
+    body = coordinate()
+
+    assert body['shards'] == 2
+    assert body['failed_shards'] == []
+    assert body['total_divers'] == 5
+    assert body['successful_divers'] == 5
+    assert body['teams']['1'] == {'total_divers': 5, 'successful_divers': 5, 'error_divers': 0,
+                                  'unchanged_divers': 0, 'results': 10, 'dives': 30}
+    # Write throughput of the shards does not add up and is left out. Both shards wrote the shared meet.
+    assert body['storage_counts'] == {'divers': 5, 'results': 10, 'dives': 30, 'duplicate_competition_writes': 1}
+    assert len(body['reports']) == 2
+
+
+def test_failed_shard_is_listed_with_its_divers(stubbed_import):
+    stubbed_import.setattr(import_competition_data, 'store_data_in_dynamodb',
+                           lambda diving_data, **options: store_divers(diving_data, FAILING_DIVER_ID, **options))
+
+    body = coordinate()
+
+    assert body['shards'] == 2
+    assert body['failed_shards'] == [{'shard': 1, 'diver_ids': [1003, 1004], 'error': 'DynamoDB is unavailable'}]
+    assert body['total_divers'] == 3
+    assert body['storage_counts'] == {'divers': 3, 'results': 6, 'dives': 18, 'duplicate_competition_writes': 0}
+    assert len(body['reports']) == 1
@@ -0,0 +1,72 @@
+import pytest
+
+import import_competition_data
+from synthetic_pages import build_corpus, page_chrome
+
+HEADER_ROW = '<tr>' + '<td>H</td>' * 17 + '</tr>'
+TOTALS_ROW = '<tr><td colspan="14">Totals</td><td>300.00</td></tr>'
+
+
+def sheet(first_cell: str = '<td>1</td>', dd_cell: str = '<td>2.0<br><span>A</span></td>', head: str = '',
+          table_attributes: str = 'border="1" width="650"') -> str:
+    """A dive sheet of one dive, with the markup under test in its first or DD cell or the page head"""
+    cells = first_cell + '<td>101B</td><td>Forward Dive Pike</td><td>1M</td>' + dd_cell
+    cells += ''.join(f'<td>{score}</td>' for score in ['6.5', '7.0', '6.0'] + [''] * 6)
+    cells += '<td>40.50</td><td>40.50</td><td>3</td>'
+    return (f'<html><head><title>Dive Sheet</title>{head}</head><body>Date: Mar 27, 2025<br>'
+            f'<table {table_attributes}>{HEADER_ROW}<tr>{cells}</tr>{TOTALS_ROW}</table></body></html>')
+
+
+EDGE_CASES = {
+    'angle bracket in a quoted attribute': sheet('<td title="a>b">1</td>'),
+    'angle bracket in a single-quoted attribute': sheet("<td title='a>b' class=x>1</td>"),
+    'apostrophe in an unquoted attribute': sheet("<td title=don't>1</td>"),
+    'angle bracket in the table tag': sheet(table_attributes='summary="a > b" border="1" width="650"'),
+    'stray less-than sign': sheet('<td>1 < 2</td>'),
+    'reference without semicolon': sheet('<td>&nbspX1</td>'),
+    'known reference without semicolon': sheet('<td>&nbsp 1</td>'),
+    'unknown reference': sheet('<td>&foo;1</td>'),
+    'reference with a known prefix': sheet('<td>&ampx;1</td>'),
+    'ampersand in text': sheet('<td>AT&T 1</td>'),
+    'numeric references': sheet('<td>&#49;&#x32;</td>', '<td>&#50;.0</td>'),
+    'C1 control reference': sheet('<td>&#x80;1</td>'),
+    'NUL reference': sheet('<td>&#0;1</td>'),
+    'reference in the DD cell': sheet(dd_cell='<td>&nbsp;2.4<br><span>B</span></td>'),
+    'comment inside a cell': sheet('<td>1 <!-- a --> 2</td>'),
+    'script inside the table': sheet('<td>1<script>document.write("<td>")</script></td>'),
+    'comment with a table in the head': sheet(head='<!-- <table border="1" width="650"><tr><td>9</td></tr> -->'),
+    'script with markup in the head': sheet(head='<script>if (a < b) { document.write("</table>"); }</script>'),
+    'style in the head': sheet(head='<style>td > b { color: red; }</style>'),
+    'date inside a comment': sheet(head='<!-- Date: Jan 1, 2000 -->').replace('Date: Mar 27, 2025', ''),
+    'carriage returns': sheet('<td>1\r\n2</td>', '<td>2.0\r\n<br>A</td>', head='<!--\r\n-->'),
+    'unterminated comment': sheet(head='<!-- never closed'),
+    'nested table': sheet('<td><table><tr><td>1</td></tr></table></td>'),
+    'unclosed cell': sheet('<td>1'),
+}
+
+
+@pytest.fixture(params=['html.parser', 'lxml'])
+def html_parser(request, monkeypatch):
+    monkeypatch.setattr(import_competition_data, 'HTML_PARSER', request.param)
+    return request.param
+
+
+def test_synthetic_dive_sheets(html_parser):
+    _, _, sheets = build_corpus()
+
+    for page in sheets:
+        assert import_competition_data.parse_dive_sheet_fast(page) == import_competition_data.parse_dive_sheet(page)
+
+
+@pytest.mark.parametrize('name', EDGE_CASES)
+def test_edge_cases(html_parser, name):
+    page = EDGE_CASES[name]
+
+    assert import_competition_data.parse_dive_sheet_fast(page) == import_competition_data.parse_dive_sheet(page)
+
+
+def test_page_chrome_does_not_fall_back():
+    # Comments, scripts and styles outside the dive-sheet table keep the fast path
+    page = page_chrome(sheet(), 'Dive Sheet')
+
+    assert import_competition_data._parse_dive_sheet_fast(page) == import_competition_data.parse_dive_sheet(page)
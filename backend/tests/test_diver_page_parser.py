@@ -0,0 +1,46 @@
+import pytest
+
+import import_competition_data
+from synthetic_pages import build_corpus, page_chrome
+
+
+def page_body(page: str) -> str:
+    return page.split('<body>', 1)[1].rsplit('</body>', 1)[0]
+
+
+def corpus():
+    teams, profiles, _ = build_corpus()
+    profiles += [page_chrome(page_body(page), 'DiveMeets') for page in profiles[:5]]
+    # Markup both backends repair the same way
+    profiles += [page.replace('</tr>', '') for page in profiles[:5]]
+    profiles += [page.replace('<table width="100%">', '<table width="100%"><p>History</p>') for page in profiles[:5]]
+    profiles += [page.replace('</strong>', '', 1) for page in profiles[:5]]
+    return teams, profiles
+
+
+def parse_with(html_parser: str, parser, pages):
+    original = import_competition_data.HTML_PARSER
+    import_competition_data.HTML_PARSER = html_parser
+    try:
+        return [parser(page) for page in pages]
+    finally:
+        import_competition_data.HTML_PARSER = original
+
+
+@pytest.mark.parametrize('parser', ['parse_team_page', 'parse_diver_page'])
+def test_lxml_and_html_parser_agree(parser):
+    # select_html_parser picks lxml when it is installed, html.parser was the backend before
+    teams, profiles = corpus()
+    pages = teams if parser == 'parse_team_page' else profiles
+    parse = getattr(import_competition_data, parser)
+
+    assert parse_with('lxml', parse, pages) == parse_with('html.parser', parse, pages)
+
+
+def test_diver_page_matches_the_separate_parsers():
+    _, profiles = corpus()
+
+    for page in profiles:
+        profile = import_competition_data.parse_diver_profile(page)
+        results = import_competition_data.parse_diver_results(page)
+        assert import_competition_data.parse_diver_page(page) == (profile, results)
@@ -0,0 +1,89 @@
+import base64
+import json
+
+import pytest
+
+from diver_profiles import decode_cursor, encode_cursor, page_results, sort_results
+
+
+def results():
+    # Three results on the same day, so their order comes down to result_id
+    return sort_results([
+        {'result_id': 'C', 'start_date': '2025-02-27'},
+        {'result_id': 'A', 'start_date': '2025-02-27'},
+        {'result_id': 'B', 'start_date': '2025-02-27'},
+        {'result_id': 'D', 'start_date': '2025-03-15'},
+        {'result_id': 'E', 'start_date': '2024-11-02'},
+        {'result_id': 'F', 'start_date': None},
+    ])
+
+
+def all_pages(items, limit):
+    ids, cursor = [], None
+    while True:
+        page, cursor = page_results(items, limit, cursor)
+        ids.append([result['result_id'] for result in page])
+        if cursor is None:
+            return ids
+
+
+def test_sort_order():
+    assert [result['result_id'] for result in results()] == ['D', 'A', 'B', 'C', 'E', 'F']
+
+
+@pytest.mark.parametrize('limit, pages', [
+    (1, [['D'], ['A'], ['B'], ['C'], ['E'], ['F']]),
+    (2, [['D', 'A'], ['B', 'C'], ['E', 'F']]),
+    (4, [['D', 'A', 'B', 'C'], ['E', 'F']]),
+    (6, [['D', 'A', 'B', 'C', 'E', 'F']]),
+    (10, [['D', 'A', 'B', 'C', 'E', 'F']]),
+])
+def test_pages_split_results_of_the_same_day(limit, pages):
+    assert all_pages(results(), limit) == pages
+
+
+def test_last_page_has_no_cursor():
+    page, cursor = page_results(results(), 2, encode_cursor({'result_id': 'C', 'start_date': '2025-02-27'}))
+
+    assert [result['result_id'] for result in page] == ['E', 'F']
+    assert cursor is None
+    assert page_results([], 5) == ([], None)
+
+
+def test_cursor_keeps_its_position_when_results_change():
+    first_page, cursor = page_results(results(), 2)
+    # An import between two requests removed the last result of the first page and added one before it
+    changed = sort_results([result for result in results() if result['result_id'] != 'A']
+                           + [{'result_id': 'G', 'start_date': '2025-04-01'}])
+
+    page, _ = page_results(changed, 2, cursor)
+
+    assert [result['result_id'] for result in first_page] == ['D', 'A']
+    assert [result['result_id'] for result in page] == ['B', 'C']
+
+
+def test_cursor_after_the_last_result():
+    page, cursor = page_results(results(), 3, encode_cursor({'result_id': 'Z', 'start_date': ''}))
+
+    assert (page, cursor) == ([], None)
+
+
+def encode(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor!',
+    base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),
+    encode(['2025-02-27']),
+    encode(['2025-02-27', 'A', 'extra']),
+    encode(['2025-02-27', 7]),
+    encode({'start_date': '2025-02-27', 'result_id': 'A'}),
+    # A next_cursor of the training data listing
+    encode({'id': 'abc', 'extraction_status': 'CONFIRMED'}),
+])
+def test_invalid_and_foreign_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError):
+        page_results(results(), 2, cursor)
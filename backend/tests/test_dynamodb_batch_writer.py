@@ -0,0 +1,115 @@
+from threading import Lock
+
+from botocore.exceptions import ClientError
+
+from dynamodb_batch_writer import BATCH_SIZE, ParallelBatchWriter
+
+
+class StubClient:
+    """
+    Stand-in for the DynamoDB client's batch_write_item.
+
+    Items whose id is in unprocessed_ids come back as UnprocessedItems for their first unprocessed_times
+    calls (forever when None), errors are raised by the first calls in turn.
+    """
+
+    def __init__(self, unprocessed_ids=(), unprocessed_times=None, errors=()):
+        self.unprocessed_ids = set(unprocessed_ids)
+        self.unprocessed_times = unprocessed_times
+        self.errors = list(errors)
+        self.lock = Lock()
+        self.calls = []
+        self.written = []
+        self.rejected = {}
+
+    def batch_write_item(self, RequestItems):
+        [(table_name, requests)] = RequestItems.items()
+        with self.lock:
+            self.calls.append([request['PutRequest']['Item'] for request in requests])
+            if self.errors:
+                raise self.errors.pop(0)
+            unprocessed = []
+            for request in requests:
+                item = request['PutRequest']['Item']
+                rejected = self.rejected.get(item['id'], 0)
+                if item['id'] in self.unprocessed_ids and (self.unprocessed_times is None
+                                                           or rejected < self.unprocessed_times):
+                    self.rejected[item['id']] = rejected + 1
+                    unprocessed.append(request)
+                else:
+                    self.written.append(item)
+        return {'UnprocessedItems': {table_name: unprocessed} if unprocessed else {}}
+
+
+class StubDynamoDB:
+    def __init__(self, client):
+        self.meta = type('Meta', (), {'client': client})()
+
+
+def client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'BatchWriteItem')
+
+
+def write(client, items, **options):
+    writer = ParallelBatchWriter(StubDynamoDB(client), {'Dives': ['id']}, base_delay=0, **options)
+    with writer:
+        for item in items:
+            writer.put('Dives', item, tag=item.get('tag'))
+    return writer
+
+
+def test_unprocessed_items_are_retried():
+    client = StubClient(unprocessed_ids={3, 7}, unprocessed_times=2)
+
+    writer = write(client, [{'id': number} for number in range(10)])
+
+    assert sorted(item['id'] for item in client.written) == list(range(10))
+    # The retries only resend the unprocessed items
+    assert [len(call) for call in client.calls] == [10, 2, 2]
+    assert writer.failed_tags == set()
+    assert writer.stats()['retries'] == 2
+    assert writer.stats()['tables']['Dives'] == {'written': 10, 'failed': 0}
+
+
+def test_items_of_one_key_are_written_once_per_batch():
+    client = StubClient()
+
+    write(client, [{'id': 1, 'round': 'first'}, {'id': 2}, {'id': 1, 'round': 'second'}])
+
+    [call] = client.calls
+    # A batch with a key twice would be rejected as a whole, the later put wins
+    assert sorted(item['id'] for item in call) == [1, 2]
+    assert {'id': 1, 'round': 'second'} in call
+
+
+def test_full_batches_are_written_as_they_fill():
+    client = StubClient()
+
+    write(client, [{'id': number} for number in range(BATCH_SIZE * 2 + 1)])
+
+    assert sorted(len(call) for call in client.calls) == [1, BATCH_SIZE, BATCH_SIZE]
+
+
+def test_failed_tags_after_the_retries_run_out():
+    client = StubClient(unprocessed_ids={2})
+
+    writer = write(client, [{'id': 1, 'tag': 'diver-a'}, {'id': 2, 'tag': 'diver-b'}, {'id': 3}], max_retries=3)
+
+    assert len(client.calls) == 4
+    assert writer.failed_tags == {'diver-b'}
+    assert writer.stats()['items_failed'] == 1
+    assert writer.stats()['tables']['Dives'] == {'written': 2, 'failed': 1}
+
+
+def test_throttling_is_retried_and_other_errors_are_not():
+    throttled = StubClient(errors=[client_error('ProvisionedThroughputExceededException')])
+    writer = write(throttled, [{'id': 1, 'tag': 'diver-a'}])
+
+    assert [item['id'] for item in throttled.written] == [1]
+    assert writer.failed_tags == set()
+
+    rejected = StubClient(errors=[client_error('ValidationException')])
+    writer = write(rejected, [{'id': 1, 'tag': 'diver-a'}])
+
+    assert len(rejected.calls) == 1
+    assert writer.failed_tags == {'diver-a'}
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from dynamodb_change_detection import HASH_ATTRIBUTE, combine_hashes, content_hash, with_content_hash
+from import_competition_data import build_diver_item, build_dive_item
+
+DIVE = {'dive_round': '1', 'code': '101B', 'description': 'Forward Dive Pike', 'height': '1M', 'difficulty': 1.3,
+        'scores': [6.5, 7.0, 6.0], 'net_total': 40.95, 'award': 40.95, 'round_place': 3}
+
+
+def stored(item):
+    """An item as read back from DynamoDB"""
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+    return {name: deserializer.deserialize(serializer.serialize(value)) for name, value in item.items()}
+
+
+def test_last_updated_and_the_hash_itself_are_ignored():
+    item = {'diver_id': 1001, 'name': 'Jane Doe', 'last_updated': '2025-02-27T10:00:00'}
+    hashed = with_content_hash(dict(item))
+
+    assert content_hash({**item, 'last_updated': '2025-03-01T08:30:00'}) == hashed[HASH_ATTRIBUTE]
+    assert content_hash(hashed) == hashed[HASH_ATTRIBUTE]
+
+
+def test_key_order_does_not_matter():
+    item = {'result_key': 'R', 'scores': [6.5, 7.0], 'details': {'height': '1M', 'code': '101B'}}
+    reordered = {'details': {'code': '101B', 'height': '1M'}, 'scores': [6.5, 7.0], 'result_key': 'R'}
+
+    assert content_hash(item) == content_hash(reordered)
+
+
+@pytest.mark.parametrize('number, same', [
+    (6.5, Decimal('6.5')),
+    (6.5, Decimal('6.50')),
+    (3, Decimal('3')),
+    (3, 3.0),
+    (54.0, Decimal('54')),
+    (100, Decimal('1E+2')),
+    (0, Decimal('-0.0')),
+])
+def test_numbers_hash_by_value(number, same):
+    assert content_hash({'value': number}) == content_hash({'value': same})
+    assert content_hash({'scores': [number, None]}) == content_hash({'scores': [same, None]})
+
+
+def test_items_hash_the_same_after_a_round_trip():
+    dive_item = build_dive_item('1001_BIG_TEN_20250227_1M_SPRINGBOARD_FINALS', DIVE, 1001)
+    diver_item = build_diver_item({'id': 1001, 'name': 'Jane Doe', 'age': 19, 'hs_grad_year': 2024})
+
+    # The import compares the hashes of freshly built items with what DynamoDB stored
+    assert content_hash(stored(dive_item)) == content_hash(dive_item)
+    assert content_hash(stored(diver_item)) == content_hash(diver_item)
+    # And scraped floats hash like the Decimals they are stored as
+    assert content_hash({**dive_item, 'scores': DIVE['scores'], 'award': DIVE['award']}) == content_hash(dive_item)
+
+
+def test_content_changes_change_the_hash():
+    item = {'diver_id': 1001, 'scores': [6.5, 7.0], 'description': 'Forward Dive Pike'}
+
+    assert content_hash({**item, 'scores': [6.5, 7.5]}) != content_hash(item)
+    assert content_hash({**item, 'scores': [7.0, 6.5]}) != content_hash(item)
+    assert content_hash({**item, 'description': 'Forward Dive Tuck'}) != content_hash(item)
+    assert content_hash({**item, 'round_place': 3}) != content_hash(item)
+    assert content_hash({**item, 'flag': True}) != content_hash({**item, 'flag': 1})
+
+
+def test_combined_hashes_ignore_order():
+    hashes = [('1', 'a1'), ('2', 'b2'), ('10', 'c3')]
+
+    assert combine_hashes(hashes) == combine_hashes(reversed(hashes))
+    assert combine_hashes(hashes) != combine_hashes(hashes[:2])
@@ -0,0 +1,159 @@
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+import pytest
+
+from fetch_engine import FetchEngine, RequestBudgetExceeded
+
+
+class StandInServer:
+    """
+    Local stand-in for DiveMeets on a thread.
+
+    /slow answers after a short delay, /flaky/<n> answers 503 (Retry-After: 0) for the first n requests
+    and 200 afterwards, /down always answers 503, anything else answers 200 at once. The server records
+    the most requests it had in flight at the same time.
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.lock = Lock()
+        self.active = 0
+        self.peak_active = 0
+        self.hits = defaultdict(int)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.active += 1
+                    server.peak_active = max(server.peak_active, server.active)
+                    server.hits[self.path] += 1
+                    hits = server.hits[self.path]
+                try:
+                    status, headers = 200, {}
+                    if self.path == '/slow':
+                        time.sleep(server.delay)
+                    elif self.path.startswith('/flaky/') and hits <= int(self.path.rsplit('/', 1)[1]):
+                        status, headers = 503, {'Retry-After': '0'}
+                    elif self.path == '/down':
+                        status, headers = 503, {'Retry-After': '0'}
+                    body = f'<html>{self.path}</html>'.encode('utf-8')
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    with StandInServer() as stand_in:
+        yield stand_in
+
+
+def fetch_all(engine: FetchEngine, urls):
+    futures = [engine.submit(engine.get, url) for url in urls]
+    return [future.result() for future in futures]
+
+
+def test_global_in_flight_cap(server):
+    with FetchEngine(max_in_flight=3, max_per_host=10, backoff_base=0) as engine:
+        responses = fetch_all(engine, [f'{server.url}/slow'] * 30)
+        stats = engine.stats()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert stats['requests'] == 30
+    assert stats['retries'] == 0
+    assert stats['errors'] == 0
+    assert 1 < stats['peak_in_flight'] <= 3
+    assert server.peak_active <= 3
+
+
+def test_per_host_in_flight_cap():
+    with StandInServer() as first, StandInServer() as second:
+        with FetchEngine(max_in_flight=8, max_per_host=2, backoff_base=0) as engine:
+            urls = [f'{server.url}/slow' for _ in range(12) for server in (first, second)]
+            responses = fetch_all(engine, urls)
+            stats = engine.stats()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert stats['requests'] == 24
+    # Each host is held to its own budget, together they may use more of the global one
+    assert first.peak_active <= 2
+    assert second.peak_active <= 2
+    assert stats['peak_in_flight'] <= 4
+
+
+def test_retries_honour_retry_after(server):
+    # Without Retry-After the backoff could sleep for up to backoff_cap seconds per retry
+    with FetchEngine(max_retries=3, backoff_base=5, backoff_cap=5) as engine:
+        start = time.time()
+        response = engine.get(f'{server.url}/flaky/2')
+        elapsed = time.time() - start
+        stats = engine.stats()
+
+    assert response.status_code == 200
+    assert elapsed < 2
+    assert stats['requests'] == 3
+    assert stats['retries'] == 2
+    assert stats['errors'] == 0
+    assert server.hits['/flaky/2'] == 3
+
+
+def test_retries_give_up_after_max_retries(server):
+    with FetchEngine(max_retries=2, backoff_base=0) as engine:
+        response = engine.get(f'{server.url}/down')
+        stats = engine.stats()
+
+    assert response.status_code == 503
+    assert stats['requests'] == 3
+    assert stats['retries'] == 2
+    assert stats['errors'] == 1
+
+
+def test_request_budget(server):
+    with FetchEngine(max_requests=3, backoff_base=0) as engine:
+        for _ in range(3):
+            assert engine.get(f'{server.url}/page').status_code == 200
+        with pytest.raises(RequestBudgetExceeded):
+            engine.get(f'{server.url}/page')
+        stats = engine.stats()
+
+    assert stats['requests'] == 3
+    assert stats['request_budget'] == 3
+    assert server.hits['/page'] == 3
+
+
+def test_retries_count_against_the_request_budget(server):
+    with FetchEngine(max_requests=2, max_retries=3, backoff_base=0) as engine:
+        with pytest.raises(RequestBudgetExceeded):
+            engine.get(f'{server.url}/flaky/5')
+        stats = engine.stats()
+
+    assert stats['requests'] == 2
+    assert stats['retries'] == 2
+    assert server.hits['/flaky/5'] == 2
@@ -0,0 +1,76 @@
+import importlib
+import json
+
+import pytest
+
+
+class FakeTable:
+    """Serves the records of each index in pages, LastEvaluatedKey is the index of the last record read"""
+
+    def __init__(self, records_by_index):
+        self.records_by_index = records_by_index
+
+    def query(self, IndexName, Limit=None, ExclusiveStartKey=None, **kwargs):
+        records = self.records_by_index[IndexName]
+        start = int(ExclusiveStartKey['id']) + 1 if ExclusiveStartKey else 0
+        end = len(records) if Limit is None else min(start + Limit, len(records))
+        response = {'Items': records[start:end]}
+        if end < len(records):
+            response['LastEvaluatedKey'] = {'id': str(end - 1), 'diver_id': '7', **records[end - 1].get('key', {})}
+        return response
+
+
+class FakeDynamoDB:
+    def __init__(self, table):
+        self.table = table
+
+    def Table(self, name):
+        return self.table
+
+
+@pytest.fixture
+def by_status(monkeypatch):
+    # The module creates its DynamoDB resource on import
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.setenv('TRAINING_DATA_TABLE_NAME', 'TrainingData')
+    module = importlib.import_module('get_training_data_by_status')
+    monkeypatch.setattr(module, 'dynamodb', FakeDynamoDB(FakeTable({
+        'diver-status-date-index': [{'name': f'indexed-{i}', 'key': {'status_date': f'CONFIRMED#{i}'}}
+                                    for i in range(3)],
+        'diver-id-index': [{'name': f'unindexed-{i}'} for i in range(2)],
+    })))
+    return module
+
+
+def list_records(module, **params):
+    event = {'queryStringParameters': {'status': 'CONFIRMED', 'diver_id': '7', **params}}
+    response = module.handler(event, None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+@pytest.mark.parametrize('limit', ['1', '2', '3', '4', '200'])
+def test_pages_continue_with_records_without_status_date(by_status, limit):
+    names = []
+    page = list_records(by_status, limit=limit)
+    names.extend(item['name'] for item in page['data'])
+    while page['next_cursor']:
+        page = list_records(by_status, limit=limit, cursor=page['next_cursor'])
+        names.extend(item['name'] for item in page['data'])
+
+    assert names == ['indexed-0', 'indexed-1', 'indexed-2', 'unindexed-0', 'unindexed-1']
+
+
+def test_without_limit(by_status):
+    page = list_records(by_status)
+
+    assert [item['name'] for item in page['data']][3:] == ['unindexed-0', 'unindexed-1']
+    assert page['next_cursor'] is None
+
+
+def test_cursor_of_another_index(by_status):
+    cursor = by_status.encode_cursor({'id': '0', 'extraction_status': 'CONFIRMED'})
+    response = by_status.handler({'queryStringParameters': {'status': 'CONFIRMED', 'diver_id': '7',
+                                                            'cursor': cursor}}, None)
+
+    assert response['statusCode'] == 400
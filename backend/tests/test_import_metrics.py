@@ -0,0 +1,64 @@
+from import_metrics import EMF_MAX_VALUES, ImportMetrics, MemorySink
+
+
+def test_emf_records():
+    metrics = ImportMetrics()
+    for _ in range(EMF_MAX_VALUES + 20):
+        metrics.record('dynamodb_write', 0.004, table='Dives')
+    metrics.record('team_fetch', 0.25)
+    sink = MemorySink()
+
+    emitted = metrics.emit(sink, namespace='Test/Import', dimensions={'Mode': 'single'})
+
+    # One record per EMF_MAX_VALUES samples of a stage
+    assert emitted == len(sink.records) == 3
+    writes = [record for record in sink.records if record['Stage'] == 'dynamodb_write']
+    assert [len(record['Duration']) for record in writes] == [EMF_MAX_VALUES, 20]
+
+    record = writes[0]
+    directive = record['_aws']['CloudWatchMetrics'][0]
+    assert directive['Namespace'] == 'Test/Import'
+    assert directive['Dimensions'] == [['Mode', 'Stage', 'Table']]
+    assert directive['Metrics'] == [{'Name': 'Duration', 'Unit': 'Milliseconds'}]
+    assert isinstance(record['_aws']['Timestamp'], int)
+    # Every dimension of the directive is a top-level member of the record
+    assert (record['Mode'], record['Stage'], record['Table']) == ('single', 'dynamodb_write', 'Dives')
+    assert record['Duration'][0] == 4.0
+
+    team_fetch = next(record for record in sink.records if record['Stage'] == 'team_fetch')
+    assert team_fetch['_aws']['CloudWatchMetrics'][0]['Dimensions'] == [['Mode', 'Stage']]
+    assert 'Table' not in team_fetch
+    assert team_fetch['Duration'] == [250.0]
+
+
+def test_emit_without_sink():
+    metrics = ImportMetrics()
+    metrics.record('team_fetch', 0.25)
+
+    assert metrics.emit(None) == 0
+
+
+def test_summary_percentiles():
+    metrics = ImportMetrics()
+    # 1 ms to 100 ms, shuffled so the summary has to sort them
+    for milliseconds in list(range(2, 101, 2)) + list(range(1, 100, 2)):
+        metrics.record('profile_fetch', milliseconds / 1000)
+    metrics.record('dynamodb_read', 0.002, table='Divers')
+
+    summary = metrics.summary()
+
+    assert summary['profile_fetch'] == {
+        'count': 100, 'total_ms': 5050.0, 'p50_ms': 51.0, 'p90_ms': 91.0, 'p99_ms': 100.0, 'max_ms': 100.0
+    }
+    assert summary['dynamodb_read:Divers'] == {
+        'count': 1, 'total_ms': 2.0, 'p50_ms': 2.0, 'p90_ms': 2.0, 'p99_ms': 2.0, 'max_ms': 2.0
+    }
+
+
+def test_reset_drops_the_timings():
+    metrics = ImportMetrics()
+    metrics.record('team_fetch', 0.25)
+
+    metrics.reset()
+
+    assert metrics.summary() == {}
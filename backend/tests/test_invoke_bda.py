@@ -0,0 +1,44 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def invoke_bda(monkeypatch):
+    # The module creates its AWS clients and tables on import
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.setenv('TRAINING_DATA_TABLE_NAME', 'TrainingData')
+    monkeypatch.setenv('DIVERS_TABLE_NAME', 'Divers')
+    return importlib.import_module('invoke_bda')
+
+
+def with_divers(monkeypatch, module, names, order=1):
+    divers = [{'diver_id': 100 + index, 'name': name} for index, name in enumerate(names)][::order]
+    monkeypatch.setattr(module, 'ParallelScan', lambda table, attributes: iter(divers))
+
+
+@pytest.mark.parametrize('order', [1, -1])
+def test_exact_match_wins_over_partial_matches(monkeypatch, invoke_bda, order):
+    # Whatever order the scan segments return the divers in
+    with_divers(monkeypatch, invoke_bda, ['Anna Lee Smith', 'Anna Lee', 'Anna Lee-Jones'], order)
+
+    assert invoke_bda.get_diver_id_by_name('  anna  LEE ') == 101
+
+
+def test_single_partial_match(monkeypatch, invoke_bda):
+    with_divers(monkeypatch, invoke_bda, ['Sam Carter', 'Jordan Miles'])
+
+    assert invoke_bda.get_diver_id_by_name('Jordan Miles Jr.') == 101
+
+
+def test_ambiguous_partial_matches(monkeypatch, invoke_bda):
+    with_divers(monkeypatch, invoke_bda, ['Chris Park', 'Chris Parker', 'Dana White'])
+
+    assert invoke_bda.get_diver_id_by_name('Chris Par') is None
+
+
+def test_divers_without_a_name_do_not_match(monkeypatch, invoke_bda):
+    with_divers(monkeypatch, invoke_bda, ['', 'Dana White'])
+
+    assert invoke_bda.get_diver_id_by_name('Dana White') == 101
+    assert invoke_bda.get_diver_id_by_name('Riley Stone') is None
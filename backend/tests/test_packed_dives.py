@@ -0,0 +1,88 @@
+import importlib
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from diver_profiles import format_dives
+from import_competition_data import build_dive_item
+from packed_dives import DIVE_COUNT_ATTRIBUTE, DIVE_LAYOUT_ATTRIBUTE, PACKED_LAYOUT, pack_dives, unpack_dives
+
+RESULT_KEY = '1001_BIG_TEN_20250227_1M_SPRINGBOARD_FINALS'
+
+DIVES = [
+    {'dive_round': '1', 'code': '101B', 'description': 'Forward Dive Pike', 'height': '1M', 'difficulty': 1.3,
+     'scores': [6.5, 7.0, 6.0, None, None], 'net_total': 40.95, 'award': 40.95, 'round_place': 3},
+    {'dive_round': '2', 'code': '5132D', 'description': 'Forward 1 1/2 Somersaults 1 Twist Free', 'height': '1M',
+     'difficulty': 2.0, 'scores': [7.5, 7.5, 8.0], 'net_total': 45.0, 'award': 45.0, 'round_place': 1},
+    # A dive whose sheet had no difficulty, award or place
+    {'dive_round': '10', 'code': '201C', 'description': 'Back Dive Tuck', 'height': '3M', 'difficulty': None,
+     'scores': [], 'net_total': None, 'award': None, 'round_place': None},
+]
+
+
+def stored(item):
+    """An item as read back from DynamoDB"""
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+    return {name: deserializer.deserialize(serializer.serialize(value)) for name, value in item.items()}
+
+
+def dive_items():
+    return [stored(build_dive_item(RESULT_KEY, dive, 1001)) for dive in DIVES]
+
+
+def without_bookkeeping(item):
+    # Packed dives carry neither the diver_id of the DiverIndex nor content hashes or timestamps
+    item = {name: value for name, value in item.items() if name not in ('diver_id', 'content_hash', 'last_updated')}
+    # Judges without a score are not kept
+    item['scores'] = [score for score in item['scores'] if score is not None]
+    return item
+
+
+def test_round_trip():
+    items = dive_items()
+
+    unpacked = unpack_dives(stored(pack_dives(RESULT_KEY, items, 'hash', 1001)))
+
+    assert sorted(unpacked, key=lambda item: item['dive_round']) == \
+        sorted(map(without_bookkeeping, items), key=lambda item: item['dive_round'])
+    assert format_dives(unpacked) == format_dives(items)
+
+
+def test_numbers_come_back_exactly():
+    items = [{'result_key': RESULT_KEY, 'dive_round': '1', 'difficulty': Decimal('2.40'), 'scores': [Decimal('7.50')],
+              'net_total': Decimal('54.0'), 'award': Decimal('54.00'), 'round_place': Decimal('12')}]
+
+    [unpacked] = unpack_dives(stored(pack_dives(RESULT_KEY, items)))
+
+    assert (unpacked['difficulty'], unpacked['scores'], unpacked['award'], unpacked['round_place']) == \
+        (Decimal('2.40'), [Decimal('7.50')], Decimal('54.00'), Decimal('12'))
+    assert str(unpacked['net_total']) == '54.0'
+
+
+def test_unknown_format_is_rejected():
+    packed_item = {**pack_dives(RESULT_KEY, dive_items()), 'packed_format': 99}
+
+    with pytest.raises(ValueError):
+        unpack_dives(packed_item)
+
+
+@pytest.fixture
+def get_diver_profile(monkeypatch):
+    # The module creates its tables on import
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    for name in ('DIVERS_TABLE_NAME', 'COMPETITIONS_TABLE_NAME', 'RESULTS_TABLE_NAME', 'DIVES_TABLE_NAME'):
+        monkeypatch.setenv(name, name.rsplit('_TABLE_NAME', 1)[0].title())
+    monkeypatch.delenv('DIVER_PROFILES_TABLE_NAME', raising=False)
+    return importlib.import_module('get_diver_profile')
+
+
+def test_packed_dives_from_the_index(get_diver_profile):
+    items = dive_items()
+    result_item = {DIVE_LAYOUT_ATTRIBUTE: PACKED_LAYOUT, 'dives_hash': 'hash', DIVE_COUNT_ATTRIBUTE: Decimal(3)}
+    packed = {'packed': stored(pack_dives(RESULT_KEY, items, 'hash', 1001))}
+
+    assert get_diver_profile.dives_from_index(result_item, packed) == format_dives(items)
+    # Packed dives of another version of the result, or fewer dives than the result counts, are loaded per result
+    assert get_diver_profile.dives_from_index({**result_item, 'dives_hash': 'other'}, packed) is None
+    assert get_diver_profile.dives_from_index({**result_item, DIVE_COUNT_ATTRIBUTE: Decimal(4)}, packed) is None
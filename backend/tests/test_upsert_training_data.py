@@ -0,0 +1,75 @@
+import base64
+import importlib
+import json
+
+import pytest
+
+
+class FakeTable:
+    def __init__(self):
+        self.items = []
+
+    def put_item(self, Item):
+        self.items.append(Item)
+
+
+class FakeDynamoDB:
+    def __init__(self):
+        self.table = FakeTable()
+
+    def Table(self, name):
+        return self.table
+
+
+@pytest.fixture
+def upsert(monkeypatch):
+    # The module creates its DynamoDB resource on import
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.setenv('TRAINING_DATA_TABLE_NAME', 'TrainingData')
+    module = importlib.import_module('upsert_training_data')
+    monkeypatch.setattr(module, 'dynamodb', FakeDynamoDB())
+    return module
+
+
+PAYLOAD = {'name': 'Jane Doe', 'diver_id': 7, 'updated_json': {'dives': []}, 'session_date': '2025-01-31'}
+
+
+def test_base64_encoded_body(upsert):
+    # application/json is a binary media type of the API, so API Gateway passes JSON bodies base64-encoded
+    event = {'body': base64.b64encode(json.dumps(PAYLOAD).encode('utf-8')).decode('ascii'), 'isBase64Encoded': True}
+
+    response = upsert.handler(event, None)
+
+    assert response['statusCode'] == 200
+    [item] = upsert.dynamodb.table.items
+    assert (item['diver_name'], item['diver_id'], item['status_date']) == ('Jane Doe', '7', 'CONFIRMED#2025-01-31')
+
+
+def test_plain_body(upsert):
+    response = upsert.handler({'body': json.dumps(PAYLOAD), 'isBase64Encoded': False}, None)
+
+    assert response['statusCode'] == 200
+    assert upsert.dynamodb.table.items[0]['diver_name'] == 'Jane Doe'
+
+
+@pytest.mark.parametrize('event', [
+    {'body': None},
+    {'body': 'not base64!', 'isBase64Encoded': True},
+    {'body': base64.b64encode(b'\xff\xfe').decode('ascii'), 'isBase64Encoded': True},
+    {'body': '{"name":', 'isBase64Encoded': False},
+])
+def test_bad_body(upsert, event):
+    response = upsert.handler(event, None)
+
+    assert response['statusCode'] == 400
+    # Errors carry the CORS headers of successful responses
+    assert response['headers']['Access-Control-Allow-Methods'] == 'GET, POST, PUT, DELETE, OPTIONS'
+    assert upsert.dynamodb.table.items == []
+
+
+def test_parsed_body(upsert):
+    # Direct invocations may pass the body already parsed
+    response = upsert.handler({'body': PAYLOAD}, None)
+
+    assert response['statusCode'] == 200
+    assert upsert.dynamodb.table.items[0]['diver_id'] == '7'
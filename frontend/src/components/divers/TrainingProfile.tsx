@@ -5,7 +5,7 @@ import {
   ChartBarIcon,
   TrophyIcon,
 } from "@heroicons/react/24/outline";
-import getTrainingDataByStatus from "../../services/getTrainingDataByStatus";
+import { getConfirmedLogsForDiver } from "../../services/getTrainingDataByStatus";
 import { ConfirmedLogModal } from "../divelog";
 import getAllDivers from "../../services/getAllDivers";
 import ConfirmedLogCard from "../common/ConfirmedLogCard";
@@ -185,10 +185,10 @@ export const TrainingProfile: React.FC<TrainingProfileProps> = ({
     setLogsError(null);
     (async () => {
       try {
-        // Fetch all confirmed logs using the raw API call
-        const result = await getTrainingDataByStatus("CONFIRMED");
+        // Fetch the diver's confirmed logs, by diverId plus the logs without one that carry the diver's name
+        const data = await getConfirmedLogsForDiver(diverName, diverId ? String(diverId) : undefined);
         // Use shared mapper that sets isCompetition
-        const mapped = (result.data || []).map(mapApiToConfirmedLogService);
+        const mapped = data.map(mapApiToConfirmedLogService);
         // Filter logs by name directly (case-insensitive) and exclude competition for training list
         const filtered = mapped.filter((log: any) => {
           const ln = (log.extractedData?.Name || "").trim().toLowerCase();
@@ -233,8 +233,8 @@ export const TrainingProfile: React.FC<TrainingProfileProps> = ({
     setCompetitionError(null);
     (async () => {
       try {
-        const result = await getTrainingDataByStatus("CONFIRMED");
-        const mapped = (result.data || []).map(mapApiToConfirmedLogService);
+        const data = await getConfirmedLogsForDiver(diverName, diverId ? String(diverId) : undefined);
+        const mapped = data.map(mapApiToConfirmedLogService);
         // Filter logs by name directly (case-insensitive) and competition only
         const filtered = mapped.filter((log: any) => {
           const ln = (log.extractedData?.Name || "").trim().toLowerCase();
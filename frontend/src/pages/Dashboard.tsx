@@ -25,7 +25,7 @@ const Dashboard: React.FC = () => {
         const token = session.getIdToken().getJwtToken();
         // First fetch the basic diver list
         const res = await fetch(`${config.apiEndpoint}/api/divers`, {
-          headers: { Authorization: `Bearer ${token}` },
+          headers: { Authorization: `Bearer ${token}`, Accept: "application/json" },
         });
         if (!res.ok) throw new Error("Failed to fetch divers");
         const basicDivers = await res.json();
@@ -35,7 +35,7 @@ const Dashboard: React.FC = () => {
             const res = await fetch(
               `${config.apiEndpoint}/api/divers/${diver.id}`,
               {
-                headers: { Authorization: `Bearer ${token}` },
+                headers: { Authorization: `Bearer ${token}`, Accept: "application/json" },
               }
             );
             if (!res.ok) throw new Error(`Failed to fetch diver ${diver.id}`);
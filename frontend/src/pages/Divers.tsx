@@ -8,6 +8,7 @@ import { Auth as Amplify } from "aws-amplify";
 import Header from "../components/layout/Header";
 import { SidebarContext } from "../components/layout/AppLayout";
 import { PlusIcon } from "@heroicons/react/24/outline";
+import getDiverProfile from "../services/getDiverProfile";
 
 const Divers: React.FC = () => {
   useEffect(() => {
@@ -32,7 +33,7 @@ const Divers: React.FC = () => {
         const session = await Amplify.currentSession();
         const token = session.getIdToken().getJwtToken();
         const res = await fetch(`${config.apiEndpoint}/api/divers`, {
-          headers: { Authorization: `Bearer ${token}` },
+          headers: { Authorization: `Bearer ${token}`, Accept: "application/json" },
         });
         if (!res.ok) throw new Error("Failed to fetch divers");
         const data = await res.json();
@@ -57,28 +58,31 @@ const Divers: React.FC = () => {
   // Fetch diver profile when diverId or selectedDiver changes
   useEffect(() => {
     if (!selectedDiver) return;
+    let cancelled = false;
     setProfileLoading(true);
     setProfileError(null);
     const fetchProfile = async () => {
       try {
-        const session = await Amplify.currentSession();
-        const token = session.getIdToken().getJwtToken();
-        const res = await fetch(
-          `${config.apiEndpoint}/api/divers/${selectedDiver.id}`,
-          {
-            headers: { Authorization: `Bearer ${token}` },
-          }
+        // The most recent meets are shown as soon as the first page arrives, older ones are appended
+        await getDiverProfile(
+          selectedDiver.id,
+          (profile) => {
+            if (cancelled) return;
+            setSelectedDiverProfile(profile);
+            setProfileLoading(false);
+          },
+          () => cancelled
         );
-        if (!res.ok) throw new Error("Failed to fetch diver profile");
-        const data = await res.json();
-        setSelectedDiverProfile(data);
-        setProfileLoading(false);
       } catch (err) {
+        if (cancelled) return;
         setProfileError("Failed to load diver profile");
         setProfileLoading(false);
       }
     };
     fetchProfile();
+    return () => {
+      cancelled = true;
+    };
   }, [selectedDiver]);
 
   return (
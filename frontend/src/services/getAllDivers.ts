@@ -7,7 +7,7 @@ export default async function getAllDivers(): Promise<DiverFromAPI[]> {
   const token = session.getIdToken().getJwtToken();
   
   const res = await fetch(`${config.apiEndpoint}/api/divers`, {
-    headers: { Authorization: `Bearer ${token}` }
+    headers: { Authorization: `Bearer ${token}`, Accept: "application/json" }
   });
   
   if (!res.ok) {
@@ -0,0 +1,76 @@
+import {config} from "../config";
+import {Auth as Amplify} from "aws-amplify";
+import {Diver, DiverProfilePage, Dive} from "../types";
+
+const PAGE_SIZE = 10;
+
+async function authorizedGet(path: string): Promise<any> {
+  const session = await Amplify.currentSession();
+  const token = session.getIdToken().getJwtToken();
+
+  const res = await fetch(`${config.apiEndpoint}${path}`, {
+    headers: { Authorization: `Bearer ${token}`, Accept: "application/json" }
+  });
+
+  if (!res.ok) {
+    throw new Error(`Failed to fetch diver profile: ${res.status} ${res.statusText}`);
+  }
+
+  return await res.json();
+}
+
+/**
+ * Fetch one page of a diver's results, the most recent first
+ * @param diverId the diver's id
+ * @param cursor next_cursor of the previous page (omit for the first page)
+ * @param limit number of results per page
+ * @param includeDives false to leave out the dives, see getResultDives
+ */
+export async function getDiverProfilePage(
+  diverId: string | number,
+  cursor?: string | null,
+  limit: number = PAGE_SIZE,
+  includeDives: boolean = true
+): Promise<DiverProfilePage> {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  if (!includeDives) params.set("dives", "false");
+  return authorizedGet(`/api/divers/${diverId}?${params.toString()}`);
+}
+
+/**
+ * Fetch the dives of one result of a diver
+ * @param diverId the diver's id
+ * @param resultId result_id of the result
+ */
+export async function getResultDives(diverId: string | number, resultId: string): Promise<Dive[]> {
+  const params = new URLSearchParams({ result: resultId });
+  const data = await authorizedGet(`/api/divers/${diverId}?${params.toString()}`);
+  return data.dives;
+}
+
+/**
+ * Fetch a diver's whole profile page by page. onPage is called with the profile loaded so far
+ * after every page, so the most recent meets can be shown before the whole career is loaded.
+ * @returns the complete profile, or null when shouldStop returned true before the last page
+ */
+export default async function getDiverProfile(
+  diverId: string | number,
+  onPage: (profile: Diver, complete: boolean) => void,
+  shouldStop: () => boolean = () => false
+): Promise<Diver | null> {
+  let page = await getDiverProfilePage(diverId);
+  let diver: Diver = page;
+  let cursor = page.next_cursor;
+  onPage(diver, !cursor);
+
+  while (cursor) {
+    if (shouldStop()) return null;
+    page = await getDiverProfilePage(diverId, cursor);
+    diver = { ...diver, results: [...diver.results, ...page.results] };
+    cursor = page.next_cursor;
+    onPage(diver, !cursor);
+  }
+
+  return diver;
+}
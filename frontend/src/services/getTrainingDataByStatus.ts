@@ -1,19 +1,94 @@
 import { config } from "../config";
 import { Auth as Amplify } from "aws-amplify";
 
-export default async function getTrainingDataByStatus(status: string) {
+const PAGE_SIZE = 100;
+
+/**
+ * Attributes read by the list views, leaving out blobs such as extracted_csv.
+ * Use getTrainingDataRecord for all fields of a single record.
+ */
+export const LIST_FIELDS = [
+  "diver_name",
+  "diver_id",
+  "session_date",
+  "s3_url",
+  "s3_key",
+  "json_output",
+  "created_at",
+  "updated_at",
+  "balks",
+  "comment",
+  "rating",
+];
+
+export interface TrainingDataQuery {
+  diverId?: string;
+  /** With diverId, only sessions from this YYYY-MM-DD date on */
+  dateFrom?: string;
+  /** With diverId, only sessions up to this YYYY-MM-DD date */
+  dateTo?: string;
+  /** Only the records without a diver_id (not combined with diverId) */
+  unassigned?: boolean;
+  fields?: string[];
+  limit?: number;
+  cursor?: string | null;
+}
+
+async function authorizedGet(path: string): Promise<any> {
   const session = await Amplify.currentSession();
   const token = session.getIdToken().getJwtToken();
-  const res = await fetch(
-    `${config.apiEndpoint}/api/training-data?status=${status}`,
-    { headers: { Authorization: `Bearer ${token}` } }
-  );
+  const res = await fetch(`${config.apiEndpoint}${path}`, {
+    headers: { Authorization: `Bearer ${token}`, Accept: "application/json" },
+  });
   if (!res.ok) throw new Error("Failed to fetch training data");
   return res.json();
 }
 
 /**
- * Fetch confirmed training logs and filter for a specific diver (by name or id)
+ * Fetch one page of the training data records with a status
+ * @returns { data, count, extraction_status, next_cursor }, next_cursor is null after the last page
+ */
+export async function getTrainingDataPage(
+  status: string,
+  { diverId, dateFrom, dateTo, unassigned, fields = LIST_FIELDS, limit = PAGE_SIZE, cursor }: TrainingDataQuery = {}
+) {
+  const params = new URLSearchParams({ status, limit: String(limit) });
+  if (diverId) params.set("diver_id", diverId);
+  if (diverId && dateFrom) params.set("from", dateFrom);
+  if (diverId && dateTo) params.set("to", dateTo);
+  if (!diverId && unassigned) params.set("unassigned", "true");
+  if (fields.length) params.set("fields", fields.join(","));
+  if (cursor) params.set("cursor", cursor);
+  return authorizedGet(`/api/training-data?${params.toString()}`);
+}
+
+/**
+ * Fetch a single training data record with all its fields
+ * @param id the record's id
+ */
+export async function getTrainingDataRecord(id: string) {
+  return authorizedGet(`/api/training-data/${encodeURIComponent(id)}`);
+}
+
+/**
+ * Fetch all training data records with a status, page by page
+ * @returns { data, count, extraction_status }
+ */
+export default async function getTrainingDataByStatus(
+  status: string,
+  query: TrainingDataQuery = {}
+) {
+  let page = await getTrainingDataPage(status, query);
+  const data = [...(page.data || [])];
+  while (page.next_cursor) {
+    page = await getTrainingDataPage(status, { ...query, cursor: page.next_cursor });
+    data.push(...(page.data || []));
+  }
+  return { data, count: data.length, extraction_status: status };
+}
+
+/**
+ * Fetch confirmed training logs for a specific diver (by name or id)
  * @param diverName string (case-insensitive match)
  * @param diverId string (optional, if available)
  * @returns Promise<any[]>
@@ -22,17 +97,19 @@ export async function getConfirmedLogsForDiver(
   diverName: string,
   diverId?: string
 ) {
+  const matchesName = (log: any) =>
+    log.diver_name &&
+    log.diver_name.trim().toLowerCase() === diverName.trim().toLowerCase();
+  // Prefer diverId if available, the server then only reads that diver's logs.
+  // Logs saved before the diver was identified have no diver_id, those are still matched by name.
+  if (diverId) {
+    const [byId, unassigned] = await Promise.all([
+      getTrainingDataByStatus("CONFIRMED", { diverId }),
+      getTrainingDataByStatus("CONFIRMED", { unassigned: true }),
+    ]);
+    return [...byId.data, ...unassigned.data.filter(matchesName)];
+  }
   const result = await getTrainingDataByStatus("CONFIRMED");
-  const logs = result.data || [];
-  // Prefer diverId if available, else match by diverName (case-insensitive)
-  return logs.filter((log: any) => {
-    if (diverId && log.diver_id) {
-      return String(log.diver_id) === String(diverId);
-    }
-    // fallback to name match
-    return (
-      log.diver_name &&
-      log.diver_name.trim().toLowerCase() === diverName.trim().toLowerCase()
-    );
-  });
+  // fallback to name match
+  return result.data.filter(matchesName);
 }
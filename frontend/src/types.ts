@@ -23,6 +23,7 @@ export interface Dive {
 }
 
 export interface Result {
+  result_id?: string;
   meet_name: string;
   event_name: string;
   round_type: string;
@@ -47,6 +48,11 @@ export interface Diver {
   results: Result[];
 }
 
+export interface DiverProfilePage extends Diver {
+  next_cursor: string | null;
+  total_results: number;
+}
+
 export interface DiverStats {
   totalDives: number;
   averageScore: number;